@@ -1,105 +1,336 @@
-from flask import Flask, render_template, request
+from flask import Flask, Response, abort, g, render_template, request, send_file
+from markupsafe import escape
+from werkzeug.serving import is_running_from_reloader
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Non-GUI backend for plotting
-import matplotlib.pyplot as plt
-import io
-import base64
-
+import math
+import os
+import re
+import threading
+import time
+from urllib.parse import quote
+
+from charts import render_plot
+from edsql_ast import AnalyzeTable, Delete, Explain, Insert, Select
 from edsql_compiler import parser
-from convert_to_edsql import convert_entities_to_edsql
-from intent_classifier import classify_intent
+from executor import QueryError, StageStats, apply_write, execute_plan
+from explain import explain
+from planner import plan_select
+from catalog import Catalog
+from convert_to_edql import convert_entities_to_edsql
+from intent_classifie import classify_intent
+import metrics
+import profiler
+from matcher_utils import extract_entities
+from nl_fallback import fallback_to_edsql
+from result_cache import ResultCache
+from jobs import DEFAULT_TIMEOUT, JobQueue, QueueFull
+from stats import StatsStore, format_stats
+from approx import approximate
+import serialize
+from query_log import LOG_PATH, QueryLog
 
 app = Flask(__name__)
 
-# Load dataset once at startup
-df = pd.read_csv("students.csv")
+# Catalog snapshots share column blocks with the frames queries derive from
+# them, which is only safe with copy-on-write.  The option is process-wide,
+# so the entry points set it rather than the modules they import
+pd.set_option("mode.copy_on_write", True)
 
+# Tables are read on first reference; EDSQL_DATA_DIR adds every CSV /
+# Parquet / Feather file in it (courses, enrollments, ...) under its stem
+catalog = Catalog()
+catalog.register("students", "students.csv")
+if os.environ.get("EDSQL_DATA_DIR"):
+    catalog.register_directory(os.environ["EDSQL_DATA_DIR"])
 
-def execute_query(parsed_query):
-    """Execute the parsed EDSQL query."""
-    try:
-        _, select_list, table, where_clause, group_by_clause, plot_clause, order_clause, limit_clause, _ = parsed_query
-    except ValueError:
+# Tables stored clustered by a column, as "table=column,..."; queries
+# filtering or grouping on that column then touch only its partitions.
+# Off by default: clustering reorders the table's rows
+for spec in os.environ.get("EDSQL_PARTITION_BY", "").split(","):
+    if spec.strip():
+        name, column = spec.split("=", 1)
+        catalog.partition_by(name.strip(), column.strip())
+
+# INSERT/DELETE have no table name and always modify this table
+WRITE_TABLE = "students"
+
+# Column statistics, collected in the background on first use of a table
+table_stats = StatsStore(catalog)
+
+results = ResultCache()
+
+# Answered queries, replayed at startup (see warm_up).  Only a serving
+# process records them (start_serving); importing app leaves the log alone
+query_log = QueryLog(path="")
+
+# EXPLAIN [ANALYZE] may prefix either an EDSQL or a natural language query
+EXPLAIN_PREFIX = re.compile(r'\s*explain(\s+analyze)?\s+', re.IGNORECASE)
+EDSQL_COMMAND = re.compile(r'\s*(insert|delete|analyze)\b', re.IGNORECASE)
+
+# Upper bounds on client-supplied job timeouts and long-poll waits (seconds)
+MAX_JOB_TIMEOUT = 300
+MAX_LONG_POLL = 30
+
+
+_parse_lock = threading.Lock()
+
+
+@metrics.instrument("parse")
+def parse_query(sql_query):
+    # The PLY lexer and parser keep their state on shared objects, and
+    # requests, jobs and the warm-up thread all parse
+    with _parse_lock:
+        return parser.parse(sql_query)
+
+
+@metrics.instrument("execute_query")
+def execute_query(parsed_query, snapshot=None, checkpoint=None):
+    """Execute the parsed EDSQL query against a pinned snapshot of its tables."""
+    if not isinstance(parsed_query, Select):
         return "Invalid parsed query format."
 
-    result = df.copy()
+    try:
+        if snapshot is None:
+            snapshot = catalog.snapshot(parsed_query.tables)
+        plan = plan_select(parsed_query, snapshot.schema())
+        if parsed_query.approx is not None and not parsed_query.joins:
+            # Answer from the table's sample; runs exactly if the bound is not
+            # met, or while the statistics are being collected or have not
+            # caught up with the pinned version
+            stats = table_stats.get(parsed_query.table)
+            if stats is None:
+                table_stats.ensure(parsed_query.table)
+            elif stats.version == dict(snapshot.versions)[parsed_query.table]:
+                result = approximate(parsed_query, plan, stats)
+                if result is not None:
+                    return result
+        return execute_plan(plan, snapshot, checkpoint)
+    except KeyError as e:
+        return e.args[0]
+    except QueryError as e:
+        return str(e)
+
+
+def execute_write(parsed_query):
+    """Apply an INSERT/DELETE as a new table version and invalidate cached results.
+
+    Queries already running keep reading the version they pinned.
+    """
+    def write(table):
+        new_table, affected = apply_write(table, parsed_query)
+        return new_table, (affected, new_table.tail(affected))
 
-    # WHERE clause
-    if where_clause:
-        try:
-            column, op, value = where_clause[1][1:]  # Unpack CONDITION tuple
-
-            if op == 'LIKE':
-                pattern = '^' + value.replace('%', '.*') + '$'
-                result = result[result[column].str.match(pattern, case=False, na=False)]
-            else:
-                if pd.api.types.is_numeric_dtype(result[column]):
-                    value = float(value)
-                else:
-                    value = str(value)
-
-                if op == '>':
-                    result = result[result[column] > value]
-                elif op == '<':
-                    result = result[result[column] < value]
-                elif op == '=':
-                    result = result[result[column] == value]
-
-        except Exception as e:
-            return f"Error in WHERE clause: {e}"
-
-    # GROUP BY and Aggregation
-    if group_by_clause:
-        try:
-            group_col = group_by_clause[1]
-            if isinstance(select_list[0], tuple) and select_list[0][0] == 'AVG':
-                result = result.groupby(group_col)[select_list[0][1]].mean().reset_index()
-        except Exception as e:
-            return f"Error in GROUP BY clause: {e}"
-
-    # Aggregation without GROUP BY
-    elif any(isinstance(sel, tuple) and sel[0] == 'AVG' for sel in select_list):
-        try:
-            agg_results = {}
-            for sel in select_list:
-                if isinstance(sel, tuple) and sel[0] == 'AVG':
-                    agg_results[sel[1]] = [result[sel[1]].mean()]
-                elif isinstance(sel, str):
-                    agg_results[sel] = [result[sel].iloc[0]]
-            result = pd.DataFrame(agg_results)
-        except Exception as e:
-            return f"Error processing aggregation without GROUP BY: {e}"
-
-    # ORDER BY
-    if order_clause:
-        try:
-            _, order_col, order_dir = order_clause
-            result = result.sort_values(by=order_col, ascending=(order_dir.upper() == 'ASC'))
-        except Exception as e:
-            return f"Error in ORDER BY clause: {e}"
+    try:
+        version, (affected, added) = catalog.update(WRITE_TABLE, write)
+    except QueryError as e:
+        return str(e)
+    results.invalidate(WRITE_TABLE, version)
+    if isinstance(parsed_query, Insert):
+        table_stats.record_insert(WRITE_TABLE, version, added)
+    else:
+        table_stats.record_delete(WRITE_TABLE, version, affected)
+    verb = "Inserted" if isinstance(parsed_query, Insert) else "Deleted"
+    return f"{verb} {affected} row(s)."
+
+
+@app.before_request
+def start_request_timing():
+    metrics.begin_request()
+
+
+@app.before_request
+def start_request_profile():
+    mode = profiler.requested_mode(request.args.get("profile") or request.headers.get("X-Profile"))
+    if mode:
+        g.profile = profiler.start_profile(mode)
+
+
+@app.after_request
+def add_server_timing(response):
+    header = metrics.server_timing_header()
+    if header:
+        response.headers["Server-Timing"] = header
+    return response
+
+
+@app.after_request
+def save_request_profile(response):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profile_id = profiler.save_profile(profile.mode, profile.finish())
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+@app.teardown_request
+def stop_request_profile(exc):
+    # Only reached with a live profile when the view raised
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profile.finish()
+
+
+@app.route("/profiles")
+def list_profiles():
+    if not profiler.ENABLED:
+        abort(404)
+    return {"profiles": profiler.list_profiles()}
+
+
+@app.route("/profiles/<profile_id>")
+def get_profile(profile_id):
+    if not profiler.ENABLED:
+        abort(404)
+    path = profiler.find_profile(profile_id)
+    if path is None:
+        abort(404)
+    if request.args.get("format") == "text" and path.endswith(".prof"):
+        return Response(profiler.summarize(path), mimetype="text/plain")
+    return send_file(os.path.abspath(path), as_attachment=True)
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    cache = plan_select.cache_info()
+    metrics.set_gauge("plan_cache_hits", cache.hits)
+    metrics.set_gauge("plan_cache_misses", cache.misses)
+    metrics.set_gauge("table_versions_retained", len(catalog.live_versions()))
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+def answer_query(query, checkpoint=None, raw=False):
+    """Answer an NL or EDSQL query, optionally prefixed with EXPLAIN [ANALYZE].
+
+    Returns (sql_query, output, graph): the EDSQL that ran, the result
+    table HTML or a message, and a base64 chart or None.  checkpoint, if
+    given, is called between stages and may raise to abandon the query
+    (background jobs use it for cancellation and timeouts).  With raw,
+    only SELECTs are answered and output is the result DataFrame (a
+    string output is an error); nothing is rendered.
+    """
+    checkpoint = checkpoint or (lambda: None)
+    sql_query = ""
 
-    # LIMIT
-    if limit_clause:
-        try:
-            _, limit_val = limit_clause
-            result = result.head(int(limit_val))
-        except Exception as e:
-            return f"Error in LIMIT clause: {e}"
+    explain_prefix = ""
+    body = query
+    match = EXPLAIN_PREFIX.match(query)
+    if match:
+        explain_prefix = " ".join(match.group(0).upper().split()) + " "
+        body = query[match.end():]
+
+    stages = []  # front-end timings reported by EXPLAIN ANALYZE
+
+    start = time.perf_counter()
+    intent = classify_intent(body)
+    stages.append(StageStats("NL intent classification", time.perf_counter() - start))
+    metrics.inc("queries", intent=intent)
+    checkpoint()
+
+    # Show full table if intent is show_table
+    if intent == "show_table":
+        if raw:
+            return "SELECT * FROM students;", catalog.get("students"), None
+        if not explain_prefix:
+            return "SELECT * FROM students;", catalog.get("students").to_html(classes="table table-bordered"), None
+        sql_query = "SELECT * FROM students;"
+    elif "select" not in body.lower() and not EDSQL_COMMAND.match(body):
+        start = time.perf_counter()
+        entities = extract_entities(body)
+        stages.append(StageStats("NL entity extraction", time.perf_counter() - start))
+
+        start = time.perf_counter()
+        sql_query = convert_entities_to_edsql(body, intent, entities)
+        stages.append(StageStats("NL to EDSQL translation", time.perf_counter() - start))
+        if not sql_query:
+            start = time.perf_counter()
+            sql_query, _ = fallback_to_edsql(body)
+            stages.append(StageStats("NL nearest-neighbour fallback", time.perf_counter() - start))
+        if not sql_query:
+            return sql_query, "Sorry, couldn't understand the NLP.", None
+        checkpoint()
+    else:
+        sql_query = body
+    sql_query = explain_prefix + sql_query
 
-    # Column selection (remove duplicates, preserve order)
     try:
-        def unique_preserve_order(seq):
-            seen = set()
-            return [x for x in seq if not (x in seen or seen.add(x))]
+        start = time.perf_counter()
+        parsed = parse_query(sql_query)
+        stages.append(StageStats("EDSQL parse", time.perf_counter() - start))
+        if not parsed:
+            metrics.inc("parse_failures")
+            return sql_query, "Error parsing the SQL query.", None
+        checkpoint()
+
+        if raw and not isinstance(parsed, Select):
+            return sql_query, "Only SELECT queries return results here.", None
+
+        if isinstance(parsed, Explain):
+            try:
+                snapshot = catalog.snapshot(parsed.statement.tables)
+                for name in parsed.statement.tables:
+                    table_stats.ensure(name)
+                report = explain(parsed, snapshot, stages, table_stats)
+                return sql_query, f"<pre>{escape(report)}</pre>", None
+            except KeyError as e:
+                return sql_query, e.args[0], None
+            except QueryError as e:
+                return sql_query, str(e), None
+
+        if isinstance(parsed, (Insert, Delete)):
+            return sql_query, execute_write(parsed), None
+
+        if isinstance(parsed, AnalyzeTable):
+            try:
+                return sql_query, f"<pre>{escape(format_stats(table_stats.analyze(parsed.table)))}</pre>", None
+            except KeyError as e:
+                return sql_query, e.args[0], None
+
+        # Pin one version of every table read; identical plans against the
+        # same versions reuse the rendered result
+        try:
+            snapshot = catalog.snapshot(parsed.tables)
+        except KeyError as e:
+            return sql_query, e.args[0], None
+        for name in parsed.tables:
+            table_stats.ensure(name)
+        plan = plan_select(parsed, snapshot.schema())
+        cache_key = (snapshot.versions, plan, parsed.approx)
+        cached = results.get(cache_key)
+        if cached is not None and raw:
+            return sql_query, cached.result, None
+        if cached is not None and (cached.html is not None or cached.graph is not None):
+            return sql_query, cached.html, cached.graph
+
+        start = time.perf_counter()
+        if cached is not None:
+            result = cached.result  # cached by an API request: only render it
+        else:
+            result = execute_query(parsed, snapshot, checkpoint)
+
+        if isinstance(result, str):
+            return sql_query, result, None  # It's an error message
+        if raw:
+            results.put(cache_key, result, time.perf_counter() - start)
+            return sql_query, result, None
+
+        output = graph = None
+        # Generate plot if requested
+        if parsed.plot:
+            checkpoint()
+            try:
+                graph = render_plot(result, parsed.plot)
+            except Exception as e:
+                return sql_query, f"Error generating graph: {e}", None
+        else:
+            output = result.to_html(classes="table table-bordered")
+            if 'sample_rows' in result.attrs:
+                output = (f"<p>Approximate answer from {result.attrs['sample_rows']} sampled rows; "
+                          f"± columns are 95% confidence intervals.</p>" + output)
+        results.put(cache_key, result, time.perf_counter() - start, html=output, graph=graph)
+        return sql_query, output, graph
 
-        columns = [sel if isinstance(sel, str) else sel[1] for sel in select_list]
-        columns = unique_preserve_order(columns)
-        result = result[columns]
     except Exception as e:
-        return f"Error selecting columns: {e}"
-
-    return result
+        return sql_query, f"Unexpected error: {e}", None
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -111,74 +342,158 @@ def index():
 
     if request.method == "POST":
         query = request.form.get("query", "").strip()
-
         if not query:
             output = "Please enter a valid query."
-            return render_template("index.html", query=query, sql_query=sql_query, output=output, graph=graph)
-
-        intent = classify_intent(query)
-
-        # Show full table if intent is show_table
-        if intent == "show_table":
-            output = df.to_html(classes="table table-bordered")
-            return render_template("index.html", query=query, sql_query="SELECT * FROM students;", output=output, graph=None)
-
-        if "select" not in query.lower():
-            sql_query = convert_entities_to_edsql(query, intent)
-            if not sql_query:
-                output = "Sorry, couldn't understand the NLP."
-                return render_template("index.html", query=query, sql_query=sql_query, output=output, graph=graph)
         else:
-            sql_query = query
-
-        try:
-            parsed = parser.parse(sql_query)
-            if not parsed:
-                output = "Error parsing the SQL query."
-                return render_template("index.html", query=query, sql_query=sql_query, output=output, graph=graph)
-
-            result = execute_query(parsed)
-
-            if isinstance(result, str):
-                output = result  # It's an error message
-                return render_template("index.html", query=query, sql_query=sql_query, output=output, graph=graph)
-
-            # Generate plot if requested
-            plot_clause = parsed[5]
-            if plot_clause:
-                try:
-                    plot_type = plot_clause[1]
-                    fig, ax = plt.subplots()
-
-                    if plot_type == "BAR":
-                        result.plot(kind="bar", x=result.columns[0], y=result.columns[1], ax=ax)
-                    elif plot_type == "LINE":
-                        result.plot(kind="line", x=result.columns[0], y=result.columns[1], ax=ax)
-                    elif plot_type == "PIE":
-                        if result.shape[1] >= 2:
-                            data = result.set_index(result.columns[0])[result.columns[1]]
-                        else:
-                            data = result[result.columns[0]].value_counts()
-                        data.plot(kind="pie", ax=ax, autopct='%1.1f%%')
-                        ax.set_ylabel("")
-
-                    buf = io.BytesIO()
-                    plt.savefig(buf, format="png")
-                    buf.seek(0)
-                    graph = base64.b64encode(buf.getvalue()).decode()
-                    buf.close()
-                    plt.close(fig)
-                except Exception as e:
-                    output = f"Error generating graph: {e}"
-                    return render_template("index.html", query=query, sql_query=sql_query, output=output, graph=None)
-            else:
-                output = result.to_html(classes="table table-bordered")
-
-        except Exception as e:
-            output = f"Unexpected error: {e}"
+            sql_query, output, graph = answer_query(query)
+            query_log.record(query, sql_query)
 
     return render_template("index.html", query=query, sql_query=sql_query, output=output, graph=graph)
 
 
+@app.route("/api/query", methods=["GET", "POST"])
+def api_query():
+    """Run a SELECT (NL or EDSQL) and return the result table itself.
+
+    The format follows the Accept header (or ?format=json|ndjson|arrow)
+    and the body is compressed as Accept-Encoding allows; see serialize.
+    """
+    data = request.get_json(silent=True) or request.values
+    query = str(data.get("query", "")).strip()
+    if not query:
+        return {"error": "Please enter a valid query."}, 400
+
+    fmt = request.args.get("format")
+    if fmt is not None:
+        media_type = serialize.FORMATS.get(fmt)
+    elif request.headers.get("Accept"):
+        media_type = request.accept_mimetypes.best_match(serialize.MEDIA_TYPES)
+    else:
+        media_type = serialize.JSON
+    if media_type not in serialize.MEDIA_TYPES:
+        return {"error": f"Supported formats: {', '.join(serialize.MEDIA_TYPES)}."}, 406
+
+    sql_query, result, _ = answer_query(query, raw=True)
+    query_log.record(query, sql_query)
+    if isinstance(result, str):
+        return {"sql_query": sql_query, "error": result}, 400
+
+    payload = serialize.encode(result, media_type)
+    payload, encoding = serialize.compress(payload, request.accept_encodings.best_match(serialize.ENCODINGS))
+    response = Response(payload, mimetype=media_type)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    response.headers["X-EDSQL-Query"] = quote(sql_query, safe=" ,;*()=<>'")
+    return response
+
+
+def run_job(query, checkpoint):
+    sql_query, output, graph = answer_query(query, checkpoint)
+    query_log.record(query, sql_query)
+    return {"sql_query": sql_query, "output": output, "graph": graph}
+
+
+jobs = JobQueue(run_job)
+
+
+@app.route("/api/jobs", methods=["POST"])
+def submit_job():
+    data = request.get_json(silent=True) or request.form
+    query = str(data.get("query", "")).strip()
+    if not query:
+        return {"error": "Please enter a valid query."}, 400
+    try:
+        timeout = float(data.get("timeout", DEFAULT_TIMEOUT))
+        # min() lets NaN through, and a NaN deadline never passes
+        if not (math.isfinite(timeout) and timeout > 0):
+            raise ValueError("timeout must be a positive number of seconds.")
+        job = jobs.submit(query, data.get("priority", "interactive"), min(timeout, MAX_JOB_TIMEOUT))
+    except (TypeError, ValueError) as e:
+        return {"error": str(e)}, 400
+    except QueueFull as e:
+        return {"error": str(e)}, 503, {"Retry-After": "1"}
+    return job.as_dict(), 202, {"Location": f"/api/jobs/{job.id}"}
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        abort(404)
+    # ?wait=N long-polls for up to N seconds until the job finishes
+    wait = request.args.get("wait", type=float)
+    if wait:
+        jobs.wait(job, min(wait, MAX_LONG_POLL))
+    return job.as_dict()
+
+
+@app.route("/api/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    job = jobs.cancel(job_id)
+    if job is None:
+        abort(404)
+    return job.as_dict()
+
+
+# ------------------ Warm-up and readiness ------------------
+
+# Set until start_serving begins a warm-up, so an app that is only
+# imported (or served without one) reports ready
+ready = threading.Event()
+ready.set()
+warmup_status = {"queries": 0, "replayed": 0}
+
+
+def warm_up():
+    """Pay cold-start costs and replay the most frequent logged queries, then report ready.
+
+    Only queries that ran as a SELECT are replayed, as EDSQL, so the plan
+    cache, result/chart cache, statistics and lower-cased LIKE columns
+    are populated before the first user arrives.
+    """
+    start = time.perf_counter()
+    try:
+        # pandas and matplotlib set up their machinery on first use
+        sample = pd.DataFrame({"x": ["a", "b"], "y": [1, 2]})
+        sample.groupby("x")["y"].mean()
+        render_plot(sample, "BAR")
+
+        top = query_log.top()
+        warmup_status["queries"] = len(top)
+        for _, sql_query in top:
+            if sql_query and isinstance(parse_query(sql_query), Select):
+                answer_query(sql_query)
+                warmup_status["replayed"] += 1
+    except Exception:
+        pass  # warm-up is best effort; the worker still becomes ready
+    finally:
+        metrics.observe("warmup", time.perf_counter() - start)
+        metrics.set_gauge("ready", 1)
+        ready.set()
+
+
+@app.route("/healthz/ready")
+def healthz_ready():
+    if not ready.is_set():
+        return {"status": "warming up", **warmup_status}, 503
+    return {"status": "ready", **warmup_status}
+
+
+def start_serving():
+    """Start logging answered queries and warm up in the background.
+
+    Called by the process that serves requests: python app.py below, or a
+    WSGI server's post-fork hook.
+    """
+    query_log.path = LOG_PATH
+    ready.clear()
+    metrics.set_gauge("ready", 0)
+    threading.Thread(target=warm_up, daemon=True, name="edsql-warmup").start()
+
+
 if __name__ == "__main__":
+    # The debug reloader's parent process only watches files; its child serves
+    if is_running_from_reloader():
+        start_serving()
     app.run(debug=True)
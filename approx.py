@@ -0,0 +1,168 @@
+"""Approximate answers for aggregate queries (SELECT ... APPROX;).
+
+COUNT, SUM and AVG are estimated from the stratified sample kept with the
+table statistics (stats.StratifiedSample), so an approximate query costs
+the same however large the table grows.  Each estimate comes with the
+half-width of its 95% confidence interval in an extra "<column> ±"
+column.  Strata are weighted by their size in the table and every
+variance carries the finite population correction, so a stratum that is
+sampled completely contributes no error at all.
+
+approximate() returns None when a query cannot be estimated this way
+(joins, non-aggregate output, or COUNT(DISTINCT) under WHERE/GROUP BY)
+or when an interval is wider than the error bound the query asked for;
+the caller then runs it exactly.
+"""
+import numpy as np
+import pandas as pd
+
+from edsql_ast import Aggregate, Column, output_name
+from executor import OPERATORS, execute_plan, resolve_column
+from planner import Aggregation, Derive, Filter, Plot, Project, Scan, plan_nodes
+
+Z_95 = 1.959964
+ERROR_SUFFIX = " ±"
+
+
+def _totals(N, n, sums, squares):
+    """Stratified estimate of a population total and its variance.
+
+    N and n are the table and sample sizes of each stratum; sums and
+    squares are per-stratum sums of y and y² over the sampled rows
+    (y = 0 for rows the query does not match).
+    """
+    n_safe = np.maximum(n, 1)
+    estimate = float(np.sum(N * sums / n_safe))
+    spread = np.where(n > 1, (squares - sums * sums / n_safe) / np.maximum(n - 1, 1), 0.0)
+    fpc = np.where(N > 0, 1.0 - n / np.maximum(N, 1), 0.0)
+    variance = float(np.sum(N * N * fpc * np.maximum(spread, 0.0) / n_safe))
+    return estimate, variance
+
+
+def _estimate(func, N, n, count, total, squares):
+    """(estimate, CI half-width) for one aggregate in one group."""
+    if func == 'COUNT':
+        estimate, variance = _totals(N, n, count, count)
+        return round(estimate), Z_95 * np.sqrt(variance)
+    if func == 'SUM':
+        estimate, variance = _totals(N, n, total, squares)
+        return estimate, Z_95 * np.sqrt(variance)
+    # AVG: ratio of two totals, variance by linearization
+    rows, _ = _totals(N, n, count, count)
+    if rows <= 0:
+        return np.nan, np.nan
+    ratio = _totals(N, n, total, squares)[0] / rows
+    residuals = total - ratio * count
+    residual_squares = squares - 2 * ratio * total + ratio * ratio * count
+    _, variance = _totals(N, n, residuals, residual_squares)
+    return ratio, Z_95 * np.sqrt(variance) / rows
+
+
+def _distinct(stats, column):
+    column_stats = stats.columns.get(column)
+    if column_stats is None or stats.deleted:
+        return None               # deletes never reach the sketches or counts
+    if column_stats.frequencies is not None:
+        return column_stats.distinct, 0.0
+    # HyperLogLog standard error is 1.04 / sqrt(registers)
+    error = 1.04 / np.sqrt(len(column_stats.sketch.registers))
+    return column_stats.distinct, Z_95 * error * column_stats.distinct
+
+
+def _sample_aggregate(node, sample, matched):
+    """Estimate an Aggregation node from the sample rows that passed its child."""
+    keys = list(sample.population)
+    N = np.array([sample.population[k] for k in keys], dtype=np.float64)
+    n = np.array([sample.sizes.get(k, 0) for k in keys], dtype=np.float64)
+    stratum = pd.Index(keys, dtype=object).get_indexer(sample.strata[matched.index.to_numpy()])
+
+    if node.group_by:
+        group_column = resolve_column(matched, node.group_by)
+        codes, groups = pd.factorize(matched[group_column], sort=True)
+        valid = codes >= 0
+    else:
+        codes, groups = np.zeros(len(matched), dtype=np.intp), [None]
+        valid = np.ones(len(matched), dtype=bool)
+    cells = len(groups) * len(keys)
+    cell = codes * len(keys) + stratum
+
+    result = {} if node.group_by is None else {group_column: groups}
+    for item in node.items:
+        if not isinstance(item, Aggregate):
+            continue
+        if item.column == '*':
+            present = valid
+            values = np.zeros(len(matched))
+        else:
+            values = matched[resolve_column(matched, item.column)]
+            present = valid & values.notna().to_numpy()
+            values = values.to_numpy(dtype=np.float64, na_value=0.0) if item.func != 'COUNT' \
+                else np.zeros(len(matched))
+        count = np.bincount(cell[present], minlength=cells).reshape(len(groups), len(keys))
+        total = np.bincount(cell[present], values[present], minlength=cells).reshape(len(groups), len(keys))
+        squares = np.bincount(cell[present], values[present] ** 2, minlength=cells).reshape(len(groups), len(keys))
+        estimates = [_estimate(item.func, N, n, count[g], total[g], squares[g]) for g in range(len(groups))]
+        result[output_name(item)] = [e for e, _ in estimates]
+        result[output_name(item) + ERROR_SUFFIX] = [h for _, h in estimates]
+    return pd.DataFrame(result)
+
+
+def approximate(select, plan, stats):
+    """Estimate an aggregate query from stats.sample, or None to run it exactly.
+
+    select.approx is the largest acceptable CI half-width relative to each
+    estimate.  The result's attrs['sample_rows'] records the sample size.
+    """
+    sample = stats.sample if stats is not None else None
+    if select.approx is None or select.joins or sample is None:
+        return None
+    nodes = plan_nodes(plan)
+    position = next((i for i, node in enumerate(nodes) if isinstance(node, Aggregation)), None)
+    if position is None or not all(isinstance(node, (Scan, Derive, Filter)) for node in nodes[:position]):
+        return None
+    node = nodes[position]
+    if any(isinstance(item, Column) and item.name != node.group_by
+           or not isinstance(item, (Aggregate, Column)) for item in node.items):
+        return None
+
+    if any(isinstance(item, Aggregate) and item.func == 'COUNT DISTINCT' for item in node.items):
+        # Only the sketches know distinct counts, and only for the whole table
+        if node.group_by or position != 1 or \
+                not all(isinstance(item, Aggregate) and item.func == 'COUNT DISTINCT' for item in node.items):
+            return None
+        result = {}
+        for item in node.items:
+            distinct = _distinct(stats, item.column)
+            if distinct is None:
+                return None
+            result[output_name(item)], result[output_name(item) + ERROR_SUFFIX] = [distinct[0]], [distinct[1]]
+        data = pd.DataFrame(result)
+    else:
+        matched = execute_plan(node.child, sample.frame)
+        data = _sample_aggregate(node, sample, matched)
+
+    errors = [col for col in data.columns if col.endswith(ERROR_SUFFIX)]
+    for col in errors:
+        estimates = data[col[:-len(ERROR_SUFFIX)]].abs().to_numpy(dtype=np.float64)
+        widths = data[col].to_numpy(dtype=np.float64)
+        relative = np.divide(widths, estimates, out=np.full(len(widths), np.inf), where=estimates > 0)
+        relative[widths == 0] = 0.0
+        if len(relative) == 0 or np.any(np.isnan(widths)) or relative.max() > select.approx:
+            return None
+
+    # The operators above the aggregate run as usual, keeping the interval columns
+    plot = False
+    for upper in nodes[position + 1:]:
+        if isinstance(upper, Project):
+            columns = []
+            for col in upper.columns:
+                columns.append(col)
+                if col + ERROR_SUFFIX in errors:
+                    columns.append(col + ERROR_SUFFIX)
+            upper = Project(upper.child, tuple(columns))
+        plot = plot or isinstance(upper, Plot)
+        data = OPERATORS[type(upper)](upper, data)
+    if plot:
+        data = data.drop(columns=errors)
+    data.attrs['sample_rows'] = len(sample.frame)
+    return data
@@ -0,0 +1,52 @@
+"""Labelled natural language queries covering every classify_intent intent."""
+
+NL_CORPUS = [
+    # (query, expected intent)
+    ("what is the average grade of students", "average_query"),
+    ("show mean grade by class", "average_query"),
+    ("calculate the average score", "average_query"),
+    ("show performance score of students", "performance_query"),
+    ("list names with performance score greater than 70", "performance_query"),
+    ("draw a bar graph of grades by name", "plot_bar"),
+    ("show grades as a bar chart", "plot_bar"),
+    ("plot attendance as a line graph", "plot_line"),
+    ("show a line chart of grades", "plot_line"),
+    ("show a pie chart of class", "plot_pie"),
+    ("what is the distribution of sections", "plot_pie"),
+    ("top 5 students by grades", "top_n_query"),
+    ("who is the best student", "top_n_query"),
+    ("show students with grades greater than 80", "conditional_query"),
+    ("list students with attendance less than 60", "conditional_query"),
+    ("names with grades above 90", "conditional_query"),
+    ("show all students", "list_students"),
+    ("list student names", "list_students"),
+    ("display the table", "show_table"),
+    ("show everything", "show_table"),
+    ("add a new student record", "insert_query"),
+    ("register new entry", "insert_query"),
+    ("how many rows are there", "unknown"),
+    ("hello", "unknown"),
+]
+
+EDSQL_CORPUS = {
+    # clause type -> query
+    "scan": "SELECT * FROM students;",
+    "projection": "SELECT name, grades FROM students;",
+    "where_numeric": "SELECT name, grades FROM students WHERE grades > 80;",
+    "where_equals": "SELECT name FROM students WHERE section = 'A';",
+    "where_like_prefix": "SELECT name FROM students WHERE name LIKE 'a%';",
+    "where_like_contains": "SELECT name FROM students WHERE name LIKE '%sh%';",
+    "where_ends_with": "SELECT name FROM students WHERE name ENDS WITH 'Gupta';",
+    "group_by": "SELECT AVG(grades) FROM students GROUP BY class;",
+    "aggregate": "SELECT AVG(grades) FROM students;",
+    "order_by": "SELECT name, grades FROM students ORDER BY grades DESC;",
+    "order_by_limit": "SELECT name, grades FROM students ORDER BY grades DESC LIMIT 5;",
+    "limit": "SELECT name FROM students LIMIT 10;",
+    "custom_metric": "SELECT name, CUSTOM_METRIC(PERFORMANCE_SCORE, grades, attendance) FROM students;",
+}
+
+PLOT_CORPUS = {
+    "bar": "SELECT AVG(grades) FROM students GROUP BY class PLOT BAR GRAPH;",
+    "line": "SELECT AVG(attendance) FROM students GROUP BY class PLOT LINE GRAPH;",
+    "pie": "SELECT section FROM students PLOT PIE CHART;",
+}
@@ -0,0 +1,60 @@
+"""Synthetic students table generator for benchmarks.
+
+    python -m benchmarks.datagen --rows 1000000 --output students.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = [
+    'Aarav', 'Rohan', 'Meera', 'Ishita', 'Karan', 'Ananya', 'Vivaan', 'Diya',
+    'Kabir', 'Saanvi', 'Arjun', 'Myra', 'Reyansh', 'Kiara', 'Ayaan', 'Anika',
+]
+LAST_NAMES = [
+    'Sharma', 'Gupta', 'Choudhary', 'Singh', 'Bisht', 'Kandpal', 'Verma',
+    'Patel', 'Iyer', 'Reddy', 'Nair', 'Joshi', 'Mehta', 'Rawat', 'Negi',
+]
+
+
+def generate_students(rows, classes=12, sections=4, extra_columns=0, seed=0):
+    """Return a students DataFrame with the columns the app expects.
+
+    classes and sections set the cardinality of the 'class' and 'section'
+    columns; extra_columns adds numeric filler columns (score_0, ...).
+    """
+    rng = np.random.default_rng(seed)
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), rows)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), rows)]
+    section_labels = np.array([chr(ord('A') + i) for i in range(sections)], dtype=object)
+
+    df = pd.DataFrame({
+        'name': first + ' ' + last,
+        'id': np.arange(1, rows + 1),
+        'grades': rng.integers(30, 101, rows),
+        'class': rng.integers(1, classes + 1, rows),
+        'section': section_labels[rng.integers(0, sections, rows)],
+        'attendance': rng.integers(40, 101, rows),
+    })
+    for i in range(extra_columns):
+        df[f'score_{i}'] = rng.integers(0, 101, rows)
+    return df
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rows', type=int, default=1000)
+    ap.add_argument('--classes', type=int, default=12)
+    ap.add_argument('--sections', type=int, default=4)
+    ap.add_argument('--extra-columns', type=int, default=0)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--output', default='students.csv')
+    args = ap.parse_args()
+
+    df = generate_students(args.rows, args.classes, args.sections, args.extra_columns, args.seed)
+    df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df)} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
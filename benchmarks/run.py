@@ -0,0 +1,243 @@
+"""Benchmark the NL -> EDSQL -> result pipeline and emit JSON results.
+
+    python -m benchmarks.run --rows 1000,100000 --output bench.json
+    python -m benchmarks.run --compare bench.json   # diff against a previous run
+
+Scenarios: intent classification, entity extraction, NL translation,
+parsing, execution per clause type, chart rendering and end-to-end Flask
+request latency (with an empty result cache, and again as cache hits).
+The memory scenario times compact_frame and records the table's size
+before and after.  Select a subset with
+--scenarios nl,parse,memory,execute,plot,e2e.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.corpus import EDSQL_CORPUS, NL_CORPUS, PLOT_CORPUS
+from benchmarks.datagen import generate_students
+from storage import compact_frame, memory_bytes
+
+ALL_SCENARIOS = ('nl', 'parse', 'memory', 'execute', 'plot', 'e2e')
+
+
+def measure(func, min_time=0.2, min_iterations=3, max_iterations=1000):
+    """Time repeated calls of func (after one warm-up call)."""
+    func()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iterations and (
+            len(samples) < min_iterations or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'iterations': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': samples[len(samples) // 2] * 1000,
+        'p95_ms': samples[min(int(len(samples) * 0.95), len(samples) - 1)] * 1000,
+        'min_ms': samples[0] * 1000,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def skip(scenario, error):
+    print(f"skipping {scenario}: {error}", file=sys.stderr)
+
+
+# ------------------ Scenarios ------------------
+
+def bench_nl(args, record):
+    try:
+        from intent_classifie import classify_intent
+        from matcher_utils import extract_entities
+        from convert_to_edql import convert_entities_to_edsql
+    except (ImportError, OSError) as e:   # OSError: spaCy model not installed
+        skip('nl', e)
+        return
+
+    queries = [q for q, _ in NL_CORPUS]
+    correct = sum(classify_intent(q) == intent for q, intent in NL_CORPUS)
+
+    record('nl.classify_intent', None, measure(
+        lambda: [classify_intent(q) for q in queries], args.min_time),
+        queries=len(queries), accuracy=correct / len(NL_CORPUS))
+    record('nl.extract_entities', None, measure(
+        lambda: [extract_entities(q) for q in queries], args.min_time),
+        queries=len(queries))
+    record('nl.convert_entities_to_edsql', None, measure(
+        lambda: [convert_entities_to_edsql(q) for q in queries], args.min_time),
+        queries=len(queries))
+
+
+def bench_parse(args, record):
+    from edsql_compiler import parser
+
+    for clause, sql in EDSQL_CORPUS.items():
+        record(f'parse.{clause}', None, measure(lambda: parser.parse(sql), args.min_time))
+
+
+def bench_memory(args, record, raw, rows):
+    record('memory.compact_frame', rows, measure(lambda: compact_frame(raw), args.min_time),
+           raw_bytes=memory_bytes(raw), compact_bytes=memory_bytes(compact_frame(raw)))
+
+
+def bench_execute(args, record, df, rows):
+    from edsql_compiler import parser
+    from executor import execute_plan
+    from planner import plan_select, schema_of
+
+    schema = schema_of(df)
+    for clause, sql in EDSQL_CORPUS.items():
+        plan = plan_select(parser.parse(sql), schema)
+        record(f'execute.{clause}', rows, measure(lambda: execute_plan(plan, df), args.min_time))
+
+
+def bench_plot(args, record, df, rows):
+    from charts import render_plot
+    from edsql_compiler import parser
+    from executor import execute_plan
+    from planner import plan_select, schema_of
+
+    schema = schema_of(df)
+    for kind, sql in PLOT_CORPUS.items():
+        parsed = parser.parse(sql)
+        result = execute_plan(plan_select(parsed, schema), df)
+        record(f'plot.{kind}', rows, measure(lambda: render_plot(result, parsed.plot), args.min_time))
+
+
+def bench_e2e(args, record, df, rows, workdir):
+    # app registers students.csv relative to the working directory at import time
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        df.head(1).to_csv('students.csv', index=False)
+        import app as app_module
+    except (ImportError, OSError) as e:
+        skip('e2e', e)
+        return
+    finally:
+        os.chdir(cwd)
+    # index.html lives at the repository root rather than in templates/
+    app_module.app.template_folder = os.path.dirname(os.path.abspath(app_module.__file__))
+    app_module.catalog.put('students', df)
+    client = app_module.app.test_client()
+
+    queries = {
+        'nl_conditional': "show students with grades greater than 80",
+        'nl_top_n': "top 5 students by grades",
+        'edsql_group_by': EDSQL_CORPUS['group_by'],
+        'edsql_plot': PLOT_CORPUS['bar'],
+    }
+    def uncached(query):
+        # Every iteration would otherwise be answered from the result cache
+        app_module.results.clear()
+        return client.post('/', data={'query': query})
+
+    for label, query in queries.items():
+        record(f'e2e.{label}', rows, measure(lambda: uncached(query), args.min_time))
+        record(f'e2e.{label}.cached', rows, measure(
+            lambda: client.post('/', data={'query': query}), args.min_time))
+
+
+# ------------------ Driver ------------------
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r['scenario'], r['rows']): r for r in baseline['results']}
+    print(f"{'scenario':<40}{'rows':>10}{'old ms':>12}{'new ms':>12}{'ratio':>8}")
+    for r in current['results']:
+        prev = old.get((r['scenario'], r['rows']))
+        if prev is None:
+            continue
+        ratio = r['p50_ms'] / prev['p50_ms'] if prev['p50_ms'] else float('inf')
+        print(f"{r['scenario']:<40}{r['rows'] or '':>10}{prev['p50_ms']:>12.3f}{r['p50_ms']:>12.3f}{ratio:>8.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--rows', default='1000,100000',
+                    help='comma separated table sizes (1k to 10M)')
+    ap.add_argument('--classes', type=int, default=12)
+    ap.add_argument('--sections', type=int, default=4)
+    ap.add_argument('--extra-columns', type=int, default=0)
+    ap.add_argument('--scenarios', default=','.join(ALL_SCENARIOS))
+    ap.add_argument('--min-time', type=float, default=0.2,
+                    help='minimum seconds spent per scenario')
+    ap.add_argument('--output', help='write JSON results here (default: stdout)')
+    ap.add_argument('--compare', help='previous JSON results to compare against')
+    args = ap.parse_args()
+
+    # Measure the configuration the app runs with (see app.py)
+    pd.set_option("mode.copy_on_write", True)
+    scenarios = set(args.scenarios.split(','))
+    sizes = [int(r) for r in args.rows.split(',') if r]
+    results = []
+
+    def record(scenario, rows, stats, **extra):
+        results.append({'scenario': scenario, 'rows': rows, **stats, **extra})
+        print(f"{scenario:<40}{rows or '':>10}{stats['p50_ms']:>12.3f} ms", file=sys.stderr)
+
+    if 'nl' in scenarios:
+        bench_nl(args, record)
+    if 'parse' in scenarios:
+        bench_parse(args, record)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            raw = generate_students(rows, args.classes, args.sections, args.extra_columns)
+            if 'memory' in scenarios:
+                bench_memory(args, record, raw, rows)
+            # Benchmark the layout the app keeps tables in (see storage.py)
+            df = compact_frame(raw)
+            if 'execute' in scenarios:
+                bench_execute(args, record, df, rows)
+            if 'plot' in scenarios:
+                bench_plot(args, record, df, rows)
+            if 'e2e' in scenarios:
+                bench_e2e(args, record, df, rows, workdir)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'config': {
+            'rows': sizes, 'classes': args.classes, 'sections': args.sections,
+            'extra_columns': args.extra_columns,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import os
+import threading
+import weakref
+
+import pandas as pd
+
+from partitions import partition_table, remember
+from planner import schema_of
+from storage import compact_frame, load_table
+
+READERS = {
+    ".csv": pd.read_csv,
+    ".parquet": pd.read_parquet,
+    ".feather": pd.read_feather,
+}
+
+
+class Snapshot:
+    """A consistent, read-only view of some tables, each at one version.
+
+    A query pins a snapshot once and reads only from it, so writers that
+    publish new versions meanwhile can never produce a torn read.  The
+    frames it references stay alive for as long as the snapshot does.
+    """
+    __slots__ = ('tables', 'versions')
+
+    def __init__(self, tables, versions):
+        self.tables = tables        # {name: DataFrame}
+        self.versions = versions    # ((name, version), ...) sorted by name
+
+    def __getitem__(self, name):
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise KeyError(f"Unknown table '{name}'.")
+
+    def __contains__(self, name):
+        return name in self.tables
+
+    def schema(self, names=None):
+        """Combined schema of the given (default: all pinned) tables."""
+        schema = []
+        for name in dict.fromkeys(names or self.tables):
+            schema.extend(schema_of(self[name]))
+        return tuple(schema)
+
+
+class Catalog:
+    """Named tables, loaded lazily from CSV/columnar files on first use.
+
+    Every table is published as an immutable (version, DataFrame) pair.
+    Readers take the current pair without locking; writers of a table are
+    serialized, build the next version off to the side and publish it with
+    a single assignment.  Old versions are freed once no snapshot (or
+    cached result) references them.
+
+    Pinning a version is only free, and only safe, with pandas
+    copy-on-write enabled: frames derived from a snapshot (projections,
+    assign, filters) then share its column blocks and copy a column only
+    when it is written to.  The option is process-wide, so the entry
+    points (app.py, main.py, benchmarks/run.py) turn it on, not this module.
+    """
+
+    def __init__(self):
+        self._paths = {}
+        self._current = {}                  # name -> (version, DataFrame)
+        self._versions = {}                 # name -> last version handed out
+        self._retired = weakref.WeakValueDictionary()  # (name, version) -> DataFrame
+        self._writers = {}
+        self._partition_keys = {}           # name -> column the table is clustered on
+        self._lock = threading.Lock()
+
+    def register(self, name, path):
+        """Make a file available as table name; it is read on first reference."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in READERS:
+            raise ValueError(f"Unsupported table file type: {path}")
+        with self._lock:
+            self._paths[name] = os.path.abspath(path)
+            if self._current.pop(name, None) is not None:
+                # The file replaces the loaded data: move to a new version
+                self._versions[name] += 1
+
+    def register_directory(self, directory):
+        """Register every supported file in directory under its file stem."""
+        for entry in sorted(os.listdir(directory)):
+            stem, ext = os.path.splitext(entry)
+            if ext.lower() in READERS and stem not in self._paths:
+                self.register(stem, os.path.join(directory, entry))
+
+    def __contains__(self, name):
+        return name in self._paths or name in self._current
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def _entry(self, name):
+        entry = self._current.get(name)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._current.get(name)
+            if entry is None:
+                path = self._paths.get(name)
+                if path is None:
+                    raise KeyError(f"Unknown table '{name}'.")
+                ext = os.path.splitext(path)[1].lower()
+                if ext == ".csv":
+                    table = load_table(path)
+                else:
+                    table = compact_frame(READERS[ext](path))
+                table = self._cluster(name, table)
+                entry = (self._versions.setdefault(name, 0), table)
+                self._current[name] = entry
+            return entry
+
+    def get(self, name):
+        """The current version of a table (treat it as read-only)."""
+        return self._entry(name)[1]
+
+    def snapshot(self, names):
+        """Pin the current version of each named table."""
+        entries = {name: self._entry(name) for name in dict.fromkeys(names)}
+        tables = {name: table for name, (_, table) in entries.items()}
+        versions = tuple(sorted((name, version) for name, (version, _) in entries.items()))
+        return Snapshot(tables, versions)
+
+    def _writer(self, name):
+        with self._lock:
+            return self._writers.setdefault(name, threading.Lock())
+
+    def _cluster(self, name, table):
+        column = self._partition_keys.get(name)
+        if column is None or column not in table.columns:
+            return table
+        table, layout = partition_table(table, column)
+        return remember(table, layout)
+
+    def partition_by(self, name, column):
+        """Store table name clustered on column from now on (None to stop).
+
+        Each partition becomes a contiguous range of rows, and every
+        version published later (INSERTs included) is kept that way.
+        """
+        with self._writer(name):
+            with self._lock:
+                if column is None:
+                    self._partition_keys.pop(name, None)
+                else:
+                    self._partition_keys[name] = column
+                loaded = name in self._current
+            if loaded and column is not None:
+                self._publish(name, self.get(name))
+
+    def _publish(self, name, table):
+        # Routing rows into their partitions happens before taking the lock
+        table = self._cluster(name, table)
+        with self._lock:
+            old = self._current.get(name)
+            if old is not None:
+                self._retired[name, old[0]] = old[1]
+            version = self._versions.get(name, 0) + 1
+            self._versions[name] = version
+            self._current[name] = (version, table)
+            return version
+
+    def put(self, name, table):
+        """Publish table as the next version of name; returns the version."""
+        with self._writer(name):
+            return self._publish(name, table)
+
+    def update(self, name, func):
+        """Publish the table func derives from the current version.
+
+        func(table) returns (new_table, extra) and must not modify table.
+        Writers of one table run one at a time; readers never wait and keep
+        whichever version they pinned.  If func raises, nothing is
+        published.  Returns (new version, extra).
+        """
+        with self._writer(name):
+            table, extra = func(self.get(name))
+            return self._publish(name, table), extra
+
+    def version(self, name):
+        return self._versions.get(name, 0)
+
+    def live_versions(self):
+        """Superseded (table, version) pairs still referenced by a reader."""
+        return sorted(self._retired.keys())
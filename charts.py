@@ -0,0 +1,35 @@
+import matplotlib
+matplotlib.use('Agg')  # Non-GUI backend for plotting
+from matplotlib.figure import Figure
+import io
+import base64
+
+import metrics
+
+
+@metrics.instrument("render_plot")
+def render_plot(result, plot_type):
+    """Render a BAR/LINE/PIE chart of the result as a base64 PNG string.
+
+    The figure is built without pyplot, whose "current figure" is shared
+    by every thread, so charts rendered by concurrent jobs never mix.
+    """
+    fig = Figure()
+    ax = fig.subplots()
+    if plot_type == "BAR":
+        result.plot(kind="bar", x=result.columns[0], y=result.columns[1], ax=ax)
+    elif plot_type == "LINE":
+        result.plot(kind="line", x=result.columns[0], y=result.columns[1], ax=ax)
+    elif plot_type == "PIE":
+        if result.shape[1] >= 2:
+            data = result.set_index(result.columns[0])[result.columns[1]]
+        else:
+            data = result[result.columns[0]].value_counts()
+        data.plot(kind="pie", ax=ax, autopct='%1.1f%%')
+        ax.set_ylabel("")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    graph = base64.b64encode(buf.getvalue()).decode()
+    buf.close()
+    return graph
@@ -1,7 +1,12 @@
+import re
+
 from matcher_utils import extract_entities
+import metrics
 
-def convert_entities_to_edsql(nl_query, intent=None):
-    entities = extract_entities(nl_query)
+@metrics.instrument("convert_entities_to_edsql")
+def convert_entities_to_edsql(nl_query, intent=None, entities=None):
+    if entities is None:
+        entities = extract_entities(nl_query)
 
     column = entities.get("column")           # e.g., "grades", "attendance", "name"
     operator = entities.get("operator")       # e.g., ">", "<", "="
@@ -14,15 +19,36 @@ def convert_entities_to_edsql(nl_query, intent=None):
     order = entities.get("order")
     limit = entities.get("limit")
     custom = entities.get("custom_metric")
+    course = entities.get("course")
+    approx = " APPROX" if entities.get("approx") else ""
 
     if operator: operator = operator.upper()
     if order: order = order.upper()
 
     nl_query_lower = nl_query.lower()
 
+    # "average grade of each class": a column after by/per/each/every is
+    # the grouping key, not the aggregated column
+    grouped = re.search(r"\b(?:by|per|each|every)\s+(class|section)\b", nl_query_lower)
+    if agg and grouped:
+        group_by = group_by or grouped.group(1)
+        if column == group_by:
+            column = None
+
     # Check if user explicitly asked for 'name'
     wants_name = 'name' in nl_query_lower
 
+    # Students in a course: enrollments(student_id, course_id) links
+    # students to courses(course_id, course_name)
+    if course:
+        joins = ("FROM students JOIN enrollments ON id = student_id "
+                 "JOIN courses ON enrollments.course_id = courses.course_id")
+        where = f"WHERE course_name LIKE '{course}'"
+        if agg == "AVG" and column and column != "name":
+            return f"SELECT AVG({column}) {joins} {where};"
+        cols = "name" if column in (None, "name") else f"name, {column}"
+        return f"SELECT {cols} {joins} {where};"
+
     # Handle LIKE operator based on natural language clues
     if column == 'name':
         if 'start with' in nl_query_lower:
@@ -49,8 +75,9 @@ def convert_entities_to_edsql(nl_query, intent=None):
         return f"SELECT {x}, {y} FROM students PLOT {plot} GRAPH;"
 
     # Aggregation with GROUP BY
-    if agg and column and group_by:
-        return f"SELECT {agg}({column}) FROM students GROUP BY {group_by};"
+    if agg and group_by and (column or agg == "COUNT"):
+        expr = "COUNT(*)" if agg == "COUNT" else f"{agg}({column})"
+        return f"SELECT {expr} FROM students GROUP BY {group_by}{approx};"
 
     # Custom metric with WHERE
     if custom and operator and value is not None:
@@ -67,6 +94,12 @@ def convert_entities_to_edsql(nl_query, intent=None):
         cols = "name, " if wants_name else ""
         return f"SELECT {cols}CUSTOM_METRIC({custom}, grades, attendance) FROM students;"
 
+    # Aggregation over the whole table, optionally filtered
+    if agg == "COUNT" or (agg in ("AVG", "SUM") and column not in (None, "name")):
+        expr = "COUNT(*)" if agg == "COUNT" else f"{agg}({column})"
+        where = f" WHERE {column} {operator} {value}" if column and operator and value is not None else ""
+        return f"SELECT {expr} FROM students{where}{approx};"
+
     # Filtered WHERE clause
     if column and operator and value is not None:
         cols = f"{column}"
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+# ------------------ AST Nodes ------------------
+# Every node is a frozen, slotted dataclass so parsed queries are small,
+# immutable and hashable (they can be used directly as cache keys).
+
+
+@dataclass(frozen=True, slots=True)
+class Column:
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class Star:
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Aggregate:
+    func: str      # 'AVG', 'SUM', 'COUNT' or 'COUNT DISTINCT'
+    column: str    # '*' for COUNT(*)
+
+
+@dataclass(frozen=True, slots=True)
+class FuncCall:
+    name: str
+    args: Tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CustomMetric:
+    name: str      # upper-cased metric name, e.g. 'PERFORMANCE_SCORE'
+    args: Tuple[str, ...]
+
+
+Expression = Union[Column, Star, Aggregate, FuncCall, CustomMetric]
+
+
+@dataclass(frozen=True, slots=True)
+class Condition:
+    column: str
+    op: str        # '>', '<', '=', 'LIKE', 'ENDS WITH'
+    value: Union[int, float, str]
+
+
+@dataclass(frozen=True, slots=True)
+class OrderBy:
+    column: str
+    direction: str  # 'ASC' or 'DESC'
+
+    @property
+    def ascending(self):
+        return self.direction.upper() == 'ASC'
+
+
+@dataclass(frozen=True, slots=True)
+class Join:
+    table: str
+    left_key: str   # column of the rows joined so far
+    right_key: str  # column of table
+
+
+@dataclass(frozen=True, slots=True)
+class Select:
+    columns: Tuple[Expression, ...]
+    table: str
+    where: Optional[Condition] = None
+    group_by: Optional[str] = None
+    plot: Optional[str] = None      # 'BAR', 'LINE' or 'PIE'
+    order_by: Optional[OrderBy] = None
+    limit: Optional[int] = None
+    joins: Tuple[Join, ...] = ()
+    approx: Optional[float] = None  # APPROX: acceptable relative error (0.01 = 1%)
+
+    @property
+    def tables(self):
+        """Every table the query reads, base table first."""
+        return (self.table,) + tuple(join.table for join in self.joins)
+
+
+@dataclass(frozen=True, slots=True)
+class Insert:
+    values: Tuple[Tuple[str, Union[int, str]], ...]
+
+    def as_dict(self):
+        return dict(self.values)
+
+
+@dataclass(frozen=True, slots=True)
+class Delete:
+    where: Optional[Condition] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Explain:
+    statement: Select
+    analyze: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class AnalyzeTable:
+    table: str
+
+
+Statement = Union[Select, Insert, Delete, Explain, AnalyzeTable]
+
+
+def output_name(expr):
+    """Name of the result column an expression produces."""
+    if isinstance(expr, Column):
+        return expr.name
+    if isinstance(expr, Aggregate):
+        if expr.func == 'AVG':
+            return expr.column   # AVG results keep the column's name
+        if expr.func == 'COUNT DISTINCT':
+            return f"COUNT(DISTINCT {expr.column})"
+        return f"{expr.func}({expr.column})"
+    if isinstance(expr, (FuncCall, CustomMetric)):
+        return expr.name.upper()
+    return '*'
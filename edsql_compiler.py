@@ -3,6 +3,13 @@ import ply.yacc as yacc
 import pandas as pd
 import matplotlib.pyplot as plt  # Keep for plotting if needed later
 
+from edsql_ast import (
+    Aggregate, AnalyzeTable, Column, Condition, CustomMetric, Delete, Explain,
+    FuncCall, Insert, Join, OrderBy, Select, Star,
+)
+from catalog import Catalog
+from string_match import ends_with_mask, like_mask
+
 # ------------------ Lexical Analysis ------------------
 
 tokens = (
@@ -10,7 +17,8 @@ tokens = (
     'IDENTIFIER', 'NUMBER', 'STRING', 'COMMA', 'GREATER_THAN', 'LESS_THAN', 'EQUALS', 'ASTERISK', 'SEMICOLON',
     'LPAREN', 'RPAREN', 'AVG', 'GROUP', 'BY', 'ORDER', 'LIMIT', 'ASC', 'DESC', 'LIKE',
     'CUSTOM_METRIC', 'ENDS', 'WITH',
-    'INSERT', 'DELETE'
+    'INSERT', 'DELETE', 'EXPLAIN', 'ANALYZE', 'JOIN', 'ON',
+    'SUM', 'COUNT', 'DISTINCT', 'APPROX', 'ERROR', 'PERCENT'
 )
 
 reserved = {
@@ -24,7 +32,16 @@ reserved = {
     'ENDS': 'ENDS',
     'WITH': 'WITH',
     'INSERT': 'INSERT',
-    'DELETE': 'DELETE'
+    'DELETE': 'DELETE',
+    'EXPLAIN': 'EXPLAIN',
+    'ANALYZE': 'ANALYZE',
+    'JOIN': 'JOIN',
+    'ON': 'ON',
+    'SUM': 'SUM',
+    'COUNT': 'COUNT',
+    'DISTINCT': 'DISTINCT',
+    'APPROX': 'APPROX',
+    'ERROR': 'ERROR'
 }
 
 t_SELECT = r'SELECT'
@@ -49,6 +66,16 @@ t_ENDS = r'ENDS'
 t_WITH = r'WITH'
 t_INSERT = r'INSERT'
 t_DELETE = r'DELETE'
+t_EXPLAIN = r'EXPLAIN'
+t_ANALYZE = r'ANALYZE'
+t_JOIN = r'JOIN'
+t_ON = r'ON'
+t_SUM = r'SUM'
+t_COUNT = r'COUNT'
+t_DISTINCT = r'DISTINCT'
+t_APPROX = r'APPROX'
+t_ERROR = r'ERROR'
+t_PERCENT = r'%'
 t_COMMA = r','
 t_GREATER_THAN = r'>'
 t_LESS_THAN = r'<'
@@ -61,7 +88,7 @@ t_RPAREN = r'\)'
 t_ignore = ' \t'
 
 def t_IDENTIFIER(t):
-    r'[a-zA-Z_][a-zA-Z0-9_]*'
+    r'[a-zA-Z_][a-zA-Z0-9_]*(\.[a-zA-Z_][a-zA-Z0-9_]*)?'
     t.type = reserved.get(t.value.upper(), 'IDENTIFIER')
     return t
 
@@ -86,19 +113,45 @@ lexer = lex.lex()
 
 # ------------------ Parser ------------------
 
+# Relative error accepted by a bare APPROX
+DEFAULT_APPROX_ERROR = 0.05
+
 def p_query(p):
     '''query : select_query
              | insert_query
-             | delete_query'''
+             | delete_query
+             | explain_query
+             | analyze_query'''
     p[0] = p[1]
 
 def p_select_query(p):
-    '''select_query : SELECT select_list FROM IDENTIFIER where_clause group_by_clause plot_clause order_clause limit_clause SEMICOLON'''
-    p[0] = ('SELECT', p[2], p[4], p[5], p[6], p[7], p[8], p[9], p[10])
+    '''select_query : SELECT select_list FROM IDENTIFIER join_list where_clause group_by_clause plot_clause order_clause limit_clause approx_clause SEMICOLON'''
+    p[0] = Select(tuple(p[2]), p[4], p[6], p[7], p[8], p[9], p[10], tuple(p[5]), p[11])
+
+def p_join_list(p):
+    '''join_list : join_clause join_list
+                 | empty'''
+    p[0] = [p[1]] + p[2] if len(p) == 3 else []
+
+def p_join_clause(p):
+    '''join_clause : JOIN IDENTIFIER ON IDENTIFIER EQUALS IDENTIFIER'''
+    p[0] = Join(p[2], p[4], p[6])
+
+def p_explain_query(p):
+    '''explain_query : EXPLAIN select_query
+                     | EXPLAIN ANALYZE select_query'''
+    if len(p) == 4:
+        p[0] = Explain(p[3], analyze=True)
+    else:
+        p[0] = Explain(p[2])
+
+def p_analyze_query(p):
+    '''analyze_query : ANALYZE IDENTIFIER SEMICOLON'''
+    p[0] = AnalyzeTable(p[2])
 
 def p_insert_query(p):
     '''insert_query : INSERT insert_items SEMICOLON'''
-    p[0] = ('INSERT', p[2])
+    p[0] = Insert(tuple(p[2].items()))
 
 def p_insert_items(p):
     '''insert_items : insert_item COMMA insert_items
@@ -115,7 +168,7 @@ def p_insert_item(p):
 
 def p_delete_query(p):
     '''delete_query : DELETE where_clause SEMICOLON'''
-    p[0] = ('DELETE', p[2])
+    p[0] = Delete(p[2])
 
 def p_value(p):
     '''value : NUMBER
@@ -127,7 +180,7 @@ def p_select_list(p):
                    | expression COMMA select_list
                    | expression'''
     if p[1] == '*':
-        p[0] = ['*']
+        p[0] = [Star()]
     elif len(p) == 4:
         p[0] = [p[1]] + p[3]
     else:
@@ -137,21 +190,32 @@ def p_expression(p):
     '''expression : IDENTIFIER
                   | function_call
                   | avg_function
+                  | aggregate_function
                   | custom_metric'''
-    p[0] = p[1]
+    p[0] = Column(p[1]) if isinstance(p[1], str) else p[1]
 
 def p_function_call(p):
     '''function_call : IDENTIFIER LPAREN arg_list RPAREN'''
-    p[0] = ('FUNC_CALL', p[1], p[3])
+    p[0] = FuncCall(p[1], tuple(p[3]))
+
+def p_aggregate_function(p):
+    '''aggregate_function : SUM LPAREN IDENTIFIER RPAREN
+                          | COUNT LPAREN IDENTIFIER RPAREN
+                          | COUNT LPAREN ASTERISK RPAREN
+                          | COUNT LPAREN DISTINCT IDENTIFIER RPAREN'''
+    if len(p) == 6:
+        p[0] = Aggregate('COUNT DISTINCT', p[4])
+    else:
+        p[0] = Aggregate(p[1].upper(), p[3])
 
 def p_avg_function(p):
     '''avg_function : AVG LPAREN IDENTIFIER RPAREN'''
-    p[0] = ('AVG', p[3])
+    p[0] = Aggregate('AVG', p[3])
 
 def p_custom_metric(p):
     '''custom_metric : CUSTOM_METRIC LPAREN IDENTIFIER COMMA arg_list RPAREN'''
     metric_name = p[3].upper()
-    p[0] = ('CUSTOM_METRIC', metric_name, *p[5])
+    p[0] = CustomMetric(metric_name, tuple(p[5]))
 
 def p_arg_list(p):
     '''arg_list : IDENTIFIER COMMA arg_list
@@ -164,7 +228,7 @@ def p_arg_list(p):
 def p_where_clause(p):
     '''where_clause : WHERE condition
                     | empty'''
-    p[0] = ('WHERE', p[2]) if len(p) == 3 else None
+    p[0] = p[2] if len(p) == 3 else None
 
 def p_condition(p):
     '''condition : IDENTIFIER GREATER_THAN NUMBER
@@ -174,21 +238,21 @@ def p_condition(p):
                  | IDENTIFIER EQUALS NUMBER
                  | IDENTIFIER ENDS WITH STRING'''
     if len(p) == 4:
-        p[0] = ('CONDITION', p[1], p[2], p[3])
+        p[0] = Condition(p[1], p[2], p[3])
     else:
         # ENDS WITH case (5 tokens)
-        p[0] = ('CONDITION', p[1], 'ENDS WITH', p[4])
+        p[0] = Condition(p[1], 'ENDS WITH', p[4])
 
 def p_group_by_clause(p):
     '''group_by_clause : GROUP BY IDENTIFIER
                        | empty'''
-    p[0] = ('GROUP BY', p[3]) if len(p) == 4 else None
+    p[0] = p[3] if len(p) == 4 else None
 
 def p_order_clause(p):
     '''order_clause : ORDER BY IDENTIFIER order_direction
                     | empty'''
     if len(p) == 5:
-        p[0] = ('ORDER BY', p[3], p[4])
+        p[0] = OrderBy(p[3], p[4].upper())
     else:
         p[0] = None
 
@@ -201,16 +265,26 @@ def p_limit_clause(p):
     '''limit_clause : LIMIT NUMBER
                     | empty'''
     if len(p) == 3:
-        p[0] = ('LIMIT', p[2])
+        p[0] = p[2]
     else:
         p[0] = None
 
+def p_approx_clause(p):
+    '''approx_clause : APPROX
+                     | APPROX WITH ERROR NUMBER PERCENT
+                     | WITH ERROR NUMBER PERCENT
+                     | empty'''
+    if len(p) == 2:
+        p[0] = DEFAULT_APPROX_ERROR if p[1] else None
+    else:
+        p[0] = p[len(p) - 2] / 100
+
 def p_plot_clause(p):
     '''plot_clause : PLOT BAR GRAPH
                    | PLOT LINE GRAPH
                    | PLOT PIE CHART
                    | empty'''
-    p[0] = ('PLOT', p[2]) if len(p) == 4 else None
+    p[0] = p[2].upper() if len(p) == 4 else None
 
 def p_empty(p):
     'empty :'
@@ -226,15 +300,18 @@ parser = yacc.yacc()
 
 # ------------------ Data and Execution ------------------
 
-# Sample DataFrame simulating a table named "students"
-df_students = pd.DataFrame({
+# Sample DataFrame simulating a table named "students".  Queries read the
+# currently published version; writes publish a new one, so a reader never
+# sees a half-applied INSERT/DELETE.
+tables = Catalog()
+tables.put('students', pd.DataFrame({
     'id': [1, 2, 3, 4],
     'name': ['Aarav Choudhary', 'Rohan Sharma', 'Meera Choudhary', 'Ishita Gupta']
-})
+}))
 
 def evaluate_condition(df, condition):
-    """Filter DataFrame based on simple condition tuples."""
-    col, op, val = condition[1], condition[2], condition[3]
+    """Filter DataFrame based on a Condition node."""
+    col, op, val = condition.column, condition.op, condition.value
     if op == '=':
         return df[df[col] == val]
     elif op == '>':
@@ -242,58 +319,46 @@ def evaluate_condition(df, condition):
     elif op == '<':
         return df[df[col] < val]
     elif op == 'LIKE':
-        pattern = val.replace('%', '.*')
-        return df[df[col].str.match(pattern)]
+        return df[like_mask(df, col, val, case=True)]
     elif op == 'ENDS WITH':
-        return df[df[col].str.endswith(val)]
+        return df[ends_with_mask(df, col, val)]
     else:
         print(f"Unsupported operator {op}")
         return df
 
 def process_query(parsed):
-    global df_students  # Declare once at the start
-
-    if parsed[0] == 'SELECT':
-        # Unpack 9 elements from parsed tuple (including semicolon at the end)
-        _, select_list, table_name, where_clause, group_by, plot, order_by, limit, _ = parsed
-        df = df_students if table_name == 'students' else pd.DataFrame()
+    if isinstance(parsed, Select):
+        df = tables.get(parsed.table) if parsed.table in tables else pd.DataFrame()
 
         # WHERE filtering
-        if where_clause and where_clause[1]:
-            df = evaluate_condition(df, where_clause[1])
+        if parsed.where:
+            df = evaluate_condition(df, parsed.where)
 
         # SELECT columns (handle '*')
-        if select_list == ['*']:
+        if any(isinstance(item, Star) for item in parsed.columns):
             selected_df = df
         else:
-            columns = []
-            for item in select_list:
-                if isinstance(item, tuple) and item[0] == 'AVG':
-                    # For now, skip aggregate processing (can be added later)
-                    continue
-                elif isinstance(item, tuple) and item[0] == 'FUNC_CALL':
-                    # For now, skip function calls (can be added later)
-                    continue
-                else:
-                    columns.append(item)
+            # Aggregates and function calls are skipped for now
+            columns = [item.name for item in parsed.columns if isinstance(item, Column)]
             selected_df = df[columns] if columns else df
 
         # TODO: Implement GROUP BY, ORDER BY, LIMIT, and PLOT if needed
         print(selected_df)
 
-    elif parsed[0] == 'INSERT':
-        data_to_insert = parsed[1]
-        # Append new data row to df_students
-        df_students = pd.concat([df_students, pd.DataFrame([data_to_insert])], ignore_index=True)
+    elif isinstance(parsed, Insert):
+        data_to_insert = parsed.as_dict()
+        # Append new data row to the students table
+        tables.update('students', lambda df: (
+            pd.concat([df, pd.DataFrame([data_to_insert])], ignore_index=True), None))
         print("Inserted:", data_to_insert)
 
-    elif parsed[0] == 'DELETE':
-        where_clause = parsed[1]
-        if where_clause and where_clause[1]:
-            filtered_df = evaluate_condition(df_students, where_clause[1])
-            to_delete_ids = filtered_df.index
-            df_students = df_students.drop(to_delete_ids).reset_index(drop=True)
-            print(f"Deleted rows matching condition: {where_clause[1]}")
+    elif isinstance(parsed, Delete):
+        if parsed.where:
+            def delete_rows(df):
+                to_delete_ids = evaluate_condition(df, parsed.where).index
+                return df.drop(to_delete_ids).reset_index(drop=True), None
+            tables.update('students', delete_rows)
+            print(f"Deleted rows matching condition: {parsed.where}")
 
 # ------------------ Testing the Combined Parser ------------------
 
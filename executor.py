@@ -0,0 +1,476 @@
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from edsql_ast import Aggregate, Column, Delete, Insert, output_name
+from partitions import layout_of, map_partitions, remember
+from storage import append_records
+from string_match import ends_with_mask, like_mask, plan_like
+from planner import (
+    STAGE_NAMES, Aggregation, Derive, Filter, Join, Limit, Plot, Project, Scan,
+    Sort, plan_nodes,
+)
+
+# Probe-side rows looked up in the join hash table per vectorized batch
+JOIN_BATCH_ROWS = 65536
+
+
+class QueryError(Exception):
+    """Raised when a plan stage fails; the message is shown to the user."""
+
+
+# ------------------ Custom Metrics ------------------
+
+def performance_score(df):
+    if 'grades' in df.columns and 'attendance' in df.columns:
+        return 0.6 * df['grades'] + 0.4 * df['attendance']
+    raise KeyError("Missing 'grades' or 'attendance' for PERFORMANCE_SCORE")
+
+
+CUSTOM_METRICS = {
+    'PERFORMANCE_SCORE': performance_score,
+}
+
+AGGREGATE_FUNCS = {
+    'AVG': 'mean',
+    'SUM': 'sum',
+    'COUNT': 'count',
+    'COUNT DISTINCT': 'nunique',
+}
+
+
+# ------------------ Operators ------------------
+
+def resolve_column(df, name):
+    """Column of df that a possibly table-qualified name ('courses.title') means."""
+    if name in df.columns or '.' not in name:
+        return name
+    bare = name.split('.', 1)[1]
+    return bare if bare in df.columns else name
+
+
+def categorical_mask(series, op, value):
+    """Evaluate a comparison once per category, then gather by integer code."""
+    categories = series.cat.categories
+    value = float(value) if pd.api.types.is_numeric_dtype(categories) else str(value)
+    if op == '=':
+        hits = categories == value
+    elif op == '>':
+        hits = categories > value
+    else:
+        hits = categories < value
+    # Missing values have code -1, which picks the trailing False
+    lookup = np.append(np.asarray(hits, dtype=bool), False)
+    return lookup[series.cat.codes.to_numpy()]
+
+
+def filter_frame(df, condition):
+    """Return the rows of df matching a Condition node."""
+    column, op, value = resolve_column(df, condition.column), condition.op, condition.value
+    series = df[column]
+
+    if isinstance(series.dtype, pd.CategoricalDtype) and op in ('>', '<', '='):
+        return df[categorical_mask(series, op, value)]
+
+    if op == 'LIKE':
+        return df[like_mask(df, column, value)]
+    if op == 'ENDS WITH':
+        return df[ends_with_mask(df, column, value)]
+
+    if pd.api.types.is_numeric_dtype(series):
+        value = float(value)
+    else:
+        value = str(value)
+
+    if op == '>':
+        return df[series > value]
+    elif op == '<':
+        return df[series < value]
+    elif op == '=':
+        return df[series == value]
+    raise ValueError(f"Unsupported operator {op}")
+
+
+def apply_write(df, statement):
+    """Apply an INSERT or DELETE, returning (new DataFrame, rows affected)."""
+    if isinstance(statement, Insert):
+        record = statement.as_dict()
+        for col, val in record.items():
+            if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+                record[col] = int(val)
+        return append_records(df, [record]), 1
+
+    if isinstance(statement, Delete):
+        # A bare DELETE; would empty the table from a typo
+        if statement.where is None:
+            raise QueryError("DELETE needs a WHERE clause.")
+        try:
+            doomed = filter_frame(df, statement.where).index
+        except Exception as e:
+            raise QueryError(f"Error in WHERE clause: {e}")
+        return df.drop(doomed).reset_index(drop=True), len(doomed)
+
+    raise QueryError("Only INSERT and DELETE modify the table.")
+
+
+def lookup_table(tables, name):
+    """Fetch a table from a catalog/mapping; a bare DataFrame serves every name."""
+    if isinstance(tables, pd.DataFrame):
+        return tables
+    try:
+        return tables[name]
+    except KeyError:
+        raise QueryError(f"Unknown table '{name}'.")
+
+
+def _key_values(series):
+    # Categoricals are compared by value, not by (side-specific) code
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return np.asarray(series)
+    return series.to_numpy()
+
+
+def hash_join(left, right, left_key, right_key, table, batch_rows=JOIN_BATCH_ROWS,
+              checkpoint=None):
+    """Inner equi-join of left and right on left[left_key] == right[right_key].
+
+    The smaller input is hashed once (factorized into a unique-key index plus
+    the row positions of each key); the larger input probes that index in
+    vectorized batches of batch_rows.  Output columns are left's followed by
+    right's; a right column whose name clashes is qualified as 'table.column'
+    and the right key is dropped when both keys share a name.  checkpoint,
+    if given, is called before every probe batch.
+    """
+    build_left = len(left) < len(right)
+    build, probe = (left, right) if build_left else (right, left)
+    build_key, probe_key = (left_key, right_key) if build_left else (right_key, left_key)
+
+    # Build: unique keys, and build rows grouped by key (missing keys get -1)
+    codes, uniques = pd.factorize(_key_values(build[build_key]))
+    keys = pd.Index(uniques)
+    positions = np.flatnonzero(codes >= 0)
+    order = positions[np.argsort(codes[positions], kind='stable')]
+    counts = np.bincount(codes[positions], minlength=len(keys))
+    starts = np.cumsum(counts) - counts
+
+    # Probe: look up a batch of keys at once, then expand each hit into
+    # the run of build rows sharing its key
+    probe_values = _key_values(probe[probe_key])
+    probe_parts, build_parts = [], []
+    for lo in range(0, len(probe_values), batch_rows):
+        if checkpoint is not None:
+            checkpoint()
+        slots = keys.get_indexer(probe_values[lo:lo + batch_rows])
+        hits = np.flatnonzero(slots >= 0)
+        slots = slots[hits]
+        runs = counts[slots]
+        offsets = np.repeat(starts[slots] - (np.cumsum(runs) - runs), runs)
+        probe_parts.append(np.repeat(hits + lo, runs))
+        build_parts.append(order[offsets + np.arange(runs.sum())])
+
+    empty = np.empty(0, dtype=np.intp)
+    probe_rows = np.concatenate(probe_parts) if probe_parts else empty
+    build_rows = np.concatenate(build_parts) if build_parts else empty
+    left_rows, right_rows = (build_rows, probe_rows) if build_left else (probe_rows, build_rows)
+
+    left_part = left.take(left_rows).reset_index(drop=True)
+    right_part = right.take(right_rows).reset_index(drop=True)
+    if left_key == right_key:
+        right_part = right_part.drop(columns=right_key)
+    right_part = right_part.rename(columns={
+        col: f"{table}.{col}" for col in right_part.columns if col in left_part.columns
+    })
+    return pd.concat([left_part, right_part], axis=1)
+
+
+def _join_side(key, child, table, name):
+    """'left' or 'right': the join input a key of ON belongs to (None if unclear)."""
+    if key in child.columns:
+        return 'left'
+    if '.' in key:
+        return 'right' if key.split('.', 1)[0] == name else 'left'
+    if key in table.columns:
+        return 'right'
+    return None
+
+
+def _join(node, child, table, checkpoint=None):
+    left_key, right_key = node.left_key, node.right_key
+    if (_join_side(left_key, child, table, node.table) == 'right'
+            or _join_side(right_key, child, table, node.table) == 'left'):
+        # ON student_id = id, or courses.id = enrollments.course_id: keys
+        # written right side first
+        left_key, right_key = right_key, left_key
+    try:
+        return hash_join(child, table, resolve_column(child, left_key),
+                         resolve_column(table, right_key), node.table, checkpoint=checkpoint)
+    except Exception as e:
+        raise QueryError(f"Error in JOIN clause: {e}")
+
+
+def _derive(node, child):
+    try:
+        return child.assign(**{name: CUSTOM_METRICS[name](child) for name in node.metrics})
+    except KeyError as e:
+        raise QueryError(f"Error computing custom metric: {e}")
+
+
+def _filter(node, child):
+    try:
+        return filter_frame(child, node.condition)
+    except Exception as e:
+        raise QueryError(f"Error in WHERE clause: {e}")
+
+
+def _aggregate(node, child):
+    aggregates = [item for item in node.items if isinstance(item, Aggregate)]
+
+    if node.group_by:
+        try:
+            grouped = child.groupby(resolve_column(child, node.group_by), sort=True, observed=True)
+            return pd.DataFrame({
+                output_name(item): grouped.size() if item.column == '*'
+                else grouped[resolve_column(child, item.column)].agg(AGGREGATE_FUNCS[item.func])
+                for item in aggregates
+            }).reset_index()
+        except Exception as e:
+            raise QueryError(f"Error in GROUP BY clause: {e}")
+
+    # Aggregation without GROUP BY collapses to a single row
+    try:
+        return _single_row(node.items, child)
+    except Exception as e:
+        raise QueryError(f"Error processing aggregation without GROUP BY: {e}")
+
+
+def _single_row(items, child):
+    agg_results = {}
+    for item in items:
+        if isinstance(item, Aggregate) and item.column == '*':
+            agg_results[output_name(item)] = [len(child)]
+        elif isinstance(item, Aggregate):
+            column = resolve_column(child, item.column)
+            agg_results[output_name(item)] = [child[column].agg(AGGREGATE_FUNCS[item.func])]
+        elif isinstance(item, Column):
+            agg_results[item.name] = [child[resolve_column(child, item.name)].iloc[0]]
+    return pd.DataFrame(agg_results)
+
+
+def _sort(node, child):
+    try:
+        column = resolve_column(child, node.column)
+        if node.limit is not None and pd.api.types.is_numeric_dtype(child[column]):
+            # Top-n: partial selection instead of a full sort
+            pick = child.nsmallest if node.ascending else child.nlargest
+            return pick(node.limit, column)
+        result = child.sort_values(by=column, ascending=node.ascending)
+        return result if node.limit is None else result.head(node.limit)
+    except Exception as e:
+        raise QueryError(f"Error in ORDER BY clause: {e}")
+
+
+def _limit(node, child):
+    try:
+        return child.head(int(node.count))
+    except Exception as e:
+        raise QueryError(f"Error in LIMIT clause: {e}")
+
+
+def _project(node, child):
+    try:
+        return child[[resolve_column(child, col) for col in node.columns]]
+    except Exception as e:
+        raise QueryError(f"Error selecting columns: {e}")
+
+
+def _plot(node, child):
+    # Rendering happens in the caller; the plot node only marks the sink.
+    return child
+
+
+OPERATORS = {
+    Derive: _derive,
+    Filter: _filter,
+    Aggregation: _aggregate,
+    Sort: _sort,
+    Limit: _limit,
+    Project: _project,
+    Plot: _plot,
+}
+
+
+# ------------------ Partitioned Inputs ------------------
+# Over a table clustered by catalog.partition_by (or a filtered part of
+# one), a WHERE on the partition key only reads the partitions whose key
+# matches, and a GROUP BY on it aggregates each partition separately.
+
+
+def _on_key(df, layout, column):
+    if df is None:
+        # Planning without data: a partitioned input has no joined columns
+        return column.rsplit('.', 1)[-1] == layout.column
+    return resolve_column(df, column) == layout.column
+
+
+def _prune(node, child, layout):
+    """Rows of the partitions whose key satisfies the condition."""
+    try:
+        # Same comparison as the filter itself, evaluated once per partition
+        selected = filter_frame(layout.keys, node.condition).index.to_numpy()
+    except Exception as e:
+        raise QueryError(f"Error in WHERE clause: {e}")
+    parts = layout.parts(child, selected)
+    result = pd.concat(parts) if len(parts) > 1 else parts[0] if parts else child.iloc[:0]
+    return remember(result, layout.subset(selected))
+
+
+def _aggregate_partition(node, part):
+    """The GROUP BY row of one partition: a scalar aggregate plus its key."""
+    try:
+        key = resolve_column(part, node.group_by)
+        row = _single_row([item for item in node.items if isinstance(item, Aggregate)], part)
+        row.insert(0, key, part[key].iloc[:1].reset_index(drop=True))
+        return row
+    except Exception as e:
+        raise QueryError(f"Error in GROUP BY clause: {e}")
+
+
+def _aggregate_partitions(node, child, layout, checkpoint=None):
+    """GROUP BY the partition key: every partition is exactly one group."""
+    key = resolve_column(child, node.group_by)
+    # GROUP BY drops rows with a missing key, which all sit in one partition
+    parts = [part for part in layout.parts(child) if part[key].iloc[:1].notna().all()]
+    if not parts:
+        return _aggregate(node, child)
+    results = map_partitions(_aggregate_partition, node, parts, checkpoint)
+    return pd.concat(results, ignore_index=True)
+
+
+def run_operator(node, data, tables, checkpoint=None):
+    """Evaluate one plan node over its child's result."""
+    if checkpoint is not None:
+        checkpoint()
+    if isinstance(node, Scan):
+        return lookup_table(tables, node.table)
+    if isinstance(node, Join):
+        return _join(node, data, lookup_table(tables, node.table), checkpoint)
+
+    layout = layout_of(data)
+    if layout is not None:
+        if isinstance(node, Filter) and _on_key(data, layout, node.condition.column):
+            return _prune(node, data, layout)
+        if isinstance(node, Aggregation) and node.group_by and _on_key(data, layout, node.group_by):
+            return _aggregate_partitions(node, data, layout, checkpoint)
+        if isinstance(node, (Filter, Derive)):
+            # Row order is kept, so the result is still clustered
+            result = OPERATORS[type(node)](node, data)
+            return remember(result, layout.follow(data, result))
+    return OPERATORS[type(node)](node, data)
+
+
+def execute_plan(plan, tables, checkpoint=None):
+    """Evaluate a logical plan; tables maps names to DataFrames (e.g. a Catalog).
+
+    A single DataFrame may be passed for plans that read one table.
+    checkpoint, if given, is called before every stage and may raise to
+    abandon the query.
+    """
+    data = None if isinstance(plan, Scan) else execute_plan(plan.child, tables, checkpoint)
+    return run_operator(plan, data, tables, checkpoint)
+
+
+# ------------------ Instrumented Execution ------------------
+
+@dataclass(slots=True)
+class StageStats:
+    stage: str
+    seconds: float
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    bytes_allocated: Optional[int] = None
+
+
+def input_layouts(plan, tables):
+    """Partition layout of each node's input, in plan_nodes order, without running the plan.
+
+    Mirrors run_operator: a scan brings its table's layout, filters and
+    derived columns keep it, every other operator drops it.
+    """
+    layouts, layout = [], None
+    for node in plan_nodes(plan):
+        layouts.append(layout)
+        if isinstance(node, Scan):
+            layout = layout_of(lookup_table(tables, node.table))
+        elif not isinstance(node, (Filter, Derive)):
+            layout = None
+    return layouts
+
+
+def physical_operator(node, child=None, layout=None):
+    """Name of the kernel execute_plan picks for a node.
+
+    child is the node's input when it is known; otherwise layout, the
+    input's partition layout from input_layouts, is used.
+    """
+    if child is not None:
+        layout = layout_of(child)
+    if layout is not None:
+        if isinstance(node, Filter) and _on_key(child, layout, node.condition.column):
+            return 'PartitionPrune'
+        if isinstance(node, Aggregation) and node.group_by and _on_key(child, layout, node.group_by):
+            return 'PartitionAggregate'
+    if isinstance(node, Sort) and node.limit is not None:
+        if child is None or pd.api.types.is_numeric_dtype(child[resolve_column(child, node.column)]):
+            return 'TopN(nlargest)' if not node.ascending else 'TopN(nsmallest)'
+        return 'Sort+Head'
+    if isinstance(node, Filter) and node.condition.op == 'LIKE':
+        kind = plan_like(node.condition.value).kind
+        return 'RegexFilter' if kind == 'regex' else f'LikeFilter({kind})'
+    if isinstance(node, Filter) and node.condition.op == 'ENDS WITH':
+        return 'LikeFilter(suffix)'
+    if (isinstance(node, Filter) and child is not None and node.condition.op in ('>', '<', '=')
+            and isinstance(child[resolve_column(child, node.condition.column)].dtype, pd.CategoricalDtype)):
+        return 'DictionaryCodeFilter'
+    if isinstance(node, Aggregation):
+        return 'HashAggregate' if node.group_by else 'ScalarAggregate'
+    if isinstance(node, Join):
+        return 'HashJoin'
+    return type(node).__name__
+
+
+def measure(func, *args):
+    """Call func(*args), returning (result, seconds, peak bytes allocated)."""
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        return result, elapsed, max(peak - base, 0)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def analyze_plan(plan, tables):
+    """Execute a plan, recording wall time, row counts and allocations per stage.
+
+    Returns (result, stats) with stats in execution order.
+    """
+    stats = []
+    data = None
+    for node in plan_nodes(plan):
+        result, elapsed, allocated = measure(run_operator, node, data, tables)
+        label = f"{STAGE_NAMES[type(node)]} [{physical_operator(node, data)}]"
+        rows_in = len(result) if data is None else len(data)
+        stats.append(StageStats(label, elapsed, rows_in, len(result), allocated))
+        data = result
+    return data, stats
@@ -0,0 +1,101 @@
+import pandas as pd
+
+from charts import render_plot
+from executor import (
+    StageStats, analyze_plan, filter_frame, input_layouts, measure, physical_operator, resolve_column,
+)
+from partitions import layout_of
+from planner import Filter, build_plan, format_plan, plan_nodes, plan_select, schema_of
+
+
+def _format_stats(stats):
+    header = f"{'Stage':<36}{'Time (ms)':>12}{'Rows in':>10}{'Rows out':>10}{'Bytes':>14}"
+    lines = [header, '-' * len(header)]
+    for s in stats:
+        rows_in = '' if s.rows_in is None else s.rows_in
+        rows_out = '' if s.rows_out is None else s.rows_out
+        allocated = '' if s.bytes_allocated is None else s.bytes_allocated
+        lines.append(f"{s.stage:<36}{s.seconds * 1000:>12.3f}{rows_in:>10}{rows_out:>10}{allocated:>14}")
+    total = sum(s.seconds for s in stats)
+    lines.append('-' * len(header))
+    lines.append(f"{'Total':<36}{total * 1000:>12.3f}")
+    return lines
+
+
+def _format_estimates(select, plan, stats):
+    lines = []
+    for node in plan_nodes(plan):
+        if not isinstance(node, Filter):
+            continue
+        cond = node.condition
+        for table in select.tables:
+            table_stats = stats.get(table)
+            estimate = stats.estimate_rows(table, cond)
+            if estimate is not None:
+                share = estimate / max(table_stats.rows, 1)
+                lines.append(f"WHERE {cond.column} {cond.op} {cond.value!r}: "
+                             f"~{estimate:.0f} of {table_stats.rows} {table} rows ({share:.1%})")
+                break
+    return lines
+
+
+def _format_partitions(select, plan, tables):
+    base = tables if isinstance(tables, pd.DataFrame) else tables[select.table]
+    layout = layout_of(base)
+    if layout is None:
+        return []
+    read = len(layout)
+    for node in plan_nodes(plan):
+        # Joins are not partition-aware, so only a WHERE below them prunes
+        if (isinstance(node, Filter) and not select.joins
+                and resolve_column(base, node.condition.column) == layout.column):
+            try:
+                read = len(filter_frame(layout.keys, node.condition))
+            except Exception:
+                pass   # the query itself reports the bad condition
+    return ["", f"{select.table} is partitioned by {layout.column}: reads {read} of {len(layout)} partitions"]
+
+
+def explain(statement, tables, pre_stages=(), stats=None):
+    """Build the EXPLAIN / EXPLAIN ANALYZE report for an Explain node.
+
+    tables is a catalog Snapshot (or a single DataFrame for one-table queries).
+    pre_stages are StageStats measured by the caller before planning
+    (intent classification, entity extraction, parsing) and are listed
+    ahead of the execution stages.  stats, a StatsStore, adds row
+    estimates for WHERE conditions when statistics are available.
+    """
+    select = statement.statement
+    if isinstance(tables, pd.DataFrame):
+        schema = schema_of(tables)
+    else:
+        schema = tables.schema(select.tables)
+    optimized = plan_select(select, schema)
+    operators = [physical_operator(node, layout=layout)
+                 for node, layout in zip(plan_nodes(optimized), input_layouts(optimized, tables))]
+
+    lines = [
+        "Logical plan:",
+        format_plan(build_plan(select)),
+        "",
+        "Optimized plan:",
+        format_plan(optimized),
+        "",
+        "Physical operators: " + " -> ".join(operators),
+    ]
+    estimates = _format_estimates(select, optimized, stats) if stats is not None else []
+    if estimates:
+        lines += ["", "Estimates:"] + estimates
+    lines += _format_partitions(select, optimized, tables)
+    if not statement.analyze:
+        return "\n".join(lines)
+
+    result, stats = analyze_plan(optimized, tables)
+    stats = list(pre_stages) + stats
+
+    if select.plot:
+        _, elapsed, allocated = measure(render_plot, result, select.plot)
+        stats.append(StageStats("PLOT render", elapsed, len(result), None, allocated))
+
+    lines += ["", "Execution:"] + _format_stats(stats)
+    return "\n".join(lines)
@@ -1,5 +1,8 @@
 import re
 
+import metrics
+
+@metrics.instrument("classify_intent")
 def classify_intent(nl_query: str) -> str:
     nl_query = nl_query.lower()
 
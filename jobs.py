@@ -0,0 +1,200 @@
+"""Background query jobs.
+
+Queries submitted to /api/jobs run on a small, bounded pool of worker
+threads instead of the request thread.  Jobs wait in one of two lanes:
+interactive jobs are always taken first, and batch jobs may occupy at
+most BATCH_WORKERS workers so a burst of batch work never starves
+interactive users.  When MAX_QUEUED jobs are already waiting, submit()
+raises QueueFull and the API answers 503 rather than queueing forever.
+
+Cancellation and timeouts are cooperative: the query pipeline calls
+job.checkpoint() between stages (and the executor between hash join
+batches), which raises JobCancelled once the job was cancelled or its
+deadline has passed.  A single long-running pandas call is not
+interrupted; the job stops at the next checkpoint.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import metrics
+
+WORKERS = int(os.environ.get("EDSQL_JOB_WORKERS", "4"))
+BATCH_WORKERS = int(os.environ.get("EDSQL_JOB_BATCH_WORKERS", str(max(WORKERS - 1, 1))))
+MAX_QUEUED = int(os.environ.get("EDSQL_JOB_QUEUE", "64"))
+DEFAULT_TIMEOUT = float(os.environ.get("EDSQL_JOB_TIMEOUT", "30"))
+# Finished jobs stay pollable for this many seconds
+RETENTION = float(os.environ.get("EDSQL_JOB_RETENTION", "600"))
+
+LANES = ("interactive", "batch")
+
+
+class QueueFull(Exception):
+    """Raised by submit() when MAX_QUEUED jobs are already waiting."""
+
+
+class JobCancelled(BaseException):
+    """Raised at a checkpoint of a cancelled or timed-out job.
+
+    Derives from BaseException (like KeyboardInterrupt) so the pipeline's
+    'except Exception' error reporting cannot swallow it.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status   # 'cancelled' or 'timeout'
+
+
+@dataclass(slots=True, eq=False)
+class Job:
+    id: str
+    query: str
+    lane: str
+    timeout: float
+    status: str = "queued"     # queued, running, done, failed, cancelled, timeout
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.monotonic)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def checkpoint(self):
+        """Abort the job here if it was cancelled or ran out of time."""
+        if self.cancel_requested.is_set():
+            raise JobCancelled("cancelled", "Query cancelled.")
+        if time.monotonic() - self.submitted > self.timeout:
+            raise JobCancelled("timeout", f"Query exceeded its {self.timeout:g}s timeout.")
+
+    def as_dict(self):
+        now = time.monotonic()
+        queued_until = self.started or self.finished or now
+        info = {
+            "id": self.id,
+            "status": self.status,
+            "lane": self.lane,
+            "queued_ms": round((queued_until - self.submitted) * 1000, 3),
+        }
+        if self.started is not None:
+            info["run_ms"] = round(((self.finished or now) - self.started) * 1000, 3)
+        if self.result is not None:
+            info.update(self.result)
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class JobQueue:
+    """Bounded worker pool running runner(query, checkpoint) for each job."""
+
+    def __init__(self, runner, workers=WORKERS, batch_workers=BATCH_WORKERS,
+                 max_queued=MAX_QUEUED):
+        self.runner = runner
+        self.workers = workers
+        self.batch_workers = min(batch_workers, workers)
+        self.max_queued = max_queued
+        self._lanes = {lane: deque() for lane in LANES}
+        self._running = {lane: 0 for lane in LANES}
+        self._jobs = {}
+        self._threads = []
+        self._cond = threading.Condition()
+
+    def queued(self):
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def submit(self, query, lane="interactive", timeout=DEFAULT_TIMEOUT):
+        if lane not in LANES:
+            raise ValueError(f"Unknown priority '{lane}'; use one of {', '.join(LANES)}.")
+        with self._cond:
+            self._purge()
+            if self.queued() >= self.max_queued:
+                metrics.inc("jobs_rejected")
+                raise QueueFull("Too many queued queries; try again later.")
+            job = Job(uuid.uuid4().hex[:16], query, lane, timeout)
+            self._jobs[job.id] = job
+            self._lanes[lane].append(job)
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"edsql-job-{len(self._threads)}")
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+            metrics.set_gauge("jobs_queued", self.queued())
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def wait(self, job, timeout):
+        """Block until the job finishes or timeout seconds pass (long-poll)."""
+        job.done.wait(timeout)
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a job: dropped if still queued, stopped at its next checkpoint if running."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == "queued":
+                self._lanes[job.lane].remove(job)
+                self._finish(job, "cancelled", "Query cancelled.")
+            elif job.status == "running":
+                job.cancel_requested.set()
+            return job
+
+    def _next_job(self):
+        if self._lanes["interactive"]:
+            return self._lanes["interactive"].popleft()
+        if self._lanes["batch"] and self._running["batch"] < self.batch_workers:
+            return self._lanes["batch"].popleft()
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                job.status = "running"
+                job.started = time.monotonic()
+                self._running[job.lane] += 1
+                metrics.set_gauge("jobs_queued", self.queued())
+            metrics.observe("job_queue_wait", job.started - job.submitted)
+
+            result, error = None, None
+            try:
+                job.checkpoint()
+                result = self.runner(job.query, job.checkpoint)
+                status = "done"
+            except JobCancelled as e:
+                status, error = e.status, str(e)
+            except Exception as e:
+                status, error = "failed", f"Unexpected error: {e}"
+
+            with self._cond:
+                self._running[job.lane] -= 1
+                job.result = result
+                self._finish(job, status, error)
+                # A freed batch slot may let a waiting worker take a batch job
+                self._cond.notify()
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished = time.monotonic()
+        if job.started is not None:
+            metrics.observe("job_run", job.finished - job.started)
+        metrics.inc("jobs", lane=job.lane, status=status)
+        job.done.set()
+
+    def _purge(self):
+        cutoff = time.monotonic() - RETENTION
+        for job_id in [i for i, j in self._jobs.items() if j.finished is not None and j.finished < cutoff]:
+            del self._jobs[job_id]
@@ -2,6 +2,8 @@ import spacy
 from spacy.matcher import Matcher
 import re
 
+import metrics
+
 nlp = spacy.load("en_core_web_sm")
 
 matcher = Matcher(nlp.vocab)
@@ -18,6 +20,7 @@ matcher.add("EQUAL_TO", [[{"LOWER": "equal"}, {"LOWER": "to"}]])
 matcher.add("NUMERIC_VALUE", [[{"LIKE_NUM": True}]])
 
 # Extract fields
+@metrics.instrument("extract_entities")
 def extract_entities(nl_query):
     query = nl_query.lower()
     entities = {
@@ -31,7 +34,9 @@ def extract_entities(nl_query):
         "y": None,
         "custom_metric": None,
         "order": None,
-        "limit": None
+        "limit": None,
+        "course": None,
+        "approx": False
     }
 
     for col in ["grades", "attendance", "name", "class", "section"]:
@@ -39,6 +44,11 @@ def extract_entities(nl_query):
             entities["column"] = col
             break
 
+    # Cross-table: "grades of students in course physics"
+    match = re.search(r"\b(?:in|taking|enrolled in|for) (?:the )?course ([\w-]+)", query)
+    if match:
+        entities["course"] = match.group(1)
+
     if "performance score" in query:
         entities["custom_metric"] = "PERFORMANCE_SCORE"
         entities["column"] = "PERFORMANCE_SCORE"
@@ -64,6 +74,12 @@ def extract_entities(nl_query):
             elif "min" in query or "minimum" in query:
                 entities["aggregation"] = "MIN"
             break
+    if entities["aggregation"] is None and re.search(r"\b(how many|count|number of)\b", query):
+        entities["aggregation"] = "COUNT"
+
+    # "roughly how many ...": an estimate is good enough
+    if re.search(r"\b(roughly|approximately|about|around|estimated?)\b", query):
+        entities["approx"] = True
 
     # Group by
     for group_col in ["class", "section"]:
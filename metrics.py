@@ -0,0 +1,180 @@
+import functools
+import os
+import threading
+import time
+
+# Instrumentation is off unless EDSQL_METRICS=1; when off every hook
+# returns after a single flag check.
+ENABLED = os.environ.get("EDSQL_METRICS", "0") == "1"
+SERVER_TIMING = os.environ.get("EDSQL_SERVER_TIMING", "0") == "1"
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of latencies in microseconds.
+
+    Values below 2**SUB_BITS are counted exactly; above that each power of
+    two is split into 2**(SUB_BITS - 1) linear sub-buckets, so any recorded
+    value is reported within ~1.5% using a small sparse set of counters.
+    """
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    SUB_BITS = 7
+    SUB = 1 << SUB_BITS
+    HALF = SUB >> 1
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0
+
+    @classmethod
+    def bucket_index(cls, micros):
+        if micros < cls.SUB:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BITS
+        top = micros >> shift
+        return cls.SUB + (shift - 1) * cls.HALF + (top - cls.HALF)
+
+    @classmethod
+    def bucket_value(cls, index):
+        """Midpoint (in microseconds) of the range covered by a bucket."""
+        if index < cls.SUB:
+            return index
+        shift, offset = divmod(index - cls.SUB, cls.HALF)
+        shift += 1
+        top = offset + cls.HALF
+        return ((top << shift) + ((top + 1) << shift)) // 2
+
+    def record(self, seconds):
+        micros = max(int(seconds * 1_000_000), 0)
+        index = self.bucket_index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if micros > self.max:
+            self.max = micros
+
+    def percentile(self, q):
+        """Latency in seconds at quantile q (0..1)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_value(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_gauges = {}
+_request = threading.local()
+
+
+def observe(name, seconds):
+    """Record one latency sample for name."""
+    if not ENABLED:
+        return
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = LatencyHistogram()
+        hist.record(seconds)
+    timings = getattr(_request, 'timings', None)
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def inc(name, amount=1, **labels):
+    """Increment a counter, optionally labelled (e.g. intent='plot_bar')."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name, value):
+    if not ENABLED:
+        return
+    with _lock:
+        _gauges[name] = value
+
+
+def instrument(name):
+    """Decorator timing every call of the wrapped function as name."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ------------------ Per-request Server-Timing ------------------
+
+def begin_request():
+    if ENABLED and SERVER_TIMING:
+        _request.timings = []
+
+
+def server_timing_header():
+    """Server-Timing value for the current request, or None."""
+    timings = getattr(_request, 'timings', None)
+    _request.timings = None
+    if not timings:
+        return None
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in timings)
+
+
+# ------------------ Prometheus text exposition ------------------
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def render_prometheus():
+    """Return all metrics in the Prometheus text format (version 0.0.4)."""
+    with _lock:
+        histograms = {name: (h.count, h.total, [h.percentile(q) for q in QUANTILES])
+                      for name, h in _histograms.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+
+    lines = []
+    for name in sorted(histograms):
+        count, total, values = histograms[name]
+        metric = f"edsql_{name}_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for q, value in zip(QUANTILES, values):
+            lines.append(f'{metric}{{quantile="{q}"}} {value:.6f}')
+        lines.append(f"{metric}_sum {total:.6f}")
+        lines.append(f"{metric}_count {count}")
+
+    typed = set()
+    for (name, labels), value in sorted(counters.items()):
+        metric = f"edsql_{name}_total"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_labels(labels)} {value}")
+
+    for name in sorted(gauges):
+        lines.append(f"# TYPE edsql_{name} gauge")
+        lines.append(f"edsql_{name} {gauges[name]}")
+
+    return "\n".join(lines) + "\n"
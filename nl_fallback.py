@@ -0,0 +1,240 @@
+"""Offline nearest-neighbour NL -> EDSQL fallback.
+
+Exemplar questions are vectorized as TF-IDF weighted character n-grams and
+kept in an inverted index (term -> postings), i.e. a sparse term/document
+matrix stored by column.  A query is scored against every exemplar by
+cosine similarity, the best exemplar's EDSQL template is slot-filled from
+matcher_utils.extract_entities, and the similarity is reported as the
+confidence.  Questions that name nothing in the schema are declined, and
+chart templates only match questions that ask for a chart.  No network access is needed and exemplars can be added at
+any time.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import NamedTuple, Optional
+
+import metrics
+from matcher_utils import extract_entities
+
+# Below this cosine similarity the fallback declines to answer
+MIN_CONFIDENCE = 0.3
+
+# A question must mention one of these to be about the students table at all
+SCHEMA_WORDS = re.compile(
+    r"\b(?:students?|grades?|attendance|names?|class(?:es)?|sections?|perform\w*|table)\b")
+
+# Exemplars whose template draws a chart need one of these in the question
+CHART_WORDS = re.compile(r"\b(?:plot\w*|chart\w*|graphs?|bar|line|pie|histogram)\b")
+
+SLOTS = ("column", "operator", "value", "group_by", "order", "limit", "plot", "x", "y")
+
+# Comparison words extract_entities does not know about
+OPERATOR_WORDS = [
+    (r"\b(above|over|exceeding|at least)\b", ">"),
+    (r"\b(below|under|at most)\b", "<"),
+    (r"\b(exactly|equals?)\b", "="),
+]
+
+# (natural language, EDSQL template, default slot values)
+DEFAULT_EXEMPLARS = [
+    ("what is the average grade of each class",
+     "SELECT AVG({column}) FROM students GROUP BY {group_by};",
+     {"column": "grades", "group_by": "class"}),
+    ("mean attendance per section",
+     "SELECT AVG({column}) FROM students GROUP BY {group_by};",
+     {"column": "attendance", "group_by": "section"}),
+    ("overall average grades",
+     "SELECT AVG({column}) FROM students;",
+     {"column": "grades"}),
+    ("show students with grades greater than 80",
+     "SELECT name, {column} FROM students WHERE {column} {operator} {value};",
+     {"column": "grades", "operator": ">", "value": 80}),
+    ("which students have attendance below 60",
+     "SELECT name, {column} FROM students WHERE {column} {operator} {value};",
+     {"column": "attendance", "operator": "<", "value": 60}),
+    ("students scoring exactly 75",
+     "SELECT name, {column} FROM students WHERE {column} {operator} {value};",
+     {"column": "grades", "operator": "=", "value": 75}),
+    ("top 5 students by grades",
+     "SELECT name, {column} FROM students ORDER BY {column} {order} LIMIT {limit};",
+     {"column": "grades", "order": "DESC", "limit": 5}),
+    ("who has the lowest attendance",
+     "SELECT name, {column} FROM students ORDER BY {column} {order} LIMIT {limit};",
+     {"column": "attendance", "order": "ASC", "limit": 1}),
+    ("rank students by grades",
+     "SELECT name, {column} FROM students ORDER BY {column} DESC;",
+     {"column": "grades"}),
+    ("plot grades of every student as a bar graph",
+     "SELECT name, {column} FROM students PLOT BAR GRAPH;",
+     {"column": "grades"}),
+    ("chart attendance over students as a line",
+     "SELECT name, {column} FROM students PLOT LINE GRAPH;",
+     {"column": "attendance"}),
+    ("how are students split across classes",
+     "SELECT {column} FROM students PLOT PIE CHART;",
+     {"column": "class"}),
+    ("performance score of each student",
+     "SELECT name, CUSTOM_METRIC(PERFORMANCE_SCORE, grades, attendance) FROM students;",
+     {}),
+    ("best performing students",
+     "SELECT name, CUSTOM_METRIC(PERFORMANCE_SCORE, grades, attendance) FROM students "
+     "ORDER BY PERFORMANCE_SCORE DESC LIMIT {limit};",
+     {"limit": 5}),
+    ("list every student name",
+     "SELECT name FROM students;",
+     {}),
+    ("show the names and grades",
+     "SELECT name, grades FROM students;",
+     {}),
+    ("give me the whole table",
+     "SELECT * FROM students;",
+     {}),
+]
+
+
+def char_ngrams(text, n_min=3, n_max=5):
+    """Character n-grams taken inside word boundaries (like 'char_wb')."""
+    grams = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        padded = f" {word} "
+        for n in range(n_min, n_max + 1):
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+class Match(NamedTuple):
+    edsql: Optional[str]
+    confidence: float
+    exemplar: Optional[str]
+
+
+class ExemplarIndex:
+    """TF-IDF character n-gram index over (NL, EDSQL template) exemplars."""
+
+    def __init__(self, exemplars=()):
+        self._lock = threading.Lock()
+        self.exemplars = []                 # (nl, template, defaults)
+        self._charts = []                   # per exemplar: template has a PLOT clause
+        self._tf = []                       # per exemplar: {term: sublinear tf}
+        self._postings = defaultdict(list)  # term -> [(doc id, tf)]
+        self._norms = None                  # invalidated whenever idf changes
+        for nl, template, defaults in exemplars:
+            self.add(nl, template, defaults)
+
+    def __len__(self):
+        return len(self.exemplars)
+
+    def add(self, nl, template, defaults=None):
+        """Add an exemplar; it is searchable immediately."""
+        counts = Counter(char_ngrams(nl))
+        tf = {term: 1.0 + math.log(c) for term, c in counts.items()}
+        with self._lock:
+            doc_id = len(self.exemplars)
+            self.exemplars.append((nl, template, dict(defaults or {})))
+            self._charts.append(" PLOT " in template.upper())
+            self._tf.append(tf)
+            for term, weight in tf.items():
+                self._postings[term].append((doc_id, weight))
+            self._norms = None
+
+    def _idf(self, term):
+        return math.log((1 + len(self.exemplars)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def _doc_norms(self):
+        if self._norms is None:
+            self._norms = [
+                math.sqrt(sum((w * self._idf(t)) ** 2 for t, w in tf.items())) or 1.0
+                for tf in self._tf
+            ]
+        return self._norms
+
+    def query_batch(self, queries):
+        """Best (doc id, cosine similarity) for each query, (None, 0.0) if none.
+
+        Chart exemplars are skipped unless the query asks for a chart.
+        """
+        with self._lock:
+            norms = self._doc_norms()
+            results = []
+            for query in queries:
+                counts = Counter(char_ngrams(query))
+                scores = defaultdict(float)
+                q_norm = 0.0
+                charted = CHART_WORDS.search(query.lower()) is not None
+                for term, c in counts.items():
+                    postings = self._postings.get(term)
+                    idf = self._idf(term)
+                    q_weight = (1.0 + math.log(c)) * idf
+                    q_norm += q_weight * q_weight
+                    if not postings:
+                        continue
+                    for doc_id, weight in postings:
+                        if charted or not self._charts[doc_id]:
+                            scores[doc_id] += q_weight * weight * idf
+                if not scores or not q_norm:
+                    results.append((None, 0.0))
+                    continue
+                q_norm = math.sqrt(q_norm)
+                doc_id, score = max(
+                    ((d, s / (norms[d] * q_norm)) for d, s in scores.items()),
+                    key=lambda item: item[1],
+                )
+                results.append((doc_id, score))
+            return results
+
+    def translate_batch(self, queries, min_confidence=MIN_CONFIDENCE):
+        """Translate NL queries to EDSQL, returning a Match per query."""
+        matches = []
+        for query, (doc_id, score) in zip(queries, self.query_batch(queries)):
+            if doc_id is None or score < min_confidence or not SCHEMA_WORDS.search(query.lower()):
+                matches.append(Match(None, score, None))
+                continue
+            nl, template, defaults = self.exemplars[doc_id]
+            matches.append(Match(fill_template(template, defaults, query), score, nl))
+        return matches
+
+    def translate(self, query, min_confidence=MIN_CONFIDENCE):
+        return self.translate_batch([query], min_confidence)[0]
+
+
+def fill_template(template, defaults, nl_query):
+    """Fill {slot}s from the query's entities, falling back to the exemplar's."""
+    query = nl_query.lower()
+    entities = extract_entities(query)
+    if entities["group_by"] is None:
+        group = re.search(r"\b(?:by|per|each|every)\s+(class|section)", query)
+        if group:
+            entities["group_by"] = group.group(1)
+    if entities["column"] is not None and entities["column"] == entities["group_by"]:
+        # "average grade by class": the grouping key is not the measured column
+        entities["column"] = None
+    if entities["operator"] is None:
+        for pattern, symbol in OPERATOR_WORDS:
+            if re.search(pattern, query):
+                entities["operator"] = symbol
+                break
+    if entities["value"] is None and "{value}" in template:
+        number = re.search(r"\b(\d+)\b", query)
+        if number:
+            entities["value"] = int(number.group(1))
+
+    slots = dict(defaults)
+    for slot in SLOTS:
+        if entities.get(slot) is not None:
+            slots[slot] = entities[slot]
+    try:
+        return template.format_map(slots)
+    except KeyError:
+        return None
+
+
+index = ExemplarIndex(DEFAULT_EXEMPLARS)
+
+
+@metrics.instrument("nl_fallback")
+def fallback_to_edsql(nl_query):
+    """Translate with the shared exemplar index; returns (edsql or None, confidence)."""
+    match = index.translate(nl_query)
+    return match.edsql, match.confidence
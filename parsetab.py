@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'ASC ASTERISK AVG BAR BY CHART COMMA CUSTOM_METRIC DELETE DESC ENDS EQUALS FROM GRAPH GREATER_THAN GROUP IDENTIFIER INSERT LESS_THAN LIKE LIMIT LINE LPAREN NUMBER ORDER PIE PLOT RPAREN SELECT SEMICOLON STRING WHERE WITHquery : select_query\n             | insert_query\n             | delete_queryselect_query : SELECT select_list FROM IDENTIFIER where_clause group_by_clause plot_clause order_clause limit_clause SEMICOLONinsert_query : INSERT insert_items SEMICOLONinsert_items : insert_item COMMA insert_items\n                    | insert_iteminsert_item : IDENTIFIER EQUALS valuedelete_query : DELETE where_clause SEMICOLONvalue : NUMBER\n             | STRINGselect_list : ASTERISK\n                   | expression COMMA select_list\n                   | expressionexpression : IDENTIFIER\n                  | function_call\n                  | avg_function\n                  | custom_metricfunction_call : IDENTIFIER LPAREN arg_list RPARENavg_function : AVG LPAREN IDENTIFIER RPARENcustom_metric : CUSTOM_METRIC LPAREN IDENTIFIER COMMA arg_list RPARENarg_list : IDENTIFIER COMMA arg_list\n                | IDENTIFIERwhere_clause : WHERE condition\n                    | emptycondition : IDENTIFIER GREATER_THAN NUMBER\n                 | IDENTIFIER LESS_THAN NUMBER\n                 | IDENTIFIER EQUALS STRING\n                 | IDENTIFIER LIKE STRING\n                 | IDENTIFIER EQUALS NUMBER\n                 | IDENTIFIER ENDS WITH STRINGgroup_by_clause : GROUP BY IDENTIFIER\n                       | emptyorder_clause : ORDER BY IDENTIFIER order_direction\n                    | emptyorder_direction : ASC\n                       | DESClimit_clause : LIMIT NUMBER\n                    | emptyplot_clause : PLOT BAR GRAPH\n                   | PLOT LINE GRAPH\n                   | PLOT PIE CHART\n                   | emptyempty :'
+_lr_signature = 'ANALYZE APPROX ASC ASTERISK AVG BAR BY CHART COMMA COUNT CUSTOM_METRIC DELETE DESC DISTINCT ENDS EQUALS ERROR EXPLAIN FROM GRAPH GREATER_THAN GROUP IDENTIFIER INSERT JOIN LESS_THAN LIKE LIMIT LINE LPAREN NUMBER ON ORDER PERCENT PIE PLOT RPAREN SELECT SEMICOLON STRING SUM WHERE WITHquery : select_query\n             | insert_query\n             | delete_query\n             | explain_query\n             | analyze_queryselect_query : SELECT select_list FROM IDENTIFIER join_list where_clause group_by_clause plot_clause order_clause limit_clause approx_clause SEMICOLONjoin_list : join_clause join_list\n                 | emptyjoin_clause : JOIN IDENTIFIER ON IDENTIFIER EQUALS IDENTIFIERexplain_query : EXPLAIN select_query\n                     | EXPLAIN ANALYZE select_queryanalyze_query : ANALYZE IDENTIFIER SEMICOLONinsert_query : INSERT insert_items SEMICOLONinsert_items : insert_item COMMA insert_items\n                    | insert_iteminsert_item : IDENTIFIER EQUALS valuedelete_query : DELETE where_clause SEMICOLONvalue : NUMBER\n             | STRINGselect_list : ASTERISK\n                   | expression COMMA select_list\n                   | expressionexpression : IDENTIFIER\n                  | function_call\n                  | avg_function\n                  | aggregate_function\n                  | custom_metricfunction_call : IDENTIFIER LPAREN arg_list RPARENaggregate_function : SUM LPAREN IDENTIFIER RPAREN\n                          | COUNT LPAREN IDENTIFIER RPAREN\n                          | COUNT LPAREN ASTERISK RPAREN\n                          | COUNT LPAREN DISTINCT IDENTIFIER RPARENavg_function : AVG LPAREN IDENTIFIER RPARENcustom_metric : CUSTOM_METRIC LPAREN IDENTIFIER COMMA arg_list RPARENarg_list : IDENTIFIER COMMA arg_list\n                | IDENTIFIERwhere_clause : WHERE condition\n                    | emptycondition : IDENTIFIER GREATER_THAN NUMBER\n                 | IDENTIFIER LESS_THAN NUMBER\n                 | IDENTIFIER EQUALS STRING\n                 | IDENTIFIER LIKE STRING\n                 | IDENTIFIER EQUALS NUMBER\n                 | IDENTIFIER ENDS WITH STRINGgroup_by_clause : GROUP BY IDENTIFIER\n                       | emptyorder_clause : ORDER BY IDENTIFIER order_direction\n                    | emptyorder_direction : ASC\n                       | DESClimit_clause : LIMIT NUMBER\n                    | emptyapprox_clause : APPROX\n                     | APPROX WITH ERROR NUMBER PERCENT\n                     | WITH ERROR NUMBER PERCENT\n                     | emptyplot_clause : PLOT BAR GRAPH\n                   | PLOT LINE GRAPH\n                   | PLOT PIE CHART\n                   | emptyempty :'
     
-_lr_action_items = {'SELECT':([0,],[5,]),'INSERT':([0,],[6,]),'DELETE':([0,],[7,]),'$end':([1,2,3,4,28,31,85,],[0,-1,-2,-3,-5,-9,-4,]),'ASTERISK':([5,25,],[10,10,]),'IDENTIFIER':([5,6,21,23,24,25,26,27,29,50,53,69,81,],[9,19,33,34,35,9,38,39,19,35,35,77,87,]),'AVG':([5,25,],[15,15,]),'CUSTOM_METRIC':([5,25,],[16,16,]),'WHERE':([7,34,],[21,21,]),'SEMICOLON':([7,17,18,20,22,32,34,40,41,42,43,49,54,55,56,57,58,60,62,65,66,68,71,73,77,78,80,82,83,84,86,88,89,90,],[-44,28,-7,31,-25,-24,-44,-6,-8,-10,-11,-44,-26,-27,-28,-30,-29,-44,-33,-31,-44,-43,-44,-35,-32,85,-39,-40,-41,-42,-38,-34,-36,-37,]),'FROM':([8,9,10,11,12,13,14,37,51,52,70,],[23,-15,-12,-14,-16,-17,-18,-13,-19,-20,-21,]),'COMMA':([9,11,12,13,14,18,35,39,41,42,43,51,52,70,],[-15,25,-16,-17,-18,29,50,53,-8,-10,-11,-19,-20,-21,]),'LPAREN':([9,15,16,],[24,26,27,]),'EQUALS':([19,33,],[30,46,]),'GROUP':([22,32,34,49,54,55,56,57,58,65,],[-25,-24,-44,61,-26,-27,-28,-30,-29,-31,]),'PLOT':([22,32,34,49,54,55,56,57,58,60,62,65,77,],[-25,-24,-44,-44,-26,-27,-28,-30,-29,67,-33,-31,-32,]),'ORDER':([22,32,34,49,54,55,56,57,58,60,62,65,66,68,77,82,83,84,],[-25,-24,-44,-44,-26,-27,-28,-30,-29,-44,-33,-31,72,-43,-32,-40,-41,-42,]),'LIMIT':([22,32,34,49,54,55,56,57,58,60,62,65,66,68,71,73,77,82,83,84,88,89,90,],[-25,-24,-44,-44,-26,-27,-28,-30,-29,-44,-33,-31,-44,-43,79,-35,-32,-40,-41,-42,-34,-36,-37,]),'NUMBER':([30,44,45,46,79,],[42,54,55,57,86,]),'STRING':([30,46,47,59,],[43,56,58,65,]),'GREATER_THAN':([33,],[44,]),'LESS_THAN':([33,],[45,]),'LIKE':([33,],[47,]),'ENDS':([33,],[48,]),'RPAREN':([35,36,38,63,64,],[-23,51,52,-22,70,]),'WITH':([48,],[59,]),'BY':([61,72,],[69,81,]),'BAR':([67,],[74,]),'LINE':([67,],[75,]),'PIE':([67,],[76,]),'GRAPH':([74,75,],[82,83,]),'CHART':([76,],[84,]),'ASC':([87,],[89,]),'DESC':([87,],[90,]),}
+_lr_action_items = {'SELECT':([0,10,31,],[7,7,7,]),'INSERT':([0,],[8,]),'DELETE':([0,],[9,]),'EXPLAIN':([0,],[10,]),'ANALYZE':([0,10,],[11,31,]),'$end':([1,2,3,4,5,6,30,40,43,46,47,124,],[0,-1,-2,-3,-4,-5,-10,-13,-17,-11,-12,-6,]),'ASTERISK':([7,35,38,],[14,14,55,]),'IDENTIFIER':([7,8,11,28,33,34,35,36,37,38,39,41,56,70,71,78,95,100,109,113,],[13,26,32,45,48,49,13,52,53,54,57,26,77,87,49,49,101,108,117,123,]),'AVG':([7,35,],[20,20,]),'SUM':([7,35,],[21,21,]),'COUNT':([7,35,],[22,22,]),'CUSTOM_METRIC':([7,35,],[23,23,]),'WHERE':([9,48,67,68,69,86,117,],[28,-61,28,-61,-8,-7,-9,]),'SEMICOLON':([9,24,25,27,29,32,44,48,58,59,60,61,67,68,69,79,80,81,82,83,85,86,91,92,94,97,99,102,104,108,110,112,114,115,116,117,118,119,121,122,127,128,129,133,134,],[-61,40,-15,43,-38,47,-37,-61,-14,-16,-18,-19,-61,-61,-8,-39,-40,-41,-43,-42,-61,-7,-44,-61,-46,-61,-60,-61,-48,-45,-61,-52,-57,-58,-59,-9,124,-53,-56,-51,-47,-49,-50,-55,-54,]),'FROM':([12,13,14,15,16,17,18,19,51,72,73,74,75,76,89,96,],[33,-23,-20,-22,-24,-25,-26,-27,-21,-28,-33,-29,-30,-31,-32,-34,]),'COMMA':([13,15,16,17,18,19,25,49,57,59,60,61,72,73,74,75,76,89,96,],[-23,35,-24,-25,-26,-27,41,71,78,-16,-18,-19,-28,-33,-29,-30,-31,-32,-34,]),'LPAREN':([13,20,21,22,23,],[34,36,37,38,39,]),'EQUALS':([26,45,101,],[42,64,109,]),'GROUP':([29,44,48,67,68,69,79,80,81,82,83,85,86,91,117,],[-38,-37,-61,-61,-61,-8,-39,-40,-41,-43,-42,93,-7,-44,-9,]),'PLOT':([29,44,48,67,68,69,79,80,81,82,83,85,86,91,92,94,108,117,],[-38,-37,-61,-61,-61,-8,-39,-40,-41,-43,-42,-61,-7,-44,98,-46,-45,-9,]),'ORDER':([29,44,48,67,68,69,79,80,81,82,83,85,86,91,92,94,97,99,108,114,115,116,117,],[-38,-37,-61,-61,-61,-8,-39,-40,-41,-43,-42,-61,-7,-44,-61,-46,103,-60,-45,-57,-58,-59,-9,]),'LIMIT':([29,44,48,67,68,69,79,80,81,82,83,85,86,91,92,94,97,99,102,104,108,114,115,116,117,127,128,129,],[-38,-37,-61,-61,-61,-8,-39,-40,-41,-43,-42,-61,-7,-44,-61,-46,-61,-60,111,-48,-45,-57,-58,-59,-9,-47,-49,-50,]),'APPROX':([29,44,48,67,68,69,79,80,81,82,83,85,86,91,92,94,97,99,102,104,108,110,112,114,115,116,117,122,127,128,129,],[-38,-37,-61,-61,-61,-8,-39,-40,-41,-43,-42,-61,-7,-44,-61,-46,-61,-60,-61,-48,-45,119,-52,-57,-58,-59,-9,-51,-47,-49,-50,]),'WITH':([29,44,48,66,67,68,69,79,80,81,82,83,85,86,91,92,94,97,99,102,104,108,110,112,114,115,116,117,119,122,127,128,129,],[-38,-37,-61,84,-61,-61,-8,-39,-40,-41,-43,-42,-61,-7,-44,-61,-46,-61,-60,-61,-48,-45,120,-52,-57,-58,-59,-9,125,-51,-47,-49,-50,]),'DISTINCT':([38,],[56,]),'NUMBER':([42,62,63,64,111,126,130,],[60,79,80,82,122,131,132,]),'STRING':([42,64,65,84,],[61,81,83,91,]),'GREATER_THAN':([45,],[62,]),'LESS_THAN':([45,],[63,]),'LIKE':([45,],[65,]),'ENDS':([45,],[66,]),'JOIN':([48,68,117,],[70,70,-9,]),'RPAREN':([49,50,52,53,54,55,77,88,90,],[-36,72,73,74,75,76,89,-35,96,]),'ON':([87,],[95,]),'BY':([93,103,],[100,113,]),'BAR':([98,],[105,]),'LINE':([98,],[106,]),'PIE':([98,],[107,]),'GRAPH':([105,106,],[114,115,]),'CHART':([107,],[116,]),'ERROR':([120,125,],[126,130,]),'ASC':([123,],[128,]),'DESC':([123,],[129,]),'PERCENT':([131,132,],[133,134,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'query':([0,],[1,]),'select_query':([0,],[2,]),'insert_query':([0,],[3,]),'delete_query':([0,],[4,]),'select_list':([5,25,],[8,37,]),'expression':([5,25,],[11,11,]),'function_call':([5,25,],[12,12,]),'avg_function':([5,25,],[13,13,]),'custom_metric':([5,25,],[14,14,]),'insert_items':([6,29,],[17,40,]),'insert_item':([6,29,],[18,18,]),'where_clause':([7,34,],[20,49,]),'empty':([7,34,49,60,66,71,],[22,22,62,68,73,80,]),'condition':([21,],[32,]),'arg_list':([24,50,53,],[36,63,64,]),'value':([30,],[41,]),'group_by_clause':([49,],[60,]),'plot_clause':([60,],[66,]),'order_clause':([66,],[71,]),'limit_clause':([71,],[78,]),'order_direction':([87,],[88,]),}
+_lr_goto_items = {'query':([0,],[1,]),'select_query':([0,10,31,],[2,30,46,]),'insert_query':([0,],[3,]),'delete_query':([0,],[4,]),'explain_query':([0,],[5,]),'analyze_query':([0,],[6,]),'select_list':([7,35,],[12,51,]),'expression':([7,35,],[15,15,]),'function_call':([7,35,],[16,16,]),'avg_function':([7,35,],[17,17,]),'aggregate_function':([7,35,],[18,18,]),'custom_metric':([7,35,],[19,19,]),'insert_items':([8,41,],[24,58,]),'insert_item':([8,41,],[25,25,]),'where_clause':([9,67,],[27,85,]),'empty':([9,48,67,68,85,92,97,102,110,],[29,69,29,69,94,99,104,112,121,]),'condition':([28,],[44,]),'arg_list':([34,71,78,],[50,88,90,]),'value':([42,],[59,]),'join_list':([48,68,],[67,86,]),'join_clause':([48,68,],[68,68,]),'group_by_clause':([85,],[92,]),'plot_clause':([92,],[97,]),'order_clause':([97,],[102,]),'limit_clause':([102,],[110,]),'approx_clause':([110,],[118,]),'order_direction':([123,],[127,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -27,48 +27,65 @@ for _k, _v in _lr_goto_items.items():
 del _lr_goto_items
 _lr_productions = [
   ("S' -> query","S'",1,None,None,None),
-  ('query -> select_query','query',1,'p_query','edsql_compiler.py',90),
-  ('query -> insert_query','query',1,'p_query','edsql_compiler.py',91),
-  ('query -> delete_query','query',1,'p_query','edsql_compiler.py',92),
-  ('select_query -> SELECT select_list FROM IDENTIFIER where_clause group_by_clause plot_clause order_clause limit_clause SEMICOLON','select_query',10,'p_select_query','edsql_compiler.py',96),
-  ('insert_query -> INSERT insert_items SEMICOLON','insert_query',3,'p_insert_query','edsql_compiler.py',100),
-  ('insert_items -> insert_item COMMA insert_items','insert_items',3,'p_insert_items','edsql_compiler.py',104),
-  ('insert_items -> insert_item','insert_items',1,'p_insert_items','edsql_compiler.py',105),
-  ('insert_item -> IDENTIFIER EQUALS value','insert_item',3,'p_insert_item','edsql_compiler.py',113),
-  ('delete_query -> DELETE where_clause SEMICOLON','delete_query',3,'p_delete_query','edsql_compiler.py',117),
-  ('value -> NUMBER','value',1,'p_value','edsql_compiler.py',121),
-  ('value -> STRING','value',1,'p_value','edsql_compiler.py',122),
-  ('select_list -> ASTERISK','select_list',1,'p_select_list','edsql_compiler.py',126),
-  ('select_list -> expression COMMA select_list','select_list',3,'p_select_list','edsql_compiler.py',127),
-  ('select_list -> expression','select_list',1,'p_select_list','edsql_compiler.py',128),
-  ('expression -> IDENTIFIER','expression',1,'p_expression','edsql_compiler.py',137),
-  ('expression -> function_call','expression',1,'p_expression','edsql_compiler.py',138),
-  ('expression -> avg_function','expression',1,'p_expression','edsql_compiler.py',139),
-  ('expression -> custom_metric','expression',1,'p_expression','edsql_compiler.py',140),
-  ('function_call -> IDENTIFIER LPAREN arg_list RPAREN','function_call',4,'p_function_call','edsql_compiler.py',144),
-  ('avg_function -> AVG LPAREN IDENTIFIER RPAREN','avg_function',4,'p_avg_function','edsql_compiler.py',148),
-  ('custom_metric -> CUSTOM_METRIC LPAREN IDENTIFIER COMMA arg_list RPAREN','custom_metric',6,'p_custom_metric','edsql_compiler.py',152),
-  ('arg_list -> IDENTIFIER COMMA arg_list','arg_list',3,'p_arg_list','edsql_compiler.py',157),
-  ('arg_list -> IDENTIFIER','arg_list',1,'p_arg_list','edsql_compiler.py',158),
-  ('where_clause -> WHERE condition','where_clause',2,'p_where_clause','edsql_compiler.py',165),
-  ('where_clause -> empty','where_clause',1,'p_where_clause','edsql_compiler.py',166),
-  ('condition -> IDENTIFIER GREATER_THAN NUMBER','condition',3,'p_condition','edsql_compiler.py',170),
-  ('condition -> IDENTIFIER LESS_THAN NUMBER','condition',3,'p_condition','edsql_compiler.py',171),
-  ('condition -> IDENTIFIER EQUALS STRING','condition',3,'p_condition','edsql_compiler.py',172),
-  ('condition -> IDENTIFIER LIKE STRING','condition',3,'p_condition','edsql_compiler.py',173),
-  ('condition -> IDENTIFIER EQUALS NUMBER','condition',3,'p_condition','edsql_compiler.py',174),
-  ('condition -> IDENTIFIER ENDS WITH STRING','condition',4,'p_condition','edsql_compiler.py',175),
-  ('group_by_clause -> GROUP BY IDENTIFIER','group_by_clause',3,'p_group_by_clause','edsql_compiler.py',183),
-  ('group_by_clause -> empty','group_by_clause',1,'p_group_by_clause','edsql_compiler.py',184),
-  ('order_clause -> ORDER BY IDENTIFIER order_direction','order_clause',4,'p_order_clause','edsql_compiler.py',188),
-  ('order_clause -> empty','order_clause',1,'p_order_clause','edsql_compiler.py',189),
-  ('order_direction -> ASC','order_direction',1,'p_order_direction','edsql_compiler.py',196),
-  ('order_direction -> DESC','order_direction',1,'p_order_direction','edsql_compiler.py',197),
-  ('limit_clause -> LIMIT NUMBER','limit_clause',2,'p_limit_clause','edsql_compiler.py',201),
-  ('limit_clause -> empty','limit_clause',1,'p_limit_clause','edsql_compiler.py',202),
-  ('plot_clause -> PLOT BAR GRAPH','plot_clause',3,'p_plot_clause','edsql_compiler.py',209),
-  ('plot_clause -> PLOT LINE GRAPH','plot_clause',3,'p_plot_clause','edsql_compiler.py',210),
-  ('plot_clause -> PLOT PIE CHART','plot_clause',3,'p_plot_clause','edsql_compiler.py',211),
-  ('plot_clause -> empty','plot_clause',1,'p_plot_clause','edsql_compiler.py',212),
-  ('empty -> <empty>','empty',0,'p_empty','edsql_compiler.py',216),
+  ('query -> select_query','query',1,'p_query','edsql_compiler.py',120),
+  ('query -> insert_query','query',1,'p_query','edsql_compiler.py',121),
+  ('query -> delete_query','query',1,'p_query','edsql_compiler.py',122),
+  ('query -> explain_query','query',1,'p_query','edsql_compiler.py',123),
+  ('query -> analyze_query','query',1,'p_query','edsql_compiler.py',124),
+  ('select_query -> SELECT select_list FROM IDENTIFIER join_list where_clause group_by_clause plot_clause order_clause limit_clause approx_clause SEMICOLON','select_query',12,'p_select_query','edsql_compiler.py',128),
+  ('join_list -> join_clause join_list','join_list',2,'p_join_list','edsql_compiler.py',132),
+  ('join_list -> empty','join_list',1,'p_join_list','edsql_compiler.py',133),
+  ('join_clause -> JOIN IDENTIFIER ON IDENTIFIER EQUALS IDENTIFIER','join_clause',6,'p_join_clause','edsql_compiler.py',137),
+  ('explain_query -> EXPLAIN select_query','explain_query',2,'p_explain_query','edsql_compiler.py',141),
+  ('explain_query -> EXPLAIN ANALYZE select_query','explain_query',3,'p_explain_query','edsql_compiler.py',142),
+  ('analyze_query -> ANALYZE IDENTIFIER SEMICOLON','analyze_query',3,'p_analyze_query','edsql_compiler.py',149),
+  ('insert_query -> INSERT insert_items SEMICOLON','insert_query',3,'p_insert_query','edsql_compiler.py',153),
+  ('insert_items -> insert_item COMMA insert_items','insert_items',3,'p_insert_items','edsql_compiler.py',157),
+  ('insert_items -> insert_item','insert_items',1,'p_insert_items','edsql_compiler.py',158),
+  ('insert_item -> IDENTIFIER EQUALS value','insert_item',3,'p_insert_item','edsql_compiler.py',166),
+  ('delete_query -> DELETE where_clause SEMICOLON','delete_query',3,'p_delete_query','edsql_compiler.py',170),
+  ('value -> NUMBER','value',1,'p_value','edsql_compiler.py',174),
+  ('value -> STRING','value',1,'p_value','edsql_compiler.py',175),
+  ('select_list -> ASTERISK','select_list',1,'p_select_list','edsql_compiler.py',179),
+  ('select_list -> expression COMMA select_list','select_list',3,'p_select_list','edsql_compiler.py',180),
+  ('select_list -> expression','select_list',1,'p_select_list','edsql_compiler.py',181),
+  ('expression -> IDENTIFIER','expression',1,'p_expression','edsql_compiler.py',190),
+  ('expression -> function_call','expression',1,'p_expression','edsql_compiler.py',191),
+  ('expression -> avg_function','expression',1,'p_expression','edsql_compiler.py',192),
+  ('expression -> aggregate_function','expression',1,'p_expression','edsql_compiler.py',193),
+  ('expression -> custom_metric','expression',1,'p_expression','edsql_compiler.py',194),
+  ('function_call -> IDENTIFIER LPAREN arg_list RPAREN','function_call',4,'p_function_call','edsql_compiler.py',198),
+  ('aggregate_function -> SUM LPAREN IDENTIFIER RPAREN','aggregate_function',4,'p_aggregate_function','edsql_compiler.py',202),
+  ('aggregate_function -> COUNT LPAREN IDENTIFIER RPAREN','aggregate_function',4,'p_aggregate_function','edsql_compiler.py',203),
+  ('aggregate_function -> COUNT LPAREN ASTERISK RPAREN','aggregate_function',4,'p_aggregate_function','edsql_compiler.py',204),
+  ('aggregate_function -> COUNT LPAREN DISTINCT IDENTIFIER RPAREN','aggregate_function',5,'p_aggregate_function','edsql_compiler.py',205),
+  ('avg_function -> AVG LPAREN IDENTIFIER RPAREN','avg_function',4,'p_avg_function','edsql_compiler.py',212),
+  ('custom_metric -> CUSTOM_METRIC LPAREN IDENTIFIER COMMA arg_list RPAREN','custom_metric',6,'p_custom_metric','edsql_compiler.py',216),
+  ('arg_list -> IDENTIFIER COMMA arg_list','arg_list',3,'p_arg_list','edsql_compiler.py',221),
+  ('arg_list -> IDENTIFIER','arg_list',1,'p_arg_list','edsql_compiler.py',222),
+  ('where_clause -> WHERE condition','where_clause',2,'p_where_clause','edsql_compiler.py',229),
+  ('where_clause -> empty','where_clause',1,'p_where_clause','edsql_compiler.py',230),
+  ('condition -> IDENTIFIER GREATER_THAN NUMBER','condition',3,'p_condition','edsql_compiler.py',234),
+  ('condition -> IDENTIFIER LESS_THAN NUMBER','condition',3,'p_condition','edsql_compiler.py',235),
+  ('condition -> IDENTIFIER EQUALS STRING','condition',3,'p_condition','edsql_compiler.py',236),
+  ('condition -> IDENTIFIER LIKE STRING','condition',3,'p_condition','edsql_compiler.py',237),
+  ('condition -> IDENTIFIER EQUALS NUMBER','condition',3,'p_condition','edsql_compiler.py',238),
+  ('condition -> IDENTIFIER ENDS WITH STRING','condition',4,'p_condition','edsql_compiler.py',239),
+  ('group_by_clause -> GROUP BY IDENTIFIER','group_by_clause',3,'p_group_by_clause','edsql_compiler.py',247),
+  ('group_by_clause -> empty','group_by_clause',1,'p_group_by_clause','edsql_compiler.py',248),
+  ('order_clause -> ORDER BY IDENTIFIER order_direction','order_clause',4,'p_order_clause','edsql_compiler.py',252),
+  ('order_clause -> empty','order_clause',1,'p_order_clause','edsql_compiler.py',253),
+  ('order_direction -> ASC','order_direction',1,'p_order_direction','edsql_compiler.py',260),
+  ('order_direction -> DESC','order_direction',1,'p_order_direction','edsql_compiler.py',261),
+  ('limit_clause -> LIMIT NUMBER','limit_clause',2,'p_limit_clause','edsql_compiler.py',265),
+  ('limit_clause -> empty','limit_clause',1,'p_limit_clause','edsql_compiler.py',266),
+  ('approx_clause -> APPROX','approx_clause',1,'p_approx_clause','edsql_compiler.py',273),
+  ('approx_clause -> APPROX WITH ERROR NUMBER PERCENT','approx_clause',5,'p_approx_clause','edsql_compiler.py',274),
+  ('approx_clause -> WITH ERROR NUMBER PERCENT','approx_clause',4,'p_approx_clause','edsql_compiler.py',275),
+  ('approx_clause -> empty','approx_clause',1,'p_approx_clause','edsql_compiler.py',276),
+  ('plot_clause -> PLOT BAR GRAPH','plot_clause',3,'p_plot_clause','edsql_compiler.py',283),
+  ('plot_clause -> PLOT LINE GRAPH','plot_clause',3,'p_plot_clause','edsql_compiler.py',284),
+  ('plot_clause -> PLOT PIE CHART','plot_clause',3,'p_plot_clause','edsql_compiler.py',285),
+  ('plot_clause -> empty','plot_clause',1,'p_plot_clause','edsql_compiler.py',286),
+  ('empty -> <empty>','empty',0,'p_empty','edsql_compiler.py',290),
 ]
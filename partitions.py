@@ -0,0 +1,147 @@
+"""Partitioned table layout.
+
+A table partitioned by a column (class, section) is stored clustered on
+that column: the rows of each partition are one contiguous range, so a
+partition is a zero-copy row slice of every column.  The Partitions index
+kept with the table maps each key to its range; the executor uses it to
+skip partitions a WHERE on the key cannot match and to aggregate a GROUP
+BY on the key one partition at a time, on a thread pool for large
+inputs.  Frames derived by filters keep their rows in order, so they stay
+clustered and carry an updated index along.
+"""
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+PARTITION_WORKERS = int(os.environ.get("EDSQL_PARTITION_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Handing partitions to worker threads costs more than a cheap aggregate
+# below this many rows, so smaller inputs run on the calling thread
+PARALLEL_MIN_ROWS = int(os.environ.get("EDSQL_PARALLEL_MIN_ROWS", "2000000"))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Partitions:
+    column: str
+    keys: pd.DataFrame         # one row per partition: its key, in table order
+    offsets: np.ndarray        # partition i is rows offsets[i]:offsets[i + 1]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def parts(self, df, selected=None):
+        """Row slices of df, one per (selected) non-empty partition."""
+        selected = range(len(self)) if selected is None else selected
+        return [df.iloc[self.offsets[i]:self.offsets[i + 1]]
+                for i in selected if self.offsets[i + 1] > self.offsets[i]]
+
+    def subset(self, selected):
+        """Index of the frame made of the selected partitions, in order."""
+        selected = np.asarray(selected, dtype=np.intp)
+        offsets = np.concatenate([[0], np.cumsum(self.sizes()[selected])])
+        return Partitions(self.column, self.keys.take(selected).reset_index(drop=True), offsets)
+
+    def follow(self, df, result):
+        """Index of result, an order-preserving row subset of df (e.g. a filter)."""
+        positions = df.index.get_indexer(result.index)
+        return Partitions(self.column, self.keys, np.searchsorted(positions, self.offsets))
+
+
+def partition_table(df, column):
+    """Cluster df on column; returns (clustered frame, Partitions).
+
+    Rows keep their relative order within a partition.  A frame that is
+    already clustered (e.g. after a DELETE) is returned as is; rows
+    appended by an INSERT move into their partition's range.
+    """
+    codes, uniques = pd.factorize(df[column], sort=True)
+    codes = np.where(codes < 0, len(uniques), codes)       # missing keys go last
+    if len(codes) and np.any(codes[1:] < codes[:-1]):
+        df = df.take(np.argsort(codes, kind='stable'))
+        codes = np.sort(codes, kind='stable')
+    df = df.reset_index(drop=True)
+    counts = np.bincount(codes, minlength=len(uniques) + 1)
+    present = np.flatnonzero(counts)
+    offsets = np.concatenate([[0], np.cumsum(counts[present])])
+    keys = df[[column]].take(offsets[:-1]).reset_index(drop=True)
+    return df, Partitions(column, keys, offsets)
+
+
+# ------------------ Layout Registry ------------------
+# Which frames are clustered, and how.  Entries live as long as the frame,
+# like the lower-cased shadow columns in string_match.
+
+_layouts = {}
+_layout_lock = threading.Lock()
+
+
+def _forget(key):
+    with _layout_lock:
+        _layouts.pop(key, None)
+
+
+def remember(df, layout):
+    """Record that df is clustered as described by layout."""
+    key = id(df)
+    with _layout_lock:
+        _layouts[key] = (weakref.ref(df, lambda _, key=key: _forget(key)), layout)
+    return df
+
+
+def layout_of(df):
+    """Partitions index of a clustered frame, or None."""
+    with _layout_lock:
+        entry = _layouts.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return None
+
+
+# ------------------ Partition-parallel Execution ------------------
+# Threads rather than processes: partitions are slices of the shared
+# table, so nothing is copied, and the pandas kernels doing the work
+# release the GIL.
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(PARTITION_WORKERS, thread_name_prefix="edsql-partition")
+        return _pool
+
+
+def _parallel(func, node, parts, checkpoint):
+    futures = [_executor().submit(func, node, part) for part in parts]
+    try:
+        results = []
+        for future in futures:
+            if checkpoint is not None:
+                checkpoint()
+            results.append(future.result())
+        return results
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def map_partitions(func, node, parts, checkpoint=None):
+    """[func(node, part) for part in parts], on worker threads when worthwhile."""
+    if PARTITION_WORKERS > 1 and len(parts) > 1 and sum(map(len, parts)) >= PARALLEL_MIN_ROWS:
+        return _parallel(func, node, parts, checkpoint)
+    results = []
+    for part in parts:
+        if checkpoint is not None:
+            checkpoint()
+        results.append(func(node, part))
+    return results
@@ -0,0 +1,259 @@
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from edsql_ast import (
+    Aggregate, Condition, CustomMetric, Expression, FuncCall, Star, output_name,
+)
+
+# ------------------ Logical Plan Nodes ------------------
+# Plans are trees of frozen, slotted dataclasses.  Like the AST they are
+# hashable, so an optimized plan can be cached and reused as a key.
+
+
+@dataclass(frozen=True, slots=True)
+class Scan:
+    table: str
+
+
+@dataclass(frozen=True, slots=True)
+class Join:
+    child: 'PlanNode'                 # probe input: the rows joined so far
+    table: str                        # table scanned for the other side
+    left_key: str
+    right_key: str
+
+
+@dataclass(frozen=True, slots=True)
+class Derive:
+    child: 'PlanNode'
+    metrics: Tuple[str, ...]          # custom metric columns to compute
+
+
+@dataclass(frozen=True, slots=True)
+class Filter:
+    child: 'PlanNode'
+    condition: Condition
+
+
+@dataclass(frozen=True, slots=True)
+class Aggregation:
+    child: 'PlanNode'
+    group_by: Optional[str]
+    items: Tuple[Expression, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Sort:
+    child: 'PlanNode'
+    column: str
+    ascending: bool
+    limit: Optional[int] = None       # set by LIMIT pushdown (top-n)
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    child: 'PlanNode'
+    count: int
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    child: 'PlanNode'
+    columns: Tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Plot:
+    child: 'PlanNode'
+    kind: str
+
+
+PlanNode = object  # any of the node classes above
+
+
+def schema_of(df):
+    """Hashable (column, kind) description of a DataFrame used for folding."""
+    def kind(dtype):
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtype = dtype.categories.dtype
+        return 'numeric' if pd.api.types.is_numeric_dtype(dtype) else 'string'
+
+    return tuple((col, kind(dtype)) for col, dtype in df.dtypes.items())
+
+
+def unique_preserve_order(seq):
+    seen = set()
+    return [x for x in seq if not (x in seen or seen.add(x))]
+
+
+# ------------------ Plan Builder ------------------
+
+def build_plan(select):
+    """Translate a Select AST node into an (unoptimized) logical plan."""
+    plan = Scan(select.table)
+    for join in select.joins:
+        plan = Join(plan, join.table, join.left_key, join.right_key)
+
+    metrics = tuple(unique_preserve_order(
+        output_name(item) for item in select.columns
+        if isinstance(item, (CustomMetric, FuncCall))
+    ))
+    if metrics:
+        plan = Derive(plan, metrics)
+
+    if select.where:
+        plan = Filter(plan, select.where)
+
+    has_aggregate = any(isinstance(item, Aggregate) for item in select.columns)
+    if select.group_by or has_aggregate:
+        plan = Aggregation(plan, select.group_by, select.columns)
+
+    if select.order_by:
+        plan = Sort(plan, select.order_by.column, select.order_by.ascending)
+
+    if select.limit is not None:
+        plan = Limit(plan, select.limit)
+
+    if not any(isinstance(item, Star) for item in select.columns):
+        columns = [output_name(item) for item in select.columns]
+        if select.group_by:
+            # Keep the group key so grouped results stay labelled
+            columns.insert(0, select.group_by)
+        plan = Project(plan, tuple(unique_preserve_order(columns)))
+
+    if select.plot:
+        plan = Plot(plan, select.plot)
+
+    return plan
+
+
+# ------------------ Rewriter / Optimizer ------------------
+
+def fold_constants(plan, schema=()):
+    """Coerce literals to the column type once and merge stacked LIMITs."""
+    kinds = dict(schema)
+
+    if isinstance(plan, Filter):
+        cond = plan.condition
+        if cond.op in ('>', '<', '=') and kinds.get(cond.column) == 'numeric' \
+                and not isinstance(cond.value, float):
+            try:
+                cond = replace(cond, value=float(cond.value))
+            except (TypeError, ValueError):
+                pass
+        elif cond.op in ('>', '<', '=') and kinds.get(cond.column) == 'string' \
+                and not isinstance(cond.value, str):
+            cond = replace(cond, value=str(cond.value))
+        # Unchanged nodes come back as themselves (see _rewrite)
+        return plan if cond is plan.condition else Filter(plan.child, cond)
+
+    if isinstance(plan, Limit) and isinstance(plan.child, Limit):
+        return Limit(plan.child.child, min(plan.count, plan.child.count))
+
+    return plan
+
+
+def remove_redundant_projection(plan, schema=()):
+    """Drop projections that cannot change the shape of their input."""
+    if not isinstance(plan, Project):
+        return plan
+
+    child = plan.child
+    if isinstance(child, Project) and set(plan.columns) <= set(child.columns):
+        return Project(child.child, plan.columns)
+
+    if isinstance(child, Aggregation):
+        produced = ([child.group_by] if child.group_by else []) + [
+            output_name(item) for item in child.items
+        ]
+        if tuple(unique_preserve_order(produced)) == plan.columns:
+            return child
+
+    return plan
+
+
+def push_down_limit(plan, schema=()):
+    """Move LIMIT below row-preserving operators and fuse it into ORDER BY."""
+    if not isinstance(plan, Limit):
+        return plan
+
+    child = plan.child
+    if isinstance(child, Project):
+        return Project(Limit(child.child, plan.count), child.columns)
+    if isinstance(child, Derive):
+        return Derive(Limit(child.child, plan.count), child.metrics)
+    if isinstance(child, Sort):
+        count = plan.count if child.limit is None else min(plan.count, child.limit)
+        return replace(child, limit=count)
+
+    return plan
+
+
+RULES = (fold_constants, remove_redundant_projection, push_down_limit)
+
+
+def _rewrite(plan, schema):
+    # Rewrite bottom-up, then re-apply the rules at this node until stable
+    if hasattr(plan, 'child'):
+        plan = replace(plan, child=_rewrite(plan.child, schema))
+
+    while True:
+        new_plan = plan
+        for rule in RULES:
+            new_plan = rule(new_plan, schema)
+        # Identity, not ==: a folded literal compares equal to the
+        # original (80 == 80.0), so equality would discard the rewrite
+        if new_plan is plan:
+            return plan
+        plan = new_plan
+        if hasattr(plan, 'child'):
+            plan = replace(plan, child=_rewrite(plan.child, schema))
+
+
+def optimize(plan, schema=()):
+    """Apply constant folding, projection removal and LIMIT pushdown."""
+    return _rewrite(plan, schema)
+
+
+@lru_cache(maxsize=256)
+def plan_select(select, schema=()):
+    """Build and optimize the plan for a Select; cached by AST and schema."""
+    return optimize(build_plan(select), schema)
+
+
+
+STAGE_NAMES = {
+    Scan: 'SCAN',
+    Join: 'JOIN',
+    Derive: 'CUSTOM METRIC',
+    Filter: 'WHERE',
+    Aggregation: 'GROUP BY',
+    Sort: 'ORDER BY',
+    Limit: 'LIMIT',
+    Project: 'PROJECTION',
+    Plot: 'PLOT',
+}
+
+
+def plan_nodes(plan):
+    """Nodes of a plan in execution order (leaf first)."""
+    nodes = []
+    while plan is not None:
+        nodes.append(plan)
+        plan = getattr(plan, 'child', None)
+    return nodes[::-1]
+
+
+def format_plan(plan, indent=0):
+    """Render a plan tree as indented text, root first."""
+    fields = ', '.join(
+        f"{name}={getattr(plan, name)!r}"
+        for name in plan.__slots__ if name != 'child'
+    )
+    line = "  " * indent + f"{type(plan).__name__}({fields})"
+    if hasattr(plan, 'child'):
+        return line + "\n" + format_plan(plan.child, indent + 1)
+    return line
@@ -0,0 +1,159 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+# Per-request profiling is only honoured when EDSQL_PROFILING=1.
+ENABLED = os.environ.get("EDSQL_PROFILING", "0") == "1"
+PROFILE_DIR = os.environ.get("EDSQL_PROFILE_DIR", "profiles")
+# At least one: the artifact just written is always kept
+PROFILE_KEEP = max(int(os.environ.get("EDSQL_PROFILE_KEEP", "50")), 1)
+SAMPLE_INTERVAL = float(os.environ.get("EDSQL_PROFILE_INTERVAL", "0.001"))
+
+MODES = {"1": "cprofile", "cprofile": "cprofile", "sample": "sample"}
+EXTENSIONS = {"cprofile": ".prof", "sample": ".collapsed"}
+
+# cProfile and the sampler both observe the whole interpreter, so only one
+# request is profiled at a time; others run unprofiled.
+_busy = threading.Lock()
+
+
+def requested_mode(value):
+    """Map a ?profile= / X-Profile value to 'cprofile', 'sample' or None."""
+    if not ENABLED or not value:
+        return None
+    return MODES.get(value.lower())
+
+
+class StackSampler:
+    """Statistical profiler sampling one thread's Python stack on a timer.
+
+    Stacks are counted in collapsed form ("outer;inner;leaf count"), the
+    input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def enable(self):
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class RequestProfile:
+    """A profiler attached to one request; see start_profile()."""
+
+    def __init__(self, mode):
+        self.mode = mode
+        if mode == "cprofile":
+            self.profiler = cProfile.Profile()
+        else:
+            self.profiler = StackSampler(threading.get_ident())
+        self.profiler.enable()
+
+    def finish(self):
+        """Stop profiling and return the artifact as bytes."""
+        self.profiler.disable()
+        try:
+            if self.mode == "cprofile":
+                return _pstats_bytes(self.profiler)
+            return self.profiler.collapsed().encode()
+        finally:
+            _busy.release()
+
+
+def _pstats_bytes(profiler):
+    # pstats can only dump to a file name; marshal via a temporary path
+    path = os.path.join(PROFILE_DIR, f".tmp-{uuid.uuid4().hex}")
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    try:
+        profiler.dump_stats(path)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def start_profile(mode):
+    """Begin profiling the current request, or return None if one is running."""
+    if not _busy.acquire(blocking=False):
+        return None
+    try:
+        return RequestProfile(mode)
+    except Exception:
+        _busy.release()
+        raise
+
+
+# ------------------ On-disk ring buffer ------------------
+
+_store_lock = threading.Lock()
+
+
+def save_profile(mode, data):
+    """Write an artifact, pruning the oldest beyond PROFILE_KEEP. Returns its id."""
+    now = time.time()
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}"
+    profile_id = stamp + "-" + uuid.uuid4().hex[:8]
+    with _store_lock:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(os.path.join(PROFILE_DIR, profile_id + EXTENSIONS[mode]), "wb") as f:
+            f.write(data)
+        # Ids from the same millisecond do not sort in write order, so the
+        # new artifact is set aside rather than trusted to sort last
+        older = [name for name in list_profiles() if not name.startswith(profile_id)]
+        for name in older[:len(older) - (PROFILE_KEEP - 1)]:
+            os.remove(os.path.join(PROFILE_DIR, name))
+    return profile_id
+
+
+def list_profiles():
+    """Stored artifact file names, oldest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(PROFILE_DIR)
+        if name.endswith(tuple(EXTENSIONS.values()))
+    )
+
+
+def find_profile(profile_id):
+    """Path of a stored artifact by id, or None."""
+    for ext in EXTENSIONS.values():
+        path = os.path.join(PROFILE_DIR, os.path.basename(profile_id) + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def summarize(path, limit=40):
+    """Human readable top functions by cumulative time for a .prof file."""
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,54 @@
+"""Append-only log of answered queries, replayed at startup to warm caches.
+
+Every query the app answers is appended to a JSON-lines file (one
+{"ts", "query", "sql"} object per line, like requests.jsonl).  On startup
+the most frequent recent queries are read back so they can be run once
+before the worker reports ready on /healthz/ready.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+LOG_PATH = os.environ.get("EDSQL_QUERY_LOG", "query_log.jsonl")   # "" disables logging
+WARMUP_QUERIES = int(os.environ.get("EDSQL_WARMUP_QUERIES", "20"))
+# Only this many of the latest entries are considered for warm-up
+SCAN_ENTRIES = 100_000
+
+
+class QueryLog:
+    def __init__(self, path=LOG_PATH):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def record(self, query, sql_query):
+        """Append one answered query; logging failures never fail the request."""
+        if not self.path:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), "query": query, "sql": sql_query}) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(line)
+            except OSError:
+                pass
+
+    def top(self, n=WARMUP_QUERIES):
+        """The n most frequent recent queries as (query, last EDSQL it ran as)."""
+        if not self.path or n <= 0 or not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            tail = deque(f, maxlen=SCAN_ENTRIES)
+        counts, sql = Counter(), {}
+        for line in tail:
+            try:
+                entry = json.loads(line)
+                query = entry["query"]
+            except (ValueError, KeyError, TypeError):
+                continue   # a torn last line or a hand-edited entry
+            counts[query] += 1
+            sql[query] = entry.get("sql")
+        return [(query, sql[query]) for query, _ in counts.most_common(n)]
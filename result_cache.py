@@ -0,0 +1,113 @@
+import heapq
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import metrics
+
+DEFAULT_BUDGET = int(os.environ.get("EDSQL_RESULT_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+
+@dataclass(slots=True)
+class CachedResult:
+    result: Any                  # materialized DataFrame
+    html: Optional[str] = None   # rendered table
+    graph: Optional[str] = None  # base64 PNG chart
+    size: int = 0
+    cost: float = 1.0            # seconds it took to compute, reused on every hit
+    priority: float = 0.0
+
+
+def result_size(result, html=None, graph=None):
+    """Approximate resident bytes of a cached entry."""
+    size = int(result.memory_usage(index=True, deep=True).sum())
+    return size + len(html or "") + len(graph or "")
+
+
+class ResultCache:
+    """Materialized query results keyed by (((table, version), ...), plan).
+
+    Writes bump the table version, so stale entries can never be hit; they
+    are dropped eagerly by invalidate().  Eviction is GreedyDual-Size: each
+    entry's priority is the cache clock plus cost / size, so small results
+    that were expensive to compute outlive large cheap ones.  The clock
+    advances to the priority of each evicted entry, ageing out anything
+    not re-referenced.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET):
+        self.budget = budget_bytes
+        self.used = 0
+        self._entries = {}
+        self._heap = []   # (priority, seq, key); stale items skipped lazily
+        self._seq = 0
+        self._clock = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                metrics.inc("result_cache_misses")
+                return None
+            metrics.inc("result_cache_hits")
+            self._touch(key, entry)
+            return entry
+
+    def put(self, key, result, cost=1.0, html=None, graph=None):
+        """Store a result; cost is typically the seconds spent computing it."""
+        size = result_size(result, html, graph)
+        if size > self.budget:
+            return None
+        entry = CachedResult(result, html, graph, size, cost)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.used -= old.size
+            while self.used + size > self.budget and self._entries:
+                self._evict_one()
+            self._entries[key] = entry
+            self.used += size
+            self._touch(key, entry)
+        return entry
+
+    def invalidate(self, table, version):
+        """Drop entries that read table at a version older than version."""
+        with self._lock:
+            stale = [k for k in self._entries
+                     if any(t == table and v < version for t, v in k[0])]
+            for key in stale:
+                self.used -= self._entries.pop(key).size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+            self.used = 0
+
+    def _touch(self, key, entry):
+        entry.priority = self._clock + entry.cost / max(entry.size, 1)
+        self._seq += 1
+        heapq.heappush(self._heap, (entry.priority, self._seq, key))
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            # Drop superseded heap items left behind by repeated hits
+            self._heap = []
+            for k, e in self._entries.items():
+                self._seq += 1
+                self._heap.append((e.priority, self._seq, k))
+            heapq.heapify(self._heap)
+
+    def _evict_one(self):
+        while self._heap:
+            priority, _, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry.priority == priority:
+                del self._entries[key]
+                self.used -= entry.size
+                self._clock = priority
+                metrics.inc("result_cache_evictions")
+                return
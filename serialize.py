@@ -0,0 +1,91 @@
+"""Machine-readable query results for /api/query.
+
+Result frames are encoded column by column with pandas' C JSON writer or
+pyarrow, never through per-row Python objects:
+
+* application/json - columnar: {"columns": [...], "rows": n, "data": [[...], ...]}
+  with one array per column
+* application/x-ndjson - one JSON object per row
+* application/vnd.apache.arrow.stream - Arrow IPC stream (needs pyarrow)
+
+JSON floats are written with pandas' 10 decimal places; Arrow keeps the
+exact values.
+
+Payloads are compressed with zstd (when the zstandard package is
+installed) or gzip, whichever the client's Accept-Encoding prefers.
+"""
+import gzip
+import json
+import time
+
+import metrics
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+FORMATS = {"json": JSON, "ndjson": NDJSON, "arrow": ARROW_STREAM}
+MEDIA_TYPES = [JSON, NDJSON] + ([ARROW_STREAM] if pa is not None else [])
+ENCODINGS = (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+# Small payloads are not worth a compression frame
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+
+
+def to_columnar_json(df):
+    columns = json.dumps([str(c) for c in df.columns])
+    data = ",".join(df[col].to_json(orient="values", date_format="iso") for col in df.columns)
+    return f'{{"columns":{columns},"rows":{len(df)},"data":[{data}]}}'.encode()
+
+
+def to_ndjson(df):
+    if df.empty:
+        return b""
+    return df.to_json(orient="records", lines=True, date_format="iso").encode()
+
+
+def to_arrow_stream(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+ENCODERS = {JSON: to_columnar_json, NDJSON: to_ndjson, ARROW_STREAM: to_arrow_stream}
+
+
+def encode(df, media_type):
+    """Serialize a result frame as media_type (one of MEDIA_TYPES)."""
+    start = time.perf_counter()
+    # Every format wants string column labels and no index
+    df = df.reset_index(drop=True)
+    df.columns = [str(c) for c in df.columns]
+    payload = ENCODERS[media_type](df)
+    metrics.observe("api_serialize", time.perf_counter() - start)
+    return payload
+
+
+def compress(payload, encoding):
+    """Compress payload with encoding ('zstd', 'gzip' or None); returns (bytes, encoding used)."""
+    if encoding is None or len(payload) < MIN_COMPRESS_BYTES:
+        return payload, None
+    start = time.perf_counter()
+    if encoding == "zstd":
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    else:
+        payload = gzip.compress(payload, compresslevel=GZIP_LEVEL)
+    metrics.observe("api_compress", time.perf_counter() - start)
+    return payload, encoding
@@ -0,0 +1,497 @@
+"""Column statistics for selectivity estimation.
+
+For every column of a table we keep the row and null counts, min/max, a
+HyperLogLog sketch of the distinct values, an equi-depth histogram for
+numeric columns and exact per-value counts for low-cardinality and
+dictionary-encoded columns (class, section, name).  ANALYZE <table>; rebuilds them on demand;
+otherwise they are collected in a background thread the first time a
+table is queried and folded forward on every INSERT, with a full
+rebuild once enough rows have changed since the last one.
+
+Alongside the column statistics each table keeps a small stratified
+sample (up to SAMPLE_PER_STRATUM rows per class) that APPROX queries are
+answered from; see approx.py.  Inserts reach it by reservoir sampling;
+a delete drops it until a new one is drawn in the background.
+"""
+import math
+import queue
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from storage import MAX_CATEGORIES
+from string_match import LikePlan, match_mask, plan_like
+
+HLL_PRECISION = 12          # 4096 registers, ~1.6% standard error
+HISTOGRAM_BUCKETS = 32
+MAX_MCV = 128               # keep exact value counts up to this many distinct values
+REBUILD_FRACTION = 0.2      # rebuild once this share of rows changed since the last one
+SAMPLE_PER_STRATUM = 2000   # sampled rows kept per stratum for APPROX queries
+STRATIFY_BY = ('class', 'section')  # the first of these columns a table has
+
+# Fallback selectivities when a predicate cannot be estimated from stats
+DEFAULT_RANGE_SELECTIVITY = 1 / 3
+DEFAULT_MATCH_SELECTIVITY = 0.1
+
+_rng = np.random.default_rng()   # reservoir draws (the stats thread only)
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch over 64-bit value hashes."""
+    __slots__ = ('p', 'registers')
+
+    def __init__(self, p=HLL_PRECISION):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add(self, series):
+        """Add the non-null values of a Series."""
+        series = series.dropna()
+        if series.empty:
+            return
+        if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            # Hash every numeric width the same way (int8 7 == int64 7 == 7.0)
+            series = series.astype('float64')
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.cat.categories.dtype)
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+        tail_bits = 64 - self.p
+        index = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        # tail_bits <= 53, so the tail converts to float exactly and frexp's
+        # exponent is its bit length
+        tail = (hashes & np.uint64((1 << tail_bits) - 1)).astype(np.float64)
+        rank = (tail_bits + 1 - np.frexp(tail)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def copy(self):
+        other = HyperLogLog(self.p)
+        other.registers = self.registers.copy()
+        return other
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)   # linear counting for small sets
+        return int(round(estimate))
+
+
+@dataclass(slots=True)
+class ColumnStats:
+    column: str
+    kind: str                                # 'numeric' or 'string'
+    rows: int = 0
+    nulls: int = 0
+    min: Any = None
+    max: Any = None
+    sketch: HyperLogLog = field(default_factory=HyperLogLog)
+    bounds: Optional[np.ndarray] = None      # equi-depth histogram edges (numeric)
+    counts: Optional[np.ndarray] = None      # rows per histogram bucket
+    frequencies: Optional[Dict[Any, int]] = None  # exact counts when few distinct values
+    frequency_limit: int = MAX_MCV           # distinct values beyond which they are dropped
+
+    @property
+    def distinct(self):
+        if self.frequencies is not None:
+            return sum(1 for c in self.frequencies.values() if c > 0)
+        return max(self.sketch.count(), 1)
+
+
+def _strata(df, column):
+    """Stratum key of every row (None for a missing value, or without a column)."""
+    if column is None:
+        return np.full(len(df), None, dtype=object)
+    keys = df[column].astype(object)
+    return keys.where(keys.notna(), None).to_numpy()
+
+
+@dataclass(slots=True)
+class StratifiedSample:
+    """Uniform random rows from every stratum of a table, with its stratum sizes.
+
+    Treat it as immutable: folding inserts in builds a new sample, so a
+    query that picked one up keeps a consistent view.
+    """
+    column: Optional[str]                    # stratification column, None if unstratified
+    frame: pd.DataFrame                      # the sampled rows (RangeIndex)
+    strata: np.ndarray                       # stratum key of each sampled row
+    population: Dict[Any, int]               # rows per stratum in the table
+    sizes: Dict[Any, int]                    # sampled rows per stratum
+
+    def fold(self, rows, rng):
+        """A new sample with appended rows taken in by per-stratum reservoir sampling."""
+        keys = _strata(rows, self.column)
+        slots = {}                           # stratum -> kept rows (old >= 0, new < 0)
+        for position, key in enumerate(self.strata):
+            slots.setdefault(key, []).append(position)
+        population = dict(self.population)
+        for i, key in enumerate(keys):
+            seen = population.get(key, 0) + 1
+            population[key] = seen
+            kept = slots.setdefault(key, [])
+            if len(kept) < SAMPLE_PER_STRATUM:
+                kept.append(-i - 1)
+            else:
+                j = int(rng.integers(seen))
+                if j < SAMPLE_PER_STRATUM:
+                    kept[j] = -i - 1
+        old = np.sort([p for kept in slots.values() for p in kept if p >= 0]).astype(np.intp)
+        new = np.sort([-p - 1 for kept in slots.values() for p in kept if p < 0]).astype(np.intp)
+        frame = pd.concat([self.frame.take(old), rows.take(new)], ignore_index=True)
+        strata = np.concatenate([self.strata[old], keys[new]])
+        sizes = {key: len(kept) for key, kept in slots.items()}
+        return StratifiedSample(self.column, frame, strata, population, sizes)
+
+
+def build_sample(df, rng=None):
+    """Sample up to SAMPLE_PER_STRATUM rows from each stratum of df."""
+    rng = rng or np.random.default_rng()
+    column = next((c for c in STRATIFY_BY if c in df.columns), None)
+    strata = _strata(df, column)
+    codes = pd.factorize(strata, use_na_sentinel=False)[0]
+    # Rank of each row within its stratum in a random order: keep the first ones
+    order = rng.permutation(len(df))
+    rank = pd.Series(codes[order]).groupby(codes[order], sort=False).cumcount().to_numpy()
+    keep = np.sort(order[rank < SAMPLE_PER_STRATUM])
+    _, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    population = {strata[i]: int(n) for i, n in zip(first, counts)}
+    sampled = strata[keep]
+    _, first, counts = np.unique(codes[keep], return_index=True, return_counts=True)
+    sizes = {sampled[i]: int(n) for i, n in zip(first, counts)}
+    frame = df.take(keep).reset_index(drop=True)
+    return StratifiedSample(column, frame, sampled, population, sizes)
+
+
+@dataclass(slots=True)
+class TableStats:
+    table: str
+    version: int
+    rows: int
+    columns: Dict[str, ColumnStats]
+    modified: int = 0                        # rows changed since the last full build
+    deleted: int = 0                         # rows deleted since the last full build
+    sample: Optional[StratifiedSample] = None   # None while a DELETE has made it stale
+
+
+def _kind(series):
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    return 'numeric' if pd.api.types.is_numeric_dtype(dtype) else 'string'
+
+
+def _key(value, kind):
+    # Normalized MCV key: numbers compare as float, everything else as str
+    return float(value) if kind == 'numeric' else str(value)
+
+
+def _value_counts(series, kind):
+    counts = series.value_counts(dropna=True)
+    return {_key(v, kind): int(c) for v, c in counts.items() if c > 0}
+
+
+def collect_column(name, series):
+    """Build ColumnStats from scratch for one column."""
+    kind = _kind(series)
+    stats = ColumnStats(name, kind, rows=len(series), nulls=int(series.isna().sum()))
+    stats.sketch.add(series)
+    values = series.dropna()
+    if values.empty:
+        return stats
+    if kind == 'numeric':
+        numbers = values.astype('float64').to_numpy()
+        stats.min, stats.max = float(numbers.min()), float(numbers.max())
+        bounds = np.unique(np.quantile(numbers, np.linspace(0, 1, HISTOGRAM_BUCKETS + 1)))
+        if len(bounds) > 1:
+            stats.bounds = bounds
+            stats.counts = np.histogram(numbers, bounds)[0].astype(np.int64)
+    else:
+        strings = values.astype(str)
+        stats.min, stats.max = strings.min(), strings.max()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Dictionary-encoded: counting per category is cheap, so keep them all
+        stats.frequency_limit = MAX_CATEGORIES
+    if stats.sketch.count() <= stats.frequency_limit * 1.1:
+        frequencies = _value_counts(values, kind)
+        if len(frequencies) <= stats.frequency_limit:
+            stats.frequencies = frequencies
+    return stats
+
+
+def collect(table, df, version):
+    """Full statistics for a table version."""
+    columns = {col: collect_column(col, df[col]) for col in df.columns}
+    return TableStats(table, version, len(df), columns, sample=build_sample(df))
+
+
+def _copy_column(column):
+    return replace(
+        column,
+        sketch=column.sketch.copy(),
+        bounds=None if column.bounds is None else column.bounds.copy(),
+        counts=None if column.counts is None else column.counts.copy(),
+        frequencies=None if column.frequencies is None else dict(column.frequencies),
+    )
+
+
+def fold_insert(stats, rows, version):
+    """Statistics after appending rows, as a new TableStats.
+
+    stats itself is left untouched, since queries may be reading it.
+    """
+    columns = dict(stats.columns)
+    for col, new in rows.items():
+        column = columns.get(col)
+        if column is None:
+            continue
+        column = columns[col] = _copy_column(column)
+        values = new.dropna()
+        column.rows += len(new)
+        column.nulls += len(new) - len(values)
+        column.sketch.add(new)
+        if values.empty:
+            continue
+        if column.kind == 'numeric':
+            numbers = values.astype('float64').to_numpy()
+            low, high = float(numbers.min()), float(numbers.max())
+            if column.bounds is not None:
+                # Out-of-range values widen the outer buckets
+                column.bounds[0] = min(column.bounds[0], low)
+                column.bounds[-1] = max(column.bounds[-1], high)
+                column.counts += np.histogram(numbers, column.bounds)[0]
+        else:
+            strings = values.astype(str)
+            low, high = strings.min(), strings.max()
+        column.min = low if column.min is None else min(column.min, low)
+        column.max = high if column.max is None else max(column.max, high)
+        if column.frequencies is not None:
+            for key, count in _value_counts(values, column.kind).items():
+                column.frequencies[key] = column.frequencies.get(key, 0) + count
+            if len(column.frequencies) > column.frequency_limit:
+                column.frequencies = None
+    sample = None if stats.sample is None else stats.sample.fold(rows, _rng)
+    return replace(stats, version=version, rows=stats.rows + len(rows), columns=columns,
+                   modified=stats.modified + len(rows), sample=sample)
+
+
+def _range_fraction(column, op, value):
+    """Fraction of non-null values below (op '<') or above (op '>') value."""
+    if column.bounds is None:
+        if column.min is None or column.min == column.max:
+            return DEFAULT_RANGE_SELECTIVITY
+        below = (value - column.min) / (column.max - column.min)
+    else:
+        bounds, counts = column.bounds, column.counts
+        total = counts.sum()
+        if not total:
+            return 0.0
+        i = int(np.searchsorted(bounds, value, side='right')) - 1
+        if i < 0:
+            below = 0.0
+        elif i >= len(counts):
+            below = 1.0
+        else:
+            width = bounds[i + 1] - bounds[i]
+            inside = (value - bounds[i]) / width if width else 0.0
+            below = (counts[:i].sum() + inside * counts[i]) / total
+    below = min(max(below, 0.0), 1.0)
+    return below if op == '<' else 1.0 - below
+
+
+def selectivity(stats, condition):
+    """Estimated fraction of rows matching a WHERE Condition, or None if unknown."""
+    fraction = _match_fraction(stats, condition)
+    # DELETEs do not reach the value counts before the next rebuild, so a
+    # raw estimate can leave [0, 1]
+    return None if fraction is None else min(max(fraction, 0.0), 1.0)
+
+
+def _match_fraction(stats, condition):
+    name = condition.column
+    column = stats.columns.get(name)
+    if column is None and '.' in name:
+        column = stats.columns.get(name.split('.', 1)[1])
+    if column is None or not column.rows:
+        return None
+    present = 1.0 - column.nulls / column.rows
+    op, value = condition.op, condition.value
+
+    if op == '=':
+        try:
+            key = _key(value, column.kind)
+        except (TypeError, ValueError):
+            return 0.0
+        if column.frequencies is not None:
+            return column.frequencies.get(key, 0) / column.rows
+        return present / column.distinct
+
+    if op in ('>', '<'):
+        if column.kind != 'numeric':
+            return present * DEFAULT_RANGE_SELECTIVITY
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return 0.0
+        if column.frequencies is not None:
+            matched = sum(c for k, c in column.frequencies.items() if (k > value if op == '>' else k < value))
+            return matched / column.rows
+        return present * _range_fraction(column, op, value)
+
+    if op in ('LIKE', 'ENDS WITH'):
+        # Same matching rules as the executor: LIKE ignores case, ENDS WITH does not
+        case = op == 'ENDS WITH'
+        plan = LikePlan('suffix', value) if case else plan_like(value)
+        if column.frequencies is not None:
+            keys = pd.DataFrame({'value': [str(k) for k in column.frequencies]})
+            hits = match_mask(keys, 'value', plan, case)
+            counts = np.fromiter(column.frequencies.values(), dtype=np.int64, count=len(keys))
+            return counts[hits].sum() / column.rows
+        if plan.kind == 'all':
+            return present
+        if plan.kind == 'exact':
+            return present / column.distinct
+        return present * DEFAULT_MATCH_SELECTIVITY
+
+    return None
+
+
+class StatsStore:
+    """Statistics for the tables of a catalog, maintained in the background."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._stats = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._tasks = queue.Queue()
+        self._worker = None
+
+    def get(self, table):
+        """Latest statistics for table (possibly a version behind), or None."""
+        return self._stats.get(table)
+
+    def analyze(self, table):
+        """Rebuild statistics for the current version now (the ANALYZE command)."""
+        snapshot = self.catalog.snapshot([table])
+        (_, version), = snapshot.versions
+        stats = collect(table, snapshot[table], version)
+        with self._lock:
+            self._stats[table] = stats
+        return stats
+
+    def ensure(self, table):
+        """Collect statistics in the background unless some already exist."""
+        if table not in self._stats:
+            self._submit(table, 'analyze')
+
+    def record_insert(self, table, version, rows):
+        """A write published version by appending rows (a DataFrame)."""
+        self._submit(table, 'insert', version, rows)
+
+    def record_delete(self, table, version, count):
+        """A write published version by removing count rows."""
+        self._submit(table, 'delete', version, count)
+
+    def estimate_rows(self, table, condition):
+        """Estimated number of rows of table matching condition, or None."""
+        stats = self._stats.get(table)
+        if stats is None:
+            return None
+        fraction = selectivity(stats, condition)
+        return None if fraction is None else fraction * stats.rows
+
+    def _submit(self, table, kind, *args):
+        with self._lock:
+            if kind in ('analyze', 'resample'):
+                if (table, kind) in self._pending:
+                    return
+                self._pending.add((table, kind))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True, name="edsql-stats")
+                self._worker.start()
+        self._tasks.put((table, kind, args))
+
+    def _run(self):
+        while True:
+            table, kind, args = self._tasks.get()
+            try:
+                self._apply(table, kind, args)
+            except Exception:
+                # Statistics are advisory: a failed refresh leaves the old ones
+                pass
+
+    def _apply(self, table, kind, args):
+        if kind == 'analyze':
+            with self._lock:
+                self._pending.discard((table, kind))
+            self.analyze(table)
+            return
+        if kind == 'resample':
+            with self._lock:
+                self._pending.discard((table, kind))
+            self._resample(table)
+            return
+
+        stats = self._stats.get(table)
+        version = args[0]
+        if stats is None:
+            return                    # collected lazily on the next query
+        if stats.version >= version:
+            return                    # an ANALYZE already saw this write
+        if stats.version + 1 != version:
+            self._submit(table, 'analyze')   # missed a write: start over
+            return
+        if kind == 'insert':
+            folded = fold_insert(stats, args[1], version)
+        else:
+            # Which rows went is not known, so the sample (and the strata
+            # sizes it is weighted by) cannot be corrected: drop it until
+            # it is drawn again
+            folded = replace(stats, version=version, rows=max(stats.rows - args[1], 0),
+                             modified=stats.modified + args[1], deleted=stats.deleted + args[1],
+                             sample=None)
+        with self._lock:
+            if self._stats.get(table) is not stats:
+                return                # an ANALYZE replaced them meanwhile
+            self._stats[table] = folded
+        stats = folded
+        if stats.modified > REBUILD_FRACTION * max(stats.rows, 1):
+            self._submit(table, 'analyze')
+        elif stats.sample is None:
+            self._submit(table, 'resample')
+
+    def _resample(self, table):
+        """Draw a new sample for the current version, keeping the column statistics."""
+        snapshot = self.catalog.snapshot([table])
+        (_, version), = snapshot.versions
+        sample = build_sample(snapshot[table])
+        with self._lock:
+            stats = self._stats.get(table)
+            if stats is not None and stats.version == version:
+                self._stats[table] = replace(stats, sample=sample)
+
+
+def format_stats(stats):
+    """Text report of TableStats, one line per column."""
+    header = f"{'Column':<16}{'Kind':<9}{'Nulls':>8}{'Distinct':>10}  {'Min':>12}  {'Max':>12}  Histogram"
+    lines = [f"Table {stats.table} (version {stats.version}): {stats.rows} rows", "", header, '-' * len(header)]
+    for column in stats.columns.values():
+        if column.frequencies is not None:
+            shape = f"{len(column.frequencies)} exact value counts"
+        elif column.bounds is not None:
+            shape = f"{len(column.counts)} equi-depth buckets"
+        else:
+            shape = ""
+        low = '' if column.min is None else str(column.min)[:12]
+        high = '' if column.max is None else str(column.max)[:12]
+        lines.append(f"{column.column:<16}{column.kind:<9}{column.nulls:>8}{column.distinct:>10}  "
+                     f"{low:>12}  {high:>12}  {shape}")
+    return "\n".join(lines)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (enables the "string[pyarrow]" dtype)
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = None
+
+# String columns with at most this many distinct values (and at most half
+# as many as there are rows) are dictionary-encoded as categoricals.
+MAX_CATEGORIES = 4096
+MAX_CATEGORY_RATIO = 0.5
+
+
+def compact_frame(df):
+    """Return df with a compact in-memory layout.
+
+    Low-cardinality string columns (class, section, ...) become categoricals,
+    so equality filters and GROUP BY work on small integer codes; integer
+    columns are downcast to the smallest fitting type; remaining strings
+    (name) use Arrow-backed storage when pyarrow is installed.  Float
+    columns are left as float64 so literal comparisons keep their meaning.
+    """
+    columns = {}
+    rows = max(len(df), 1)
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series):
+            columns[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            distinct = series.nunique(dropna=True)
+            if distinct <= MAX_CATEGORIES and distinct <= rows * MAX_CATEGORY_RATIO:
+                columns[col] = series.astype("category")
+            elif STRING_DTYPE is not None:
+                columns[col] = series.astype(STRING_DTYPE)
+            else:
+                columns[col] = series
+        else:
+            columns[col] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def load_table(path):
+    """Read a CSV table into the compact representation."""
+    return compact_frame(pd.read_csv(path))
+
+
+def append_records(df, records):
+    """Append row dicts to a compact frame, keeping its column encodings.
+
+    New values extend the categories of dictionary-encoded columns and
+    integer columns are widened only when a new value does not fit.
+    """
+    new = pd.DataFrame(records)
+    combined = pd.concat([df, new], ignore_index=True)
+    for col in df.columns.intersection(new.columns):
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            added = pd.Index(new[col].dropna().unique())
+            combined[col] = combined[col].astype(pd.CategoricalDtype(dtype.categories.union(added)))
+        elif pd.api.types.is_integer_dtype(dtype) and pd.api.types.is_integer_dtype(new[col]):
+            needed = pd.to_numeric(new[col], downcast="integer").dtype
+            combined[col] = combined[col].astype(np.promote_types(dtype, needed))
+        elif STRING_DTYPE is not None and dtype == STRING_DTYPE:
+            combined[col] = combined[col].astype(STRING_DTYPE)
+    return combined
+
+
+def memory_bytes(df):
+    """Resident bytes of a frame including string payloads."""
+    return int(df.memory_usage(index=True, deep=True).sum())
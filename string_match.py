@@ -0,0 +1,118 @@
+import re
+import threading
+import weakref
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# ------------------ Pattern Planner ------------------
+# LIKE patterns produced by convert_entities_to_edsql are almost always
+# 'a%', '%a' or '%x%'.  Those are answered with vectorized startswith /
+# endswith / substring kernels; only patterns with inner wildcards or '_'
+# fall back to a compiled (and cached) regex.
+
+
+class LikePlan(NamedTuple):
+    kind: str                 # 'all', 'exact', 'prefix', 'suffix', 'contains', 'regex'
+    needle: str
+    regex: Optional[str] = None
+
+
+@lru_cache(maxsize=1024)
+def plan_like(pattern, case=False):
+    """Classify a LIKE pattern into the cheapest kernel that answers it."""
+    needle = pattern if case else pattern.lower()
+    body = needle.strip('%')
+    if '%' not in body and '_' not in body:
+        starts, ends = needle.startswith('%'), needle.endswith('%')
+        if not body and (starts or ends):
+            return LikePlan('all', '')
+        if starts and ends:
+            return LikePlan('contains', body)
+        if ends:
+            return LikePlan('prefix', body)
+        if starts:
+            return LikePlan('suffix', body)
+        return LikePlan('exact', body)
+
+    # Matched against lower-cased data when case-insensitive, so no
+    # IGNORECASE flag is needed (flags would force pandas off the Arrow path)
+    regex = '(?s)' + ''.join(
+        '.*' if ch == '%' else '.' if ch == '_' else re.escape(ch)
+        for ch in needle
+    )
+    re.compile(regex)  # warm the re module's compiled-pattern cache
+    return LikePlan('regex', needle, regex)
+
+
+def _apply_kernel(strings, plan):
+    """Evaluate a LikePlan over a string Series (already lower-cased if needed)."""
+    if plan.kind == 'prefix':
+        return strings.str.startswith(plan.needle)
+    if plan.kind == 'suffix':
+        return strings.str.endswith(plan.needle)
+    if plan.kind == 'contains':
+        return strings.str.contains(plan.needle, regex=False)
+    if plan.kind == 'exact':
+        return strings == plan.needle
+    return strings.str.fullmatch(plan.regex)
+
+
+# ------------------ Lower-cased shadow columns ------------------
+# Case-insensitive matching needs a lower-cased copy of the column.  It is
+# built once per (frame, column) and dropped when the frame is collected,
+# so repeated LIKE queries against the loaded table skip str.lower().
+
+_shadows = {}
+_shadow_lock = threading.Lock()
+
+
+def _forget(key):
+    with _shadow_lock:
+        _shadows.pop(key, None)
+
+
+def lower_shadow(df, column):
+    """Lower-cased copy of df[column], cached for the lifetime of df."""
+    key = (id(df), column)
+    with _shadow_lock:
+        entry = _shadows.get(key)
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+    shadow = df[column].str.lower()
+    with _shadow_lock:
+        _shadows[key] = (weakref.ref(df, lambda _, key=key: _forget(key)), shadow)
+    return shadow
+
+
+def match_mask(df, column, plan, case=False):
+    """Boolean mask of rows of df[column] matching a LikePlan."""
+    series = df[column]
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Match each distinct value once, then gather by integer code
+        categories = pd.Series(series.cat.categories.astype(str))
+        if not case:
+            categories = categories.str.lower()
+        if plan.kind == 'all':
+            hits = np.ones(len(categories), dtype=bool)
+        else:
+            hits = _apply_kernel(categories, plan).to_numpy(dtype=bool, na_value=False)
+        return np.append(hits, False)[series.cat.codes.to_numpy()]
+
+    if plan.kind == 'all':
+        return series.notna().to_numpy()
+    strings = series if case else lower_shadow(df, column)
+    return _apply_kernel(strings, plan).to_numpy(dtype=bool, na_value=False)
+
+
+def like_mask(df, column, pattern, case=False):
+    """Boolean mask of rows where df[column] LIKE pattern."""
+    return match_mask(df, column, plan_like(pattern, case), case)
+
+
+def ends_with_mask(df, column, suffix):
+    """Case-sensitive ENDS WITH; '%' and '_' are literal here."""
+    return match_mask(df, column, LikePlan('suffix', suffix), case=True)
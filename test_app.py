@@ -0,0 +1,108 @@
+import time
+
+import pandas as pd
+import pytest
+
+try:
+    import app
+except (ImportError, OSError):   # matcher_utils loads spaCy's en_core_web_sm at import
+    pytest.skip("spaCy model en_core_web_sm is not installed", allow_module_level=True)
+
+from stats import StatsStore
+from storage import compact_frame
+
+STUDENTS = pd.DataFrame({
+    'name': [f'Student {i}' for i in range(200)],
+    'grades': [40 + i % 61 for i in range(200)],
+    'class': [1 + i % 4 for i in range(200)],
+    'section': ['ABCD'[i % 4] for i in range(200)],
+    'attendance': [50 + i % 51 for i in range(200)],
+})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app.catalog.put('students', compact_frame(STUDENTS))
+    app.results.clear()
+    monkeypatch.setattr(app, 'table_stats', StatsStore(app.catalog))
+    return app.app.test_client()
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "statistics thread did not catch up"
+        time.sleep(0.005)
+
+
+def count_approx():
+    result = app.execute_query(app.parse_query("SELECT COUNT(*) FROM students APPROX;"))
+    return result['COUNT(*)'].item(), 'COUNT(*) ±' in result.columns
+
+
+@pytest.mark.parametrize("timeout", ["nan", "inf", "-1", 0, None, "soon"])
+def test_job_timeout_must_be_finite_and_positive(client, timeout):
+    response = client.post("/api/jobs", json={"query": "SELECT name FROM students;", "timeout": timeout})
+    assert response.status_code == 400
+
+
+def test_job_runs_a_query(client):
+    response = client.post("/api/jobs", json={"query": "SELECT COUNT(*) FROM students;", "timeout": 5})
+    assert response.status_code == 202
+    job = client.get(response.headers["Location"] + "?wait=5").get_json()
+    assert job["status"] == "done" and "200" in job["output"]
+
+
+def test_first_approx_query_runs_exactly_while_statistics_are_collected(client):
+    assert count_approx() == (200, False)
+    wait_for(lambda: app.table_stats.get('students') is not None)
+    assert count_approx() == (200, True)
+
+
+def test_approx_never_reads_a_sample_that_misses_a_delete(client):
+    app.table_stats.analyze('students')
+    assert app.execute_write(app.parse_query("DELETE WHERE grades > 90;")) == "Deleted 30 row(s)."
+    assert count_approx() == (170, False)
+    version = app.catalog.version('students')
+    wait_for(lambda: app.table_stats.get('students').version == version
+             and app.table_stats.get('students').sample is not None)
+    assert count_approx() == (170, True)
+
+
+def test_api_query_returns_columnar_json(client):
+    response = client.post("/api/query", json={"query": "SELECT COUNT(*) FROM students GROUP BY class;"})
+    assert response.status_code == 200 and response.mimetype == "application/json"
+    assert response.get_json()["data"] == [[1, 2, 3, 4], [50, 50, 50, 50]]
+    assert response.headers["X-EDSQL-Query"] == "SELECT COUNT(*) FROM students GROUP BY class;"
+
+
+def test_api_query_negotiates_the_format(client):
+    query = {"query": "SELECT name FROM students WHERE grades > 99;"}
+    response = client.post("/api/query", json=query, headers={"Accept": "application/x-ndjson"})
+    assert response.mimetype == "application/x-ndjson" and len(response.data.splitlines()) == 3
+    assert client.post("/api/query?format=xml", json=query).status_code == 406
+
+
+def test_api_query_only_answers_selects(client):
+    response = client.post("/api/query", json={"query": "DELETE WHERE grades > 90;"})
+    assert response.status_code == 400
+    assert len(app.catalog.get('students')) == 200
+
+
+def test_importing_the_app_neither_logs_nor_waits_for_warm_up(client):
+    assert app.query_log.path == ""
+    assert client.get("/healthz/ready").status_code == 200
+
+
+def test_warm_up_replays_the_most_frequent_selects(client, monkeypatch, tmp_path):
+    log = app.QueryLog(str(tmp_path / 'log.jsonl'))
+    for _ in range(3):
+        log.record("average grades by class", "SELECT AVG(grades) FROM students GROUP BY class;")
+    log.record("delete the best", "DELETE WHERE grades > 90;")
+    monkeypatch.setattr(app, 'query_log', log)
+    monkeypatch.setattr(app, 'warmup_status', {"queries": 0, "replayed": 0})
+    app.ready.clear()
+    app.warm_up()
+    assert app.ready.is_set()
+    assert client.get("/healthz/ready").get_json() == {"status": "ready", "queries": 2, "replayed": 1}
+    assert len(app.results) == 1 and len(app.catalog.get('students')) == 200
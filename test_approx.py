@@ -0,0 +1,65 @@
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from approx import ERROR_SUFFIX, approximate
+from edsql_compiler import parser
+from executor import execute_plan
+from planner import plan_select, schema_of
+from stats import collect, build_sample
+from storage import compact_frame
+
+rng = np.random.default_rng(0)
+ROWS = 40_000
+STUDENTS = compact_frame(pd.DataFrame({
+    'grades': rng.integers(30, 101, ROWS),
+    'class': rng.integers(1, 5, ROWS),
+    'section': rng.choice(list('ABCD'), ROWS),
+}))
+STATS = replace(collect('students', STUDENTS, 0), sample=build_sample(STUDENTS, np.random.default_rng(1)))
+
+
+def answer(sql, stats=STATS, table=STUDENTS):
+    select = parser.parse(sql)
+    plan = plan_select(select, schema_of(table))
+    return approximate(select, plan, stats), execute_plan(plan, table)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT COUNT(*) FROM students WHERE grades > 80 APPROX;",
+    "SELECT AVG(grades) FROM students GROUP BY class APPROX;",
+    "SELECT SUM(grades) FROM students WHERE section = 'B' APPROX;",
+])
+def test_exact_answer_lies_within_the_interval(sql):
+    estimate, exact = answer(sql)
+    assert estimate.attrs['sample_rows'] == 8000
+    value = next(col for col in exact.columns if col != 'class')
+    error = estimate[value + ERROR_SUFFIX]
+    assert (error > 0).all()
+    assert ((estimate[value] - exact[value]).abs() <= 1.5 * error).all()
+
+
+def test_completely_sampled_strata_are_exact():
+    small = STUDENTS.head(1000)
+    stats = collect('students', small, 0)
+    estimate, exact = answer("SELECT COUNT(*) FROM students GROUP BY class APPROX;", stats, small)
+    assert (estimate['COUNT(*)' + ERROR_SUFFIX] == 0).all()
+    assert estimate['COUNT(*)'].tolist() == exact['COUNT(*)'].tolist()
+
+
+def test_unmet_error_bound_runs_exactly():
+    estimate, _ = answer("SELECT COUNT(*) FROM students WHERE grades > 80 APPROX WITH ERROR 1 %;")
+    assert estimate is None
+
+
+def test_count_distinct_comes_from_the_sketch():
+    estimate, _ = answer("SELECT COUNT(DISTINCT grades) FROM students APPROX;")
+    assert estimate['COUNT(DISTINCT grades)'].tolist() == [71]
+
+
+def test_stale_statistics_are_not_used():
+    sql = "SELECT COUNT(DISTINCT grades) FROM students APPROX;"
+    assert answer(sql, replace(STATS, deleted=1))[0] is None
+    assert answer("SELECT COUNT(*) FROM students APPROX;", replace(STATS, sample=None))[0] is None
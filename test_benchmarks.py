@@ -0,0 +1,69 @@
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+from benchmarks import run
+from benchmarks.corpus import EDSQL_CORPUS, PLOT_CORPUS
+from benchmarks.datagen import generate_students
+from edsql_compiler import parser
+
+
+def test_measure_runs_at_least_min_iterations():
+    calls = []
+    result = run.measure(lambda: calls.append(1), min_time=0, min_iterations=5)
+    assert result['iterations'] == 5 and len(calls) == 6   # plus the warm-up call
+    assert result['min_ms'] <= result['p50_ms'] <= result['p95_ms']
+
+
+def test_generated_table_has_the_requested_shape():
+    df = generate_students(500, classes=3, sections=2, extra_columns=2)
+    assert len(df) == 500
+    assert set(df['class']) <= {1, 2, 3} and set(df['section']) <= {'A', 'B'}
+    assert {'score_0', 'score_1'} <= set(df.columns)
+    assert generate_students(50).equals(generate_students(50))
+
+
+@pytest.mark.parametrize("sql", list(EDSQL_CORPUS.values()) + list(PLOT_CORPUS.values()))
+def test_corpus_queries_parse(sql):
+    assert parser.parse(sql) is not None
+
+
+@pytest.fixture(autouse=True)
+def restore_pandas_options():
+    # run.main() turns on copy-on-write for the whole process
+    with pd.option_context("mode.copy_on_write", pd.get_option("mode.copy_on_write")):
+        yield
+
+
+def test_report(monkeypatch, tmp_path, capsys):
+    output = tmp_path / 'bench.json'
+    monkeypatch.setattr(sys, 'argv', [
+        'run', '--rows', '200', '--scenarios', 'parse,memory,execute',
+        '--min-time', '0', '--output', str(output)])
+    run.main()
+    report = json.loads(output.read_text())
+    scenarios = {r['scenario'] for r in report['results']}
+    assert 'parse.group_by' in scenarios and 'execute.group_by' in scenarios
+    memory, = (r for r in report['results'] if r['scenario'] == 'memory.compact_frame')
+    assert memory['rows'] == 200 and memory['compact_bytes'] < memory['raw_bytes']
+
+    monkeypatch.setattr(sys, 'argv', [
+        'run', '--rows', '200', '--scenarios', 'parse', '--min-time', '0',
+        '--output', str(tmp_path / 'again.json'), '--compare', str(output)])
+    run.main()
+    assert 'parse.group_by' in capsys.readouterr().out
+
+
+def test_end_to_end_scenario_loads_the_app(monkeypatch, tmp_path):
+    try:
+        import app  # noqa: F401
+    except (ImportError, OSError):   # matcher_utils loads spaCy's en_core_web_sm at import
+        pytest.skip("spaCy model en_core_web_sm is not installed")
+    output = tmp_path / 'bench.json'
+    monkeypatch.setattr(sys, 'argv', [
+        'run', '--rows', '200', '--scenarios', 'e2e', '--min-time', '0', '--output', str(output)])
+    run.main()
+    results = json.loads(output.read_text())['results']
+    assert results and all(r['scenario'].startswith('e2e.') for r in results)
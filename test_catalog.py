@@ -0,0 +1,64 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from catalog import Catalog
+
+
+@pytest.fixture(autouse=True)
+def copy_on_write():
+    # The entry points enable it for the whole process (see Catalog)
+    with pd.option_context("mode.copy_on_write", True):
+        yield
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'students.csv'
+    pd.DataFrame({'name': ['Ann', 'Bob'], 'grades': [91, 72]}).to_csv(path, index=False)
+    catalog = Catalog()
+    catalog.register('students', str(path))
+    return catalog
+
+
+def test_tables_load_on_first_use(catalog):
+    assert 'students' in catalog and catalog.version('students') == 0
+    assert list(catalog['students']['name']) == ['Ann', 'Bob']
+    with pytest.raises(KeyError):
+        catalog.get('courses')
+
+
+def test_snapshot_keeps_its_version_across_writes(catalog):
+    snapshot = catalog.snapshot(['students'])
+    version, _ = catalog.update('students', lambda t: (t[t['grades'] > 80], None))
+    assert version == 1 and len(catalog.get('students')) == 1
+    assert len(snapshot['students']) == 2
+    assert snapshot.versions == (('students', 0),)
+    assert catalog.live_versions() == [('students', 0)]
+
+
+def test_failed_update_publishes_nothing(catalog):
+    def fail(table):
+        raise ValueError("bad write")
+    with pytest.raises(ValueError):
+        catalog.update('students', fail)
+    assert catalog.version('students') == 0
+
+
+def test_derived_frames_cannot_modify_a_snapshot(catalog):
+    snapshot = catalog.snapshot(['students'])
+    derived = snapshot['students'][['grades']]
+    derived.loc[0, 'grades'] = 0
+    assert snapshot['students'].loc[0, 'grades'] == 91
+
+
+def test_concurrent_writers_are_serialized(catalog):
+    def insert(table):
+        return pd.concat([table, table.tail(1)], ignore_index=True), None
+    threads = [threading.Thread(target=catalog.update, args=('students', insert)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert catalog.version('students') == 8 and len(catalog.get('students')) == 10
@@ -0,0 +1,29 @@
+import pytest
+
+try:
+    from convert_to_edql import convert_entities_to_edsql
+except (ImportError, OSError):   # matcher_utils loads spaCy's en_core_web_sm at import
+    pytest.skip("spaCy model en_core_web_sm is not installed", allow_module_level=True)
+
+
+@pytest.mark.parametrize("question, edsql", [
+    ("average grades by class", "SELECT AVG(grades) FROM students GROUP BY class;"),
+    ("how many students per class", "SELECT COUNT(*) FROM students GROUP BY class;"),
+    ("total grades of each class", "SELECT SUM(grades) FROM students GROUP BY class;"),
+    ("calculate average grades", "SELECT AVG(grades) FROM students;"),
+    ("roughly how many students per class", "SELECT COUNT(*) FROM students GROUP BY class APPROX;"),
+])
+def test_aggregates(question, edsql):
+    assert convert_entities_to_edsql(question) == edsql
+
+
+def test_grouping_column_is_not_aggregated():
+    # Left to the nearest-neighbour fallback rather than SELECT AVG(class)
+    assert convert_entities_to_edsql("what is the average grade of each class") is None
+
+
+def test_course_join_qualifies_the_shared_key():
+    assert convert_entities_to_edsql("show students in course physics") == (
+        "SELECT name FROM students JOIN enrollments ON id = student_id "
+        "JOIN courses ON enrollments.course_id = courses.course_id "
+        "WHERE course_name LIKE 'physics';")
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from edsql_compiler import parser
+from executor import QueryError, apply_write, execute_plan, hash_join
+from planner import plan_select
+
+STUDENTS = pd.DataFrame({
+    'name': ['Ann', 'Bob', 'Cid'],
+    'grades': [91, 72, 85],
+})
+
+
+def test_delete_removes_matching_rows():
+    table, deleted = apply_write(STUDENTS, parser.parse("DELETE WHERE grades < 80;"))
+    assert deleted == 1 and list(table['name']) == ['Ann', 'Cid']
+    assert len(STUDENTS) == 3
+
+
+def test_delete_without_where_is_rejected():
+    with pytest.raises(QueryError, match="WHERE"):
+        apply_write(STUDENTS, parser.parse("DELETE;"))
+
+
+def test_insert_appends_a_row():
+    table, inserted = apply_write(STUDENTS, parser.parse("INSERT name='Dee', grades=64;"))
+    assert inserted == 1 and table.iloc[-1].tolist() == ['Dee', 64]
+
+
+# ------------------ Joins ------------------
+
+TABLES = {
+    'students': pd.DataFrame({'id': [1, 2, 3], 'name': ['Ann', 'Bob', 'Cid']}),
+    'enrollments': pd.DataFrame({'student_id': [1, 1, 3, 4], 'course_id': [10, 20, 10, 20]}),
+    'courses': pd.DataFrame({'course_id': [10, 20], 'course_name': ['Physics', 'Maths']}),
+}
+
+
+def run(sql):
+    return execute_plan(plan_select(parser.parse(sql)), TABLES)
+
+
+@pytest.mark.parametrize("batch_rows", [1, 2, 1000])
+def test_hash_join_matches_pandas_merge(batch_rows):
+    left, right = TABLES['enrollments'], TABLES['students']
+    joined = hash_join(left, right, 'student_id', 'id', 'students', batch_rows=batch_rows)
+    expected = left.merge(right, left_on='student_id', right_on='id')
+    pd.testing.assert_frame_equal(
+        joined.sort_values(['student_id', 'course_id']).reset_index(drop=True),
+        expected.sort_values(['student_id', 'course_id']).reset_index(drop=True))
+
+
+def test_join_chain_with_qualified_keys():
+    result = run("SELECT name, course_name FROM students JOIN enrollments ON id = student_id "
+                 "JOIN courses ON enrollments.course_id = courses.course_id "
+                 "WHERE course_name = 'Physics';")
+    assert sorted(result['name']) == ['Ann', 'Cid']
+
+
+@pytest.mark.parametrize("on", ["id = student_id", "student_id = id",
+                                "enrollments.student_id = students.id"])
+def test_join_keys_are_matched_to_the_input_that_owns_them(on):
+    result = run(f"SELECT name, course_id FROM students JOIN enrollments ON {on};")
+    assert sorted(zip(result['name'], result['course_id'])) == [('Ann', 10), ('Ann', 20), ('Cid', 10)]
+
+
+def test_unknown_join_key_is_a_query_error():
+    with pytest.raises(QueryError, match="JOIN"):
+        run("SELECT name FROM students JOIN enrollments ON id = missing;")
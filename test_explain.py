@@ -0,0 +1,46 @@
+import pandas as pd
+
+from catalog import Catalog
+from edsql_ast import Explain
+from edsql_compiler import parser
+from explain import explain
+from stats import StatsStore
+
+STUDENTS = pd.DataFrame({
+    'name': ['Ann', 'Bob', 'Cid', 'Dee'],
+    'grades': [91, 72, 85, 60],
+    'class': [10, 10, 11, 11],
+})
+
+
+def test_explain_shows_plans_without_running_the_query():
+    statement = parser.parse("EXPLAIN SELECT name FROM students WHERE grades > 80;")
+    assert isinstance(statement, Explain) and not statement.analyze
+    report = explain(statement, STUDENTS)
+    assert "Logical plan:" in report and "Optimized plan:" in report
+    assert "Physical operators:" in report
+    assert "Execution:" not in report
+
+
+def test_explain_analyze_times_every_stage():
+    statement = parser.parse("EXPLAIN ANALYZE SELECT AVG(grades) FROM students GROUP BY class;")
+    report = explain(statement, STUDENTS)
+    execution = report.split("Execution:", 1)[1]
+    assert "SCAN [Scan]" in execution and "GROUP BY [HashAggregate]" in execution
+    assert "Total" in execution
+
+
+def test_explain_drops_the_redundant_projection():
+    statement = parser.parse("EXPLAIN SELECT AVG(grades) FROM students GROUP BY class;")
+    optimized = explain(statement, STUDENTS).split("Optimized plan:", 1)[1]
+    assert "Project" not in optimized.split("Physical operators:")[0]
+
+
+def test_explain_reports_row_estimates_from_statistics():
+    catalog = Catalog()
+    catalog.put('students', STUDENTS)
+    stats = StatsStore(catalog)
+    stats.analyze('students')
+    statement = parser.parse("EXPLAIN SELECT name FROM students WHERE class = 10;")
+    report = explain(statement, catalog.snapshot(['students']), stats=stats)
+    assert "WHERE class = 10.0: ~2 of 4 students rows (50.0%)" in report
@@ -0,0 +1,90 @@
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from charts import render_plot
+from jobs import JobQueue, QueueFull
+
+
+def wait(queue, job):
+    assert queue.wait(job, 5).done.is_set()
+    return job
+
+
+def test_job_runs_and_reports_its_result():
+    queue = JobQueue(lambda query, checkpoint: {"rows": len(query)}, workers=1)
+    job = wait(queue, queue.submit("abc"))
+    assert job.status == "done" and job.as_dict()["rows"] == 3
+    assert queue.get(job.id) is job
+
+
+def test_runner_errors_fail_the_job():
+    def runner(query, checkpoint):
+        raise RuntimeError("boom")
+    queue = JobQueue(runner, workers=1)
+    job = wait(queue, queue.submit("q"))
+    assert job.status == "failed" and "boom" in job.error
+
+
+def test_timeout_stops_the_job_at_its_next_checkpoint():
+    def runner(query, checkpoint):
+        while True:
+            checkpoint()
+    queue = JobQueue(runner, workers=1)
+    job = wait(queue, queue.submit("q", timeout=0.05))
+    assert job.status == "timeout"
+
+
+def test_cancel_running_and_queued_jobs():
+    started, release = threading.Event(), threading.Event()
+
+    def runner(query, checkpoint):
+        started.set()
+        release.wait(5)
+        checkpoint()
+    queue = JobQueue(runner, workers=1)
+    running = queue.submit("first")
+    queued = queue.submit("second")
+    assert started.wait(5)
+    queue.cancel(queued.id)
+    queue.cancel(running.id)
+    release.set()
+    assert wait(queue, running).status == "cancelled"
+    assert queued.status == "cancelled" and queued.started is None
+
+
+def test_full_queue_rejects_new_jobs():
+    started, release = threading.Event(), threading.Event()
+
+    def runner(query, checkpoint):
+        started.set()
+        release.wait(5)
+    queue = JobQueue(runner, workers=1, max_queued=1)
+    try:
+        queue.submit("running")
+        assert started.wait(5)
+        queue.submit("queued")
+        with pytest.raises(QueueFull):
+            queue.submit("one too many")
+    finally:
+        release.set()
+
+
+def test_unknown_lane_is_rejected():
+    with pytest.raises(ValueError):
+        JobQueue(lambda q, c: None).submit("q", lane="urgent")
+
+
+def test_charts_rendered_concurrently_do_not_mix():
+    bar = pd.DataFrame({'name': ['Ann', 'Bob'], 'grades': [91, 72]})
+    pie = pd.DataFrame({'class': [10, 10, 11]})
+    expected = {'BAR': render_plot(bar, 'BAR'), 'PIE': render_plot(pie, 'PIE')}
+    with ThreadPoolExecutor(8) as pool:
+        graphs = list(pool.map(lambda kind: (kind, render_plot(bar if kind == 'BAR' else pie, kind)),
+                               ['BAR', 'PIE'] * 8))
+    for kind, graph in graphs:
+        assert graph == expected[kind]
+    assert base64.b64decode(expected['BAR']).startswith(b'\x89PNG')
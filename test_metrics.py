@@ -0,0 +1,57 @@
+import pytest
+
+import metrics
+from metrics import LatencyHistogram
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    monkeypatch.setattr(metrics, '_histograms', {})
+    monkeypatch.setattr(metrics, '_counters', {})
+    monkeypatch.setattr(metrics, '_gauges', {})
+
+
+@pytest.mark.parametrize("seconds", [0.00005, 0.0012, 0.037, 1.5, 42.0])
+def test_histogram_reports_values_within_its_precision(seconds):
+    hist = LatencyHistogram()
+    hist.record(seconds)
+    assert hist.percentile(0.5) == pytest.approx(seconds, rel=0.015)
+
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ms in range(1, 101):
+        hist.record(ms / 1000)
+    assert hist.percentile(0.5) == pytest.approx(0.050, rel=0.015)
+    assert hist.percentile(0.99) == pytest.approx(0.099, rel=0.015)
+    assert hist.percentile(1.0) == pytest.approx(0.100, rel=0.015)
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', False)
+    monkeypatch.setattr(metrics, '_histograms', {})
+    metrics.observe('parse', 0.01)
+    assert metrics.render_prometheus() == "\n"
+
+
+def test_prometheus_exposition(enabled):
+    timed = metrics.instrument('parse')(lambda: 'ok')
+    assert timed() == 'ok'
+    metrics.inc('queries', intent='plot_bar')
+    metrics.inc('queries', intent='plot_bar')
+    metrics.set_gauge('cache_entries', 3)
+
+    text = metrics.render_prometheus()
+    assert '# TYPE edsql_parse_seconds summary' in text
+    assert 'edsql_parse_seconds_count 1' in text
+    assert 'edsql_queries_total{intent="plot_bar"} 2' in text
+    assert 'edsql_cache_entries 3' in text
+
+
+def test_server_timing_header(enabled, monkeypatch):
+    monkeypatch.setattr(metrics, 'SERVER_TIMING', True)
+    metrics.begin_request()
+    metrics.observe('execute', 0.0025)
+    assert metrics.server_timing_header() == "execute;dur=2.500"
+    assert metrics.server_timing_header() is None
@@ -0,0 +1,36 @@
+import pytest
+
+try:
+    from nl_fallback import DEFAULT_EXEMPLARS, ExemplarIndex, fallback_to_edsql
+except (ImportError, OSError):   # matcher_utils loads spaCy's en_core_web_sm at import
+    pytest.skip("spaCy model en_core_web_sm is not installed", allow_module_level=True)
+
+
+@pytest.mark.parametrize("question, edsql", [
+    ("students with grades above 85", "SELECT name, grades FROM students WHERE grades > 85;"),
+    ("top 3 students by attendance",
+     "SELECT name, attendance FROM students ORDER BY attendance DESC LIMIT 3;"),
+    ("mean grades by class", "SELECT AVG(grades) FROM students GROUP BY class;"),
+    ("plot grades as a bar graph", "SELECT name, grades FROM students PLOT BAR GRAPH;"),
+])
+def test_answers_questions_about_the_schema(question, edsql):
+    assert fallback_to_edsql(question)[0] == edsql
+
+
+@pytest.mark.parametrize("question", ["what's the weather", "tell me a joke"])
+def test_declines_questions_outside_the_schema(question):
+    assert fallback_to_edsql(question)[0] is None
+
+
+def test_chart_templates_need_a_chart_word():
+    edsql, _ = fallback_to_edsql("show me students over 90")
+    assert "PLOT" not in edsql
+    assert fallback_to_edsql("students over 90")[0] is None
+
+
+def test_added_exemplars_are_searchable():
+    index = ExemplarIndex(DEFAULT_EXEMPLARS)
+    index.add("students in the honours list", "SELECT name FROM students WHERE grades > 90;")
+    match = index.translate("students in the honours list")
+    assert match.edsql == "SELECT name FROM students WHERE grades > 90;"
+    assert match.confidence == pytest.approx(1.0)
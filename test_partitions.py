@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import partitions
+from catalog import Catalog
+from edsql_compiler import parser
+from executor import QueryError, execute_plan
+from explain import explain
+from partitions import layout_of, partition_table
+from planner import plan_select, schema_of
+from storage import compact_frame
+
+rng = np.random.default_rng(0)
+STUDENTS = compact_frame(pd.DataFrame({
+    'name': [f'Student {i}' for i in range(1000)],
+    'grades': rng.integers(30, 101, 1000),
+    'class': rng.integers(1, 5, 1000),
+    'section': rng.choice(list('ABCD'), 1000),
+}))
+
+
+@pytest.fixture
+def catalog():
+    with pd.option_context("mode.copy_on_write", True):
+        catalog = Catalog()
+        catalog.put('students', STUDENTS)
+        catalog.partition_by('students', 'class')
+        yield catalog
+
+
+def run(sql, tables):
+    select = parser.parse(sql)
+    schema = schema_of(tables) if isinstance(tables, pd.DataFrame) else tables.schema()
+    return execute_plan(plan_select(select, schema), tables)
+
+
+def test_partition_table_makes_each_key_one_row_range():
+    df, layout = partition_table(STUDENTS, 'section')
+    assert list(layout.keys['section']) == ['A', 'B', 'C', 'D']
+    for key, part in zip(layout.keys['section'], layout.parts(df)):
+        assert (part['section'] == key).all()
+    assert layout.offsets[-1] == len(df)
+    again, _ = partition_table(df, 'section')
+    pd.testing.assert_frame_equal(again, df)
+
+
+@pytest.mark.parametrize("parallel_min_rows", [0, 10**9])
+@pytest.mark.parametrize("sql", [
+    "SELECT name, grades FROM students WHERE class = 2;",
+    "SELECT name FROM students WHERE class > 2;",
+    "SELECT AVG(grades) FROM students GROUP BY class;",
+    "SELECT COUNT(*) FROM students WHERE class < 3 GROUP BY class;",
+    "SELECT SUM(grades) FROM students WHERE grades > 60 GROUP BY class;",
+])
+def test_partitioned_results_match_unpartitioned(catalog, monkeypatch, sql, parallel_min_rows):
+    monkeypatch.setattr(partitions, 'PARALLEL_MIN_ROWS', parallel_min_rows)
+    snapshot = catalog.snapshot(['students'])
+    assert layout_of(snapshot['students']) is not None
+    expected = run(sql, STUDENTS)
+    actual = run(sql, snapshot)
+    key = [c for c in expected.columns if c in ('class', 'name')]
+    pd.testing.assert_frame_equal(
+        actual.sort_values(key).reset_index(drop=True),
+        expected.sort_values(key).reset_index(drop=True), check_dtype=False)
+
+
+def test_writes_keep_the_table_clustered(catalog):
+    extra = STUDENTS.head(3).assign(**{'class': [4, 1, 3]})
+    catalog.update('students', lambda t: (pd.concat([t, extra], ignore_index=True), None))
+    table = catalog.get('students')
+    layout = layout_of(table)
+    assert layout is not None and layout.offsets[-1] == len(table) == 1003
+    assert table['class'].is_monotonic_increasing
+
+
+def test_explain_shows_pruning(catalog):
+    report = explain(parser.parse("EXPLAIN SELECT name FROM students WHERE class = 2;"),
+                     catalog.snapshot(['students']))
+    assert "PartitionPrune" in report
+    assert "students is partitioned by class: reads 1 of 4 partitions" in report
+
+
+def test_partition_wise_group_by_errors_name_the_group_by(catalog):
+    with pytest.raises(QueryError, match="GROUP BY"):
+        run("SELECT AVG(name) FROM students GROUP BY class;", catalog.snapshot(['students']))
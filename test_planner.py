@@ -0,0 +1,47 @@
+import dataclasses
+
+import pytest
+
+from edsql_ast import Aggregate, Condition, Select
+from edsql_compiler import parser
+from planner import Filter, Limit, Scan, optimize, plan_nodes, plan_select
+
+SCHEMA = (('name', 'string'), ('grades', 'numeric'), ('class', 'numeric'))
+
+
+def filters(plan):
+    return [node for node in plan_nodes(plan) if isinstance(node, Filter)]
+
+
+def test_fold_constants_keeps_the_folded_literal():
+    plan = plan_select(parser.parse("SELECT name FROM students WHERE grades > 80;"), SCHEMA)
+    value = filters(plan)[0].condition.value
+    assert value == 80.0 and isinstance(value, float)
+
+
+def test_fold_constants_turns_string_column_literals_into_strings():
+    plan = optimize(Filter(Scan('students'), Condition('name', '=', 7)), SCHEMA)
+    assert filters(plan)[0].condition.value == '7'
+
+
+def test_already_folded_plan_is_returned_unchanged():
+    plan = Filter(Scan('students'), Condition('grades', '>', 80.0))
+    assert optimize(plan, SCHEMA) == plan
+
+
+def test_stacked_limits_merge():
+    plan = optimize(Limit(Limit(Scan('students'), 5), 10), SCHEMA)
+    assert plan == Limit(Scan('students'), 5)
+
+
+def test_parsed_queries_are_frozen_and_hashable():
+    select = parser.parse("SELECT AVG(grades) FROM students GROUP BY class;")
+    assert isinstance(select, Select) and select.columns == (Aggregate('AVG', 'grades'),)
+    assert hash(select) == hash(parser.parse("SELECT AVG(grades) FROM students GROUP BY class;"))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        select.table = 'courses'
+
+
+def test_equal_queries_share_one_plan():
+    sql = "SELECT name FROM students WHERE grades > 80 ORDER BY grades DESC LIMIT 3;"
+    assert plan_select(parser.parse(sql), SCHEMA) is plan_select(parser.parse(sql), SCHEMA)
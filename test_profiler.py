@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+import profiler
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, 'PROFILE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_requested_mode_needs_profiling_enabled(monkeypatch):
+    monkeypatch.setattr(profiler, 'ENABLED', False)
+    assert profiler.requested_mode('sample') is None
+    monkeypatch.setattr(profiler, 'ENABLED', True)
+    assert profiler.requested_mode('1') == 'cprofile'
+    assert profiler.requested_mode('SAMPLE') == 'sample'
+    assert profiler.requested_mode('flame') is None
+
+
+def test_cprofile_round_trip(store):
+    profile = profiler.start_profile('cprofile')
+    sum(range(1000))
+    profile_id = profiler.save_profile('cprofile', profile.finish())
+    path = profiler.find_profile(profile_id)
+    assert path.endswith('.prof')
+    assert 'function calls' in profiler.summarize(path)
+
+
+def test_only_one_request_is_profiled_at_a_time(store):
+    first = profiler.start_profile('cprofile')
+    try:
+        assert profiler.start_profile('cprofile') is None
+    finally:
+        first.finish()
+    profiler.start_profile('cprofile').finish()
+
+
+def test_sampler_collects_the_target_threads_stack():
+    sampler = profiler.StackSampler(threading.get_ident(), interval=0.0005)
+    sampler.enable()
+    event = threading.Event()
+    while not sampler.counts:
+        event.wait(0.001)
+    sampler.disable()
+    line = sampler.collapsed().splitlines()[0]
+    assert 'test_profiler.py' in line and line.rsplit(' ', 1)[1].isdigit()
+
+
+def test_ring_buffer_keeps_the_newest(store, monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILE_KEEP', 3)
+    ids = [profiler.save_profile('sample', b'main 1\n') for _ in range(6)]
+    assert len(profiler.list_profiles()) == 3
+    assert profiler.find_profile(ids[-1]) is not None
+
+
+def test_keep_one_never_prunes_the_profile_just_written(store, monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILE_KEEP', 1)
+    for _ in range(5):
+        profile_id = profiler.save_profile('sample', b'main 1\n')
+        assert profiler.list_profiles() == [profile_id + '.collapsed']
@@ -0,0 +1,22 @@
+from query_log import QueryLog
+
+
+def test_top_orders_queries_by_frequency(tmp_path):
+    log = QueryLog(str(tmp_path / 'log.jsonl'))
+    for query in ['a', 'b', 'b', 'c', 'b', 'c']:
+        log.record(query, f'SELECT {query};')
+    log.record('a', 'SELECT a2;')
+    assert log.top(2) == [('b', 'SELECT b;'), ('a', 'SELECT a2;')]
+
+
+def test_unreadable_lines_are_skipped(tmp_path):
+    path = tmp_path / 'log.jsonl'
+    path.write_text('{"query": "a", "sql": "SELECT a;"}\nnot json\n{"sql": "x"}\n{"query": "a", "sq')
+    assert QueryLog(str(path)).top() == [('a', 'SELECT a;')]
+
+
+def test_an_empty_path_disables_the_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log = QueryLog(path="")
+    log.record('a', 'SELECT a;')
+    assert log.top() == [] and list(tmp_path.iterdir()) == []
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from result_cache import ResultCache, result_size
+
+ROWS = pd.DataFrame({'grades': range(100)})
+SIZE = result_size(ROWS)
+
+
+def key(name, version=1):
+    return ((('students', version),), name)
+
+
+def test_hits_return_the_stored_entry():
+    cache = ResultCache()
+    cache.put(key('a'), ROWS, cost=0.5, html='<table/>')
+    entry = cache.get(key('a'))
+    assert entry.result is ROWS and entry.html == '<table/>'
+    assert cache.get(key('b')) is None
+
+
+def test_invalidate_drops_older_versions_only():
+    cache = ResultCache()
+    cache.put(key('old', 1), ROWS)
+    cache.put(key('new', 2), ROWS)
+    cache.invalidate('students', 2)
+    assert cache.get(key('old', 1)) is None
+    assert cache.get(key('new', 2)) is not None
+    assert cache.used == SIZE
+
+
+def test_results_larger_than_the_budget_are_not_cached():
+    cache = ResultCache(budget_bytes=SIZE - 1)
+    assert cache.put(key('a'), ROWS) is None and len(cache) == 0
+
+
+def test_cheap_entries_are_evicted_before_expensive_ones():
+    cache = ResultCache(budget_bytes=2 * SIZE)
+    cache.put(key('expensive'), ROWS, cost=10.0)
+    cache.put(key('cheap'), ROWS, cost=0.001)
+    cache.put(key('next'), ROWS, cost=1.0)
+    assert cache.get(key('cheap')) is None
+    assert cache.get(key('expensive')) is not None
+    assert cache.used <= cache.budget
+
+
+def test_hits_keep_the_compute_cost():
+    cache = ResultCache(budget_bytes=2 * SIZE)
+    cache.put(key('expensive'), ROWS, cost=10.0)
+    for _ in range(3):
+        assert cache.get(key('expensive')).cost == 10.0
+    cache.put(key('cheap'), ROWS, cost=0.001)
+    cache.put(key('next'), ROWS, cost=1.0)
+    assert cache.get(key('expensive')) is not None
@@ -0,0 +1,49 @@
+import gzip
+import io
+import json
+
+import pandas as pd
+import pytest
+
+import serialize
+from storage import compact_frame
+
+RESULT = compact_frame(pd.DataFrame({
+    'name': ['Ann', 'Bob', None],
+    'grades': [91, 72, 85],
+    'section': ['A', 'B', 'A'],
+    'AVG(grades)': [90.5, 71.25, float('nan')],
+}))
+
+
+def test_columnar_json():
+    body = json.loads(serialize.encode(RESULT, serialize.JSON))
+    assert body['columns'] == ['name', 'grades', 'section', 'AVG(grades)']
+    assert body['rows'] == 3
+    assert body['data'] == [['Ann', 'Bob', None], [91, 72, 85], ['A', 'B', 'A'], [90.5, 71.25, None]]
+
+
+def test_ndjson_has_one_object_per_row():
+    lines = serialize.encode(RESULT, serialize.NDJSON).decode().splitlines()
+    assert [json.loads(line)['grades'] for line in lines] == [91, 72, 85]
+    assert serialize.encode(RESULT.iloc[:0], serialize.NDJSON) == b""
+
+
+def test_encode_ignores_the_index():
+    body = json.loads(serialize.encode(RESULT.set_index('name'), serialize.JSON))
+    assert body['columns'][0] == 'grades'
+
+
+def test_arrow_stream_round_trips():
+    pa = pytest.importorskip('pyarrow')
+    payload = serialize.encode(RESULT, serialize.ARROW_STREAM)
+    table = pa.ipc.open_stream(io.BytesIO(payload)).read_all()
+    pd.testing.assert_frame_equal(table.to_pandas(), RESULT, check_dtype=False, check_categorical=False)
+
+
+def test_compress():
+    payload = serialize.encode(pd.concat([RESULT] * 100), serialize.JSON)
+    compressed, encoding = serialize.compress(payload, 'gzip')
+    assert encoding == 'gzip' and gzip.decompress(compressed) == payload
+    assert serialize.compress(b'{}', 'gzip') == (b'{}', None)
+    assert serialize.compress(payload, None) == (payload, None)
@@ -0,0 +1,88 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from catalog import Catalog
+from edsql_ast import AnalyzeTable, Condition
+from edsql_compiler import parser
+from stats import HyperLogLog, StatsStore, collect, fold_insert, format_stats, selectivity
+from storage import compact_frame
+
+rng = np.random.default_rng(0)
+STUDENTS = compact_frame(pd.DataFrame({
+    'name': [f'Student {i}' for i in range(5000)],
+    'grades': rng.integers(0, 101, 5000),
+    'section': rng.choice(list('ABCD'), 5000),
+    'score': rng.normal(50, 10, 5000),
+}))
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "statistics thread did not catch up"
+        time.sleep(0.005)
+
+
+@pytest.mark.parametrize("n", [10, 1000, 100_000])
+def test_hyperloglog_estimates_distinct_values(n):
+    sketch = HyperLogLog()
+    sketch.add(pd.Series(np.arange(n)))
+    sketch.add(pd.Series(np.arange(n, dtype='int8' if n < 100 else 'int64')))   # same values again
+    assert sketch.count() == pytest.approx(n, rel=0.05)
+
+
+@pytest.mark.parametrize("column, op, value", [
+    ('grades', '>', 80), ('grades', '<', 25), ('grades', '=', 50),
+    ('section', '=', 'B'), ('score', '>', 60), ('score', '<', 45), ('section', 'LIKE', 'b'),
+])
+def test_selectivity_is_close_to_the_true_fraction(column, op, value):
+    stats = collect('students', STUDENTS, 0)
+    series = STUDENTS[column]
+    if op == 'LIKE':
+        actual = (series.astype(str).str.lower() == value).mean()
+    elif op == '=':
+        actual = (series == value).mean()
+    else:
+        actual = (series > value if op == '>' else series < value).mean()
+    assert selectivity(stats, Condition(column, op, value)) == pytest.approx(actual, abs=0.03)
+
+
+def test_fold_insert_leaves_the_old_stats_untouched():
+    stats = collect('students', STUDENTS, 0)
+    before = dict(stats.columns['section'].frequencies)
+    rows = STUDENTS.head(100)
+    folded = fold_insert(stats, rows, 1)
+    assert stats.columns['section'].frequencies == before and stats.rows == 5000
+    assert folded.rows == 5100 and folded.version == 1
+    assert sum(folded.columns['section'].frequencies.values()) == 5100
+
+
+def test_selectivity_stays_a_fraction_after_deletes():
+    stats = collect('students', STUDENTS, 0)
+    stats.rows = 10   # value counts still include deleted rows until the next rebuild
+    stats.columns['grades'].rows = 10
+    assert selectivity(stats, Condition('grades', '>', 0)) == 1.0
+
+
+def test_analyze_command():
+    statement = parser.parse("ANALYZE students;")
+    assert statement == AnalyzeTable('students')
+    report = format_stats(collect('students', STUDENTS, 3))
+    assert report.startswith("Table students (version 3): 5000 rows")
+    assert "4 exact value counts" in report
+
+
+def test_store_folds_writes_in_the_background():
+    catalog = Catalog()
+    catalog.put('students', STUDENTS)
+    store = StatsStore(catalog)
+    store.ensure('students')
+    wait_for(lambda: store.get('students') is not None)
+    version, _ = catalog.update('students', lambda t: (pd.concat([t, t.head(10)], ignore_index=True), None))
+    store.record_insert('students', version, STUDENTS.head(10))
+    wait_for(lambda: store.get('students').version == version)
+    assert store.get('students').rows == 5010
+    assert store.estimate_rows('students', Condition('grades', '>', -1)) == pytest.approx(5010)
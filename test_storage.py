@@ -0,0 +1,37 @@
+import pandas as pd
+
+from executor import execute_plan
+from edsql_compiler import parser
+from planner import plan_select, schema_of
+from storage import append_records, compact_frame, memory_bytes
+
+RAW = pd.DataFrame({
+    'name': [f'Student {i}' for i in range(40)],
+    'grades': [50 + i for i in range(40)],
+    'class': [10 + i % 3 for i in range(40)],
+    'section': ['ABCD'[i % 4] for i in range(40)],
+})
+
+
+def test_compact_frame_encodes_and_downcasts():
+    df = compact_frame(RAW)
+    assert isinstance(df['section'].dtype, pd.CategoricalDtype)
+    assert not isinstance(df['name'].dtype, pd.CategoricalDtype)
+    assert df['grades'].dtype == 'int8'
+    assert memory_bytes(df) < memory_bytes(RAW)
+    pd.testing.assert_frame_equal(df.astype(RAW.dtypes.to_dict()), RAW)
+
+
+def test_append_records_keeps_encodings():
+    df = append_records(compact_frame(RAW), [{'name': 'New', 'grades': 1000, 'class': 12, 'section': 'E'}])
+    assert isinstance(df['section'].dtype, pd.CategoricalDtype)
+    assert 'E' in df['section'].cat.categories
+    assert df['grades'].iloc[-1] == 1000 and df['grades'].dtype == 'int16'
+
+
+def test_group_by_on_a_categorical_skips_empty_groups():
+    df = compact_frame(RAW)
+    df = df[df['section'] != 'D']
+    select = parser.parse("SELECT AVG(grades) FROM students GROUP BY section;")
+    result = execute_plan(plan_select(select, schema_of(df)), df)
+    assert list(result['section']) == ['A', 'B', 'C']
@@ -0,0 +1,47 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from string_match import LikePlan, ends_with_mask, like_mask, plan_like
+
+NAMES = pd.DataFrame({
+    'name': ['Aarav Sharma', 'meera iyer', 'Rohan Gupta', None, 'Arjun Nair'],
+    'section': pd.Categorical(['A', 'B', 'A', None, 'C']),
+})
+
+
+@pytest.mark.parametrize("pattern, kind", [
+    ('a%', 'prefix'), ('%a', 'suffix'), ('%ar%', 'contains'), ('arjun nair', 'exact'),
+    ('%', 'all'), ('a_r%', 'regex'), ('a%r', 'regex'),
+])
+def test_plan_like_picks_the_cheapest_kernel(pattern, kind):
+    assert plan_like(pattern).kind == kind
+
+
+def like_by_regex(values, pattern):
+    regex = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern)
+    return np.array([v is not None and re.fullmatch(regex, v, re.I | re.S) is not None
+                     for v in values])
+
+
+@pytest.mark.parametrize("pattern", ['a%', '%a', '%AR%', 'meera iyer', '%', 'a_r%', '%n%a%', 'x%'])
+def test_kernels_agree_with_a_regex(pattern):
+    np.testing.assert_array_equal(like_mask(NAMES, 'name', pattern), like_by_regex(NAMES['name'], pattern))
+
+
+def test_categorical_columns_match_once_per_category():
+    assert like_mask(NAMES, 'section', 'a').tolist() == [True, False, True, False, False]
+    assert like_mask(NAMES, 'section', '%').tolist() == [True, True, True, False, True]
+
+
+def test_ends_with_is_case_sensitive_and_literal():
+    df = pd.DataFrame({'name': ['Gupta', 'GUPTA', 'gup%']})
+    assert ends_with_mask(df, 'name', 'pta').tolist() == [True, False, False]
+    assert ends_with_mask(df, 'name', '%').tolist() == [False, False, True]
+
+
+def test_case_sensitive_plans_keep_the_pattern():
+    assert plan_like('Ar%', case=True) == LikePlan('prefix', 'Ar')
+    assert like_mask(NAMES, 'name', 'Ar%', case=True).tolist() == [False, False, False, False, True]